@@ -1,8 +1,54 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./test.db"
+    # Modo de acceso a la base de datos: False = sesiones síncronas en el threadpool,
+    # True = AsyncSession (aiosqlite) sin ocupar hilos mientras se espera a la BD
+    DB_ASYNC: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Lecturas (GET/HEAD) en un engine de solo lectura: READ_DATABASE_URL (p. ej. una réplica) o, si no se define
+    # y la base es un archivo SQLite, el mismo archivo abierto con mode=ro. False = todo por el engine principal
+    DB_READ_ROUTING: bool = True
+    READ_DATABASE_URL: Optional[str] = None
+    ASYNC_READ_DATABASE_URL: Optional[str] = None
+
+    # Perfil del engine (app/core/db/engine.py)
+    DB_ECHO: bool = False
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_WAL: bool = True
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456
+    # Negativo = tamaño en KiB (-65536 = 64 MiB por conexión)
+    SQLITE_CACHE_SIZE: int = -65536
+
+    # Cache en memoria para búsquedas de unidades y rutas por id
+    CACHE_MAXSIZE: int = 10000
+    CACHE_TTL_SECONDS: float = 30.0
+
+    # Job de retención (python manage.py archive-routes): días desde que terminó una ruta COMPLETADA/CANCELADA
+    # para archivarla, y rutas movidas por transacción
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_CHUNK_SIZE: int = 1000
+
+    # Eventos de rutas (GET /routes/stream y /routes/ws): eventos pendientes por suscriptor antes de descartar
+    # los más viejos, eventos recientes guardados para reanudar con Last-Event-ID y segundos entre keepalives
+    EVENT_QUEUE_SIZE: int = 1000
+    EVENT_BUFFER_SIZE: int = 10000
+    EVENT_HEARTBEAT_SECONDS: float = 15.0
+
+    # GET /routes y GET /performance: filas proyectadas con las columnas del esquema de lectura y serializadas con
+    # orjson, sin instancias del ORM ni la validación de response_model. Mismo JSON; False = camino con response_model
+    FAST_LIST_RESPONSES: bool = False
+
+    # Hash de contraseñas: costo de bcrypt y procesos del pool (None = núcleos disponibles)
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
@@ -0,0 +1,54 @@
+from functools import lru_cache
+from typing import AsyncIterator, Optional
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config.settings import settings
+from app.core.db.engine import build_async_engine
+from app.core.db.session import get_read_database_url
+
+
+def _to_async_url(database_url: str) -> str:
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url.render_as_string(hide_password=False)
+
+
+def get_async_database_url() -> str:
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    return _to_async_url(settings.DATABASE_URL)
+
+
+def get_async_read_database_url() -> Optional[str]:
+    read_url = get_read_database_url()
+    if not read_url:
+        return None
+    return settings.ASYNC_READ_DATABASE_URL or _to_async_url(read_url)
+
+
+@lru_cache
+def get_async_engine() -> AsyncEngine:
+    # Se crea bajo demanda para no requerir aiosqlite cuando DB_ASYNC está desactivado
+    return build_async_engine(get_async_database_url())
+
+
+@lru_cache
+def get_async_read_engine() -> AsyncEngine:
+    url = get_async_read_database_url()
+    return build_async_engine(url, read_only=True) if url else get_async_engine()
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    async with AsyncSession(get_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+async def dispose_async_engine() -> None:
+    # Las conexiones de aiosqlite mantienen un hilo vivo hasta que se cierran
+    if get_async_read_engine.cache_info().currsize and get_async_read_engine() is not get_async_engine():
+        await get_async_read_engine().dispose()
+    if get_async_engine.cache_info().currsize:
+        await get_async_engine().dispose()
@@ -1,8 +1,7 @@
-from sqlmodel import create_engine, SQLModel
-from app.core.config.settings import settings
-from app.core.db.base import Base
+from app.core.db.migrations import migrate
+from app.core.db.session import engine
 
 
-def init_db():
-    engine = create_engine(settings.DATABASE_URL, echo=True)
-    SQLModel.metadata.create_all(engine)
+def init_db() -> int:
+    # Con la base al día es una sola lectura de schema_version; si no, aplica las migraciones pendientes
+    return migrate(engine)
@@ -0,0 +1,90 @@
+import os
+from typing import Any, Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from sqlmodel import create_engine
+
+from app.core.config.settings import Settings, settings as default_settings
+from app.core.metrics.sql import register_query_metrics
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_memory_sqlite(url: str) -> bool:
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in database
+
+
+def read_only_database_url(url: str) -> Optional[str]:
+    # El mismo archivo SQLite abierto como URI con mode=ro; None si no hay archivo (memoria) o no es SQLite
+    parsed = make_url(url)
+    if not _is_sqlite(url) or _is_memory_sqlite(url) or parsed.query.get("uri"):
+        return None
+    database = f"file:{os.path.abspath(parsed.database)}"
+    return parsed.set(database=database, query={**parsed.query, "mode": "ro", "uri": "true"}).render_as_string(
+        hide_password=False
+    )
+
+
+def _engine_options(url: str, settings: Settings) -> Dict[str, Any]:
+    options: Dict[str, Any] = {
+        "echo": settings.DB_ECHO,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+    if _is_sqlite(url):
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_memory_sqlite(url):
+            return options
+    options["pool_size"] = settings.DB_POOL_SIZE
+    options["max_overflow"] = settings.DB_MAX_OVERFLOW
+    return options
+
+
+def _register_sqlite_pragmas(engine: Engine, settings: Settings, read_only: bool = False) -> None:
+    pragmas = [
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}",
+    ]
+    if read_only:
+        # journal_mode y synchronous los define el engine principal; query_only rechaza escrituras también
+        # cuando la réplica es un archivo con permisos de escritura
+        pragmas.append("PRAGMA query_only = 1")
+    else:
+        pragmas.append(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        if settings.SQLITE_WAL:
+            pragmas.insert(0, "PRAGMA journal_mode = WAL")
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def build_engine(url: str, settings: Settings = default_settings, read_only: bool = False) -> Engine:
+    options = _engine_options(url, settings)
+    if "pool_size" in options:
+        options["poolclass"] = QueuePool
+    engine = create_engine(url, **options)
+    if _is_sqlite(url):
+        _register_sqlite_pragmas(engine, settings, read_only)
+    register_query_metrics(engine)
+    return engine
+
+
+def build_async_engine(url: str, settings: Settings = default_settings, read_only: bool = False) -> AsyncEngine:
+    options = _engine_options(url, settings)
+    if "pool_size" in options:
+        # aiosqlite usa NullPool por defecto con archivos; se fuerza un pool para reutilizar conexiones
+        options["poolclass"] = AsyncAdaptedQueuePool
+    engine = create_async_engine(url, **options)
+    if _is_sqlite(url):
+        _register_sqlite_pragmas(engine.sync_engine, settings, read_only)
+    register_query_metrics(engine.sync_engine)
+    return engine
@@ -0,0 +1,80 @@
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+from sqlalchemy import func, inspect, insert, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlmodel import Field
+from app.core.db.base import Base
+from app.core.db.row_counts import install_row_counters
+from app.core.db.schema_v1 import SCHEMA_V1_STATEMENTS
+from app.core.db.search_index import install_search_index
+
+
+class SchemaVersion(Base, table=True):
+    # Una fila por migración aplicada; la versión de la base es la mayor
+    __tablename__ = "schema_version"
+
+    version: int = Field(primary_key=True)
+    description: str
+    applied_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[Connection], None]
+
+
+def create_schema(connection: Connection) -> None:
+    # DDL literal y no create_all: la migración 1 crea siempre el mismo esquema aunque los modelos cambien después
+    for statement in SCHEMA_V1_STATEMENTS:
+        connection.execute(text(statement))
+
+
+# Solo se agregan al final: una migración aplicada no se modifica, el cambio va en una versión nueva
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Tablas e índices de los modelos", create_schema),
+    Migration(2, "Contadores de filas por tabla y estado", install_row_counters),
+    Migration(3, "Índice de búsqueda FTS5 de rutas y ubicaciones", install_search_index),
+]
+LATEST_VERSION = MIGRATIONS[-1].version
+
+
+def current_version(connection: Connection) -> int:
+    if not inspect(connection).has_table(SchemaVersion.__tablename__):
+        return 0
+    return connection.execute(select(func.coalesce(func.max(SchemaVersion.version), 0))).scalar_one()
+
+
+def migrate(engine: Engine) -> int:
+    """Aplica las migraciones pendientes y devuelve la versión final de la base.
+
+    Con la base al día solo lee la versión. Las pendientes se aplican en una transacción que toma el lock de
+    escritura antes de volver a leer la versión, así que varios workers que arrancan juntos las aplican una vez.
+    """
+    with engine.connect() as connection:
+        version = current_version(connection)
+        connection.rollback()
+        if version >= LATEST_VERSION:
+            return version
+
+        if connection.dialect.name == "sqlite":
+            # pysqlite no abre transacción antes de DDL; BEGIN IMMEDIATE la abre con el lock de escritura
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            SchemaVersion.__table__.create(connection, checkfirst=True)
+            version = current_version(connection)
+            for migration in MIGRATIONS:
+                if migration.version <= version:
+                    continue
+                migration.apply(connection)
+                connection.execute(
+                    insert(SchemaVersion.__table__).values(
+                        version=migration.version, description=migration.description, applied_at=datetime.utcnow()
+                    )
+                )
+                version = migration.version
+            connection.commit()
+        except BaseException:
+            connection.rollback()
+            raise
+        return version
@@ -0,0 +1,90 @@
+from typing import Dict, Iterable, Optional, Sequence
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from sqlmodel import Field, Session, func, select
+from app.core.db.base import Base
+
+# Tablas con contador de filas y la columna por la que se desglosa (None = solo total)
+COUNTED_TABLES: Dict[str, Optional[str]] = {
+    "user": None,
+    "unidad": None,
+    "ruta": "status",
+    "rendimiento": None,
+    "ruta_archive": "status",
+    "rendimiento_archive": None,
+}
+
+
+class TableRowCount(Base, table=True):
+    # Mantenida por triggers de SQLite en INSERT, DELETE y cambios de estado; nunca se escribe desde la app
+    __tablename__ = "table_row_count"
+
+    table_name: str = Field(primary_key=True)
+    status: str = Field(default="", primary_key=True)
+    row_count: int = Field(default=0)
+
+
+def _increment(table_name: str, status: str) -> str:
+    return (
+        f"INSERT INTO table_row_count (table_name, status, row_count) VALUES ('{table_name}', {status}, 1) "
+        "ON CONFLICT (table_name, status) DO UPDATE SET row_count = row_count + 1;"
+    )
+
+
+def _decrement(table_name: str, status: str) -> str:
+    return (
+        "UPDATE table_row_count SET row_count = row_count - 1 "
+        f"WHERE table_name = '{table_name}' AND status = {status};"
+    )
+
+
+def _trigger_statements(table_name: str, status_column: Optional[str]) -> Sequence[str]:
+    new_status = f"NEW.{status_column}" if status_column else "''"
+    old_status = f"OLD.{status_column}" if status_column else "''"
+    statements = [
+        f'CREATE TRIGGER IF NOT EXISTS trg_{table_name}_count_insert AFTER INSERT ON "{table_name}" '
+        f"BEGIN {_increment(table_name, new_status)} END",
+        f'CREATE TRIGGER IF NOT EXISTS trg_{table_name}_count_delete AFTER DELETE ON "{table_name}" '
+        f"BEGIN {_decrement(table_name, old_status)} END",
+    ]
+    if status_column:
+        statements.append(
+            f'CREATE TRIGGER IF NOT EXISTS trg_{table_name}_count_status AFTER UPDATE OF {status_column} '
+            f'ON "{table_name}" WHEN OLD.{status_column} IS NOT NEW.{status_column} '
+            f"BEGIN {_decrement(table_name, old_status)} {_increment(table_name, new_status)} END"
+        )
+    return statements
+
+
+def _backfill(connection: Connection, table_name: str, status_column: Optional[str]) -> None:
+    status = status_column or "''"
+    connection.execute(text("DELETE FROM table_row_count WHERE table_name = :table_name"), {"table_name": table_name})
+    connection.execute(text(
+        f"INSERT INTO table_row_count (table_name, status, row_count) "
+        f'SELECT \'{table_name}\', {status}, count(*) FROM "{table_name}" GROUP BY {status}'
+    ))
+
+
+def install_row_counters(connection: Connection) -> None:
+    # Migración 2: los triggers se crean junto con el conteo inicial en la transacción de la migración, así que una
+    # base existente arranca con contadores exactos. Las tablas que ya tienen triggers se saltan
+    for table_name, status_column in COUNTED_TABLES.items():
+        installed = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+            {"name": f"trg_{table_name}_count_insert"}
+        ).first()
+        if installed:
+            continue
+        for statement in _trigger_statements(table_name, status_column):
+            connection.execute(text(statement))
+        _backfill(connection, table_name, status_column)
+
+
+def count_rows(session: Session, table_names: Iterable[str], statuses: Optional[Iterable[str]] = None) -> int:
+    # Lee a lo sumo una fila por tabla y estado en lugar de un COUNT(*) sobre la tabla
+    statement = select(func.coalesce(func.sum(TableRowCount.row_count), 0)).where(
+        TableRowCount.table_name.in_(list(table_names))
+    )
+    if statuses is not None:
+        statement = statement.where(TableRowCount.status.in_(list(statuses)))
+    return session.exec(statement).one()
@@ -0,0 +1,92 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable, Generic, ParamSpec, TypeVar
+from fastapi import Request
+from sqlmodel.ext.asyncio.session import AsyncSession
+from sqlmodel import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config.settings import settings
+from app.core.db.async_session import get_async_engine, get_async_read_engine
+from app.core.db.session import engine, read_engine
+
+T = TypeVar("T")
+R = TypeVar("R")
+P = ParamSpec("P")
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+# Una lectura con este header va al engine principal: ve las escrituras recién confirmadas aunque la réplica
+# todavía no las tenga
+READ_YOUR_WRITES_HEADER = "X-Read-Your-Writes"
+
+
+class SessionRunner(ABC):
+    """Ejecuta código de repositorios y servicios (escrito sobre Session) desde rutas async."""
+
+    @property
+    @abstractmethod
+    def sync_session(self) -> Session:
+        """Sesión síncrona sobre la que se construyen los repositorios y servicios del request."""
+
+    @abstractmethod
+    async def run(self, fn: Callable[[Session], R]) -> R:
+        """Ejecuta fn con la sesión síncrona sin bloquear el event loop."""
+
+    async def call(self, fn: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+        return await self.run(lambda session: fn(*args, **kwargs))
+
+
+class SyncSessionRunner(SessionRunner):
+    def __init__(self, session: Session):
+        self.session = session
+
+    @property
+    def sync_session(self) -> Session:
+        return self.session
+
+    async def run(self, fn: Callable[[Session], R]) -> R:
+        return await run_in_threadpool(fn, self.session)
+
+
+class AsyncSessionRunner(SessionRunner):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    @property
+    def sync_session(self) -> Session:
+        return self.session.sync_session
+
+    async def run(self, fn: Callable[[Session], R]) -> R:
+        # run_sync ejecuta el código ORM en un greenlet: la E/S con aiosqlite no bloquea el event loop
+        return await self.session.run_sync(fn)
+
+
+class AsyncService(Generic[T]):
+    """Base de las versiones async de los servicios que usan las rutas.
+
+    El servicio síncrono se construye una vez por request sobre la sesión del runner; cada subclase declara sus
+    métodos como corrutinas con la misma firma que el servicio, así que los tipos se conservan.
+    """
+
+    def __init__(self, runner: SessionRunner, service: T):
+        self.runner = runner
+        self.service = service
+
+
+def uses_read_engine(request: Request) -> bool:
+    if request.method not in READ_METHODS:
+        return False
+    return request.headers.get(READ_YOUR_WRITES_HEADER, "").lower() not in ("1", "true")
+
+
+async def get_session_runner(request: Request) -> AsyncIterator[SessionRunner]:
+    read = uses_read_engine(request)
+    if settings.DB_ASYNC:
+        async_engine = get_async_read_engine() if read else get_async_engine()
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            yield AsyncSessionRunner(session)
+    else:
+        session = Session(read_engine if read else engine)
+        try:
+            yield SyncSessionRunner(session)
+        finally:
+            await run_in_threadpool(session.close)
@@ -0,0 +1,136 @@
+# Migración 1 congelada: el DDL que generaban los modelos cuando se introdujeron las migraciones. No se regenera
+# desde SQLModel.metadata; un cambio de esquema va en una migración nueva. IF NOT EXISTS porque en bases anteriores
+# a las migraciones solo crea lo que falte, como hacía create_all
+SCHEMA_V1_STATEMENTS = [
+    """CREATE TABLE IF NOT EXISTS rendimiento_archive (
+    id INTEGER NOT NULL,
+    route_id INTEGER NOT NULL,
+    distance_traveled_km FLOAT NOT NULL,
+    fuel_consumed_liters FLOAT NOT NULL,
+    actual_time_hours FLOAT NOT NULL,
+    average_speed_kmh FLOAT NOT NULL,
+    efficiency_score FLOAT NOT NULL,
+    fuel_efficiency_km_per_liter FLOAT NOT NULL,
+    time_efficiency FLOAT NOT NULL,
+    notes VARCHAR(1000),
+    recorded_at DATETIME NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+)""",
+    "CREATE INDEX IF NOT EXISTS ix_rendimiento_archive_recorded_at ON rendimiento_archive (recorded_at)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_rendimiento_archive_route_id ON rendimiento_archive (route_id)",
+    """CREATE TABLE IF NOT EXISTS ruta_archive (
+    id INTEGER NOT NULL,
+    origin VARCHAR(255) NOT NULL,
+    destination VARCHAR(255) NOT NULL,
+    distance_km FLOAT NOT NULL,
+    estimated_time_hours FLOAT NOT NULL,
+    status VARCHAR(10) NOT NULL,
+    unit_id INTEGER NOT NULL,
+    assigned_at DATETIME NOT NULL,
+    started_at DATETIME,
+    completed_at DATETIME,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+)""",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_archive_assigned_at ON ruta_archive (assigned_at)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_archive_completed_at ON ruta_archive (completed_at)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_archive_status_id ON ruta_archive (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_archive_unit_id ON ruta_archive (unit_id)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_archive_unit_id_status_id ON ruta_archive (unit_id, status, id)",
+    """CREATE TABLE IF NOT EXISTS ruta_location (
+    id INTEGER NOT NULL,
+    name VARCHAR(255) COLLATE "NOCASE" NOT NULL,
+    route_count INTEGER NOT NULL,
+    PRIMARY KEY (id),
+    UNIQUE (name)
+)""",
+    """CREATE TABLE IF NOT EXISTS table_row_count (
+    table_name VARCHAR NOT NULL,
+    status VARCHAR NOT NULL,
+    row_count INTEGER NOT NULL,
+    PRIMARY KEY (table_name, status)
+)""",
+    """CREATE TABLE IF NOT EXISTS user (
+    id INTEGER NOT NULL,
+    email VARCHAR NOT NULL,
+    username VARCHAR NOT NULL,
+    full_name VARCHAR NOT NULL,
+    phone VARCHAR(20),
+    hashed_password VARCHAR NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    PRIMARY KEY (id)
+)""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_user_email ON user (email)",
+    "CREATE INDEX IF NOT EXISTS ix_user_username ON user (username)",
+    """CREATE TABLE IF NOT EXISTS unidad (
+    id INTEGER NOT NULL,
+    license_plate VARCHAR(20) NOT NULL,
+    brand VARCHAR(100) NOT NULL,
+    model VARCHAR(100) NOT NULL,
+    year INTEGER NOT NULL,
+    capacity FLOAT NOT NULL,
+    user_id INTEGER NOT NULL,
+    is_active BOOLEAN NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    PRIMARY KEY (id),
+    FOREIGN KEY(user_id) REFERENCES user (id)
+)""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_unidad_license_plate ON unidad (license_plate)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_unidad_user_id ON unidad (user_id)",
+    "CREATE INDEX IF NOT EXISTS ix_unidad_year ON unidad (year)",
+    """CREATE TABLE IF NOT EXISTS ruta (
+    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    origin VARCHAR(255) NOT NULL,
+    destination VARCHAR(255) NOT NULL,
+    distance_km FLOAT NOT NULL,
+    estimated_time_hours FLOAT NOT NULL,
+    status VARCHAR(10) NOT NULL,
+    unit_id INTEGER NOT NULL,
+    assigned_at DATETIME NOT NULL,
+    started_at DATETIME,
+    completed_at DATETIME,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    FOREIGN KEY(unit_id) REFERENCES unidad (id)
+)""",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_assigned_at ON ruta (assigned_at)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_completed_at ON ruta (completed_at)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_status_id ON ruta (status, id)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_unit_id ON ruta (unit_id)",
+    "CREATE INDEX IF NOT EXISTS ix_ruta_unit_id_status_id ON ruta (unit_id, status, id)",
+    """CREATE TABLE IF NOT EXISTS unit_performance_summary (
+    unit_id INTEGER NOT NULL,
+    total_routes INTEGER NOT NULL,
+    total_distance_km FLOAT NOT NULL,
+    total_fuel_liters FLOAT NOT NULL,
+    total_time_hours FLOAT NOT NULL,
+    efficiency_score_sum FLOAT NOT NULL,
+    updated_at DATETIME,
+    PRIMARY KEY (unit_id),
+    FOREIGN KEY(unit_id) REFERENCES unidad (id)
+)""",
+    """CREATE TABLE IF NOT EXISTS rendimiento (
+    id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT,
+    route_id INTEGER NOT NULL,
+    distance_traveled_km FLOAT NOT NULL,
+    fuel_consumed_liters FLOAT NOT NULL,
+    actual_time_hours FLOAT NOT NULL,
+    average_speed_kmh FLOAT NOT NULL,
+    efficiency_score FLOAT NOT NULL,
+    fuel_efficiency_km_per_liter FLOAT NOT NULL,
+    time_efficiency FLOAT NOT NULL,
+    notes VARCHAR(1000),
+    recorded_at DATETIME NOT NULL,
+    created_at DATETIME NOT NULL,
+    updated_at DATETIME,
+    FOREIGN KEY(route_id) REFERENCES ruta (id)
+)""",
+    "CREATE INDEX IF NOT EXISTS ix_rendimiento_recorded_at ON rendimiento (recorded_at)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_rendimiento_route_id ON rendimiento (route_id)",
+]
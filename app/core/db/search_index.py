@@ -0,0 +1,96 @@
+import re
+from typing import Optional
+from sqlalchemy import Column, Select, String, column, select, table, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql.expression import ColumnElement, TableClause
+from sqlmodel import Field
+from app.core.db.base import Base
+
+# unicode61 sin acentos: "queretaro" encuentra "Querétaro"; prefix acelera las búsquedas "mon*"
+FTS_OPTIONS = "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'"
+SEARCH_TERM_PATTERN = re.compile(r"\w+")
+
+
+class RutaLocation(Base, table=True):
+    # Nombres distintos de origen/destino con el número de rutas en vivo que los usan; la mantienen los triggers
+    # de ruta y alimenta GET /routes/locations/suggest sin recorrer las rutas
+    __tablename__ = "ruta_location"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    name: str = Field(sa_column=Column(String(255, collation="NOCASE"), unique=True, nullable=False))
+    route_count: int = Field(default=0)
+
+
+# Tablas virtuales FTS5 de contenido externo: el índice guarda solo los términos y el rowid de la fila
+ruta_fts = table("ruta_fts", column("rowid"), column("ruta_fts"))
+ruta_location_fts = table("ruta_location_fts", column("rowid"), column("ruta_location_fts"))
+
+
+def _location_delta(name: str, delta: int) -> str:
+    return (
+        f"INSERT INTO ruta_location (name, route_count) VALUES ({name}, {delta}) "
+        f"ON CONFLICT (name) DO UPDATE SET route_count = route_count + {delta};"
+    )
+
+
+SEARCH_INDEX_STATEMENTS = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS ruta_fts USING fts5("
+    f"origin, destination, content = 'ruta', content_rowid = 'id', {FTS_OPTIONS})",
+    "CREATE TRIGGER IF NOT EXISTS trg_ruta_fts_insert AFTER INSERT ON ruta BEGIN "
+    "INSERT INTO ruta_fts (rowid, origin, destination) VALUES (NEW.id, NEW.origin, NEW.destination); "
+    f"{_location_delta('NEW.origin', 1)} {_location_delta('NEW.destination', 1)} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_ruta_fts_delete AFTER DELETE ON ruta BEGIN "
+    "INSERT INTO ruta_fts (ruta_fts, rowid, origin, destination) VALUES ('delete', OLD.id, OLD.origin, OLD.destination); "
+    f"{_location_delta('OLD.origin', -1)} {_location_delta('OLD.destination', -1)} END",
+    "CREATE TRIGGER IF NOT EXISTS trg_ruta_fts_update AFTER UPDATE OF origin, destination ON ruta "
+    "WHEN OLD.origin IS NOT NEW.origin OR OLD.destination IS NOT NEW.destination BEGIN "
+    "INSERT INTO ruta_fts (ruta_fts, rowid, origin, destination) VALUES ('delete', OLD.id, OLD.origin, OLD.destination); "
+    "INSERT INTO ruta_fts (rowid, origin, destination) VALUES (NEW.id, NEW.origin, NEW.destination); "
+    f"{_location_delta('OLD.origin', -1)} {_location_delta('OLD.destination', -1)} "
+    f"{_location_delta('NEW.origin', 1)} {_location_delta('NEW.destination', 1)} END",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS ruta_location_fts USING fts5("
+    f"name, content = 'ruta_location', content_rowid = 'id', {FTS_OPTIONS})",
+    # El nombre de una ubicación no cambia: solo se indexa al insertarla
+    "CREATE TRIGGER IF NOT EXISTS trg_ruta_location_fts_insert AFTER INSERT ON ruta_location BEGIN "
+    "INSERT INTO ruta_location_fts (rowid, name) VALUES (NEW.id, NEW.name); END",
+]
+
+
+def _backfill(connection: Connection) -> None:
+    connection.execute(text("INSERT INTO ruta_fts (ruta_fts) VALUES ('rebuild')"))
+    connection.execute(text("UPDATE ruta_location SET route_count = 0"))
+    connection.execute(text(
+        "INSERT INTO ruta_location (name, route_count) "
+        "SELECT name, count(*) FROM (SELECT origin AS name FROM ruta UNION ALL SELECT destination FROM ruta) "
+        "WHERE true GROUP BY name "
+        "ON CONFLICT (name) DO UPDATE SET route_count = excluded.route_count"
+    ))
+
+
+def install_search_index(connection: Connection) -> None:
+    # Migración 3, igual que los contadores de filas: el índice se construye con las rutas existentes en la misma
+    # transacción que crea los triggers
+    installed = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_ruta_fts_insert'")
+    ).first()
+    if installed:
+        return
+    for statement in SEARCH_INDEX_STATEMENTS:
+        connection.execute(text(statement))
+    _backfill(connection)
+
+
+def build_match_query(search: str) -> Optional[str]:
+    # Cada palabra como prefijo entre comillas: la entrada del usuario nunca se interpreta como sintaxis FTS5
+    terms = SEARCH_TERM_PATTERN.findall(search)
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def match_clause(fts_table: TableClause, match_query: str) -> ColumnElement[bool]:
+    return fts_table.c[fts_table.name].match(match_query)
+
+
+def match_ids(fts_table: TableClause, match_query: str) -> Select:
+    return select(fts_table.c.rowid).where(match_clause(fts_table, match_query))
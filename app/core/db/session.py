@@ -1,8 +1,23 @@
-from sqlmodel import create_engine, Session
+from typing import Optional
+from sqlmodel import Session
 
 from app.core.config.settings import settings
+from app.core.db.engine import build_engine, read_only_database_url
 
-engine = create_engine(settings.DATABASE_URL, echo=True)
+# Engine único compartido por init_db, las sesiones por request y los comandos de manage.py
+engine = build_engine(settings.DATABASE_URL)
+
+
+def get_read_database_url() -> Optional[str]:
+    if not settings.DB_READ_ROUTING:
+        return None
+    return settings.READ_DATABASE_URL or read_only_database_url(settings.DATABASE_URL)
+
+
+# Engine de lecturas (GET/HEAD y exportaciones) con su propio pool: las lecturas pesadas no ocupan conexiones
+# del engine principal. Sin URL de lectura es el mismo engine
+_read_database_url = get_read_database_url()
+read_engine = build_engine(_read_database_url, read_only=True) if _read_database_url else engine
 
 
 def get_session():
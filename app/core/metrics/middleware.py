@@ -0,0 +1,74 @@
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics.registry import Counter, Gauge, Histogram, QUERY_COUNT_BUCKETS
+from app.core.metrics.sql import QueryStats, current_query_stats
+
+UNMATCHED_ROUTE = "__unmatched__"
+
+http_requests_total = Counter(
+    "http_requests_total", "Requests HTTP atendidos", ("method", "route", "status")
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "Requests HTTP en curso", ("method",)
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Latencia de requests HTTP hasta enviar la respuesta completa", ("method", "route")
+)
+http_request_db_seconds = Histogram(
+    "http_request_db_seconds", "Tiempo en la base de datos por request", ("method", "route")
+)
+http_request_db_statements = Histogram(
+    "http_request_db_statements", "Sentencias SQL por request", ("method", "route"), buckets=QUERY_COUNT_BUCKETS
+)
+
+
+def _route_label(scope: Scope) -> str:
+    # La plantilla de la ruta (/routes/{ruta_id}) en lugar de la ruta real mantiene acotadas las etiquetas
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """Latencia, códigos de estado, requests en curso y SQL por request; agrega el header Server-Timing."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        stats = QueryStats()
+        token = current_query_stats.set(stats)
+        status_code = 500
+        started_at = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                elapsed_ms = (time.perf_counter() - started_at) * 1000
+                db_ms = stats.seconds * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={db_ms:.3f};desc="{stats.statements} SQL", app;dur={elapsed_ms - db_ms:.3f}'
+                )
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            elapsed = time.perf_counter() - started_at
+            route = _route_label(scope)
+            http_requests_in_progress.dec(method)
+            http_requests_total.inc(method, route, str(status_code))
+            http_request_duration_seconds.observe(elapsed, method, route)
+            http_request_db_seconds.observe(stats.seconds, method, route)
+            http_request_db_statements.observe(stats.statements, method, route)
+            current_query_stats.reset(token)
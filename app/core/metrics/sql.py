@@ -0,0 +1,41 @@
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics.registry import Counter
+
+
+@dataclass
+class QueryStats:
+    statements: int = 0
+    seconds: float = 0.0
+
+
+# El middleware crea un QueryStats por request; el contexto se copia al threadpool (modo síncrono)
+# y al greenlet de run_sync (modo async), así que los hooks suman sobre el mismo objeto
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("current_query_stats", default=None)
+
+db_statements_total = Counter("db_statements_total", "Sentencias SQL ejecutadas")
+db_statement_seconds_total = Counter("db_statement_seconds_total", "Tiempo total de ejecución de sentencias SQL")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._metrics_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._metrics_started_at
+    db_statements_total.inc()
+    db_statement_seconds_total.inc(amount=elapsed)
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.statements += 1
+        stats.seconds += elapsed
+
+
+def register_query_metrics(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
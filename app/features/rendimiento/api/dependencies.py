@@ -1,18 +1,20 @@
 from fastapi import Depends
 from sqlmodel import Session
-from app.core.db.session import get_session
+from app.core.db.runner import SessionRunner, get_session_runner
 from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.services.rendimiento_async_service import AsyncRendimientoService
 from app.features.rendimiento.services.rendimiento_service import RendimientoService
 from app.features.rutas.repositories.ruta_repository import RutaRepository
-from app.features.rutas.api.dependencies import get_ruta_repository
 
 
-def get_rendimiento_repository(session: Session = Depends(get_session)) -> RendimientoRepository:
-    return RendimientoRepository(session)
+def build_rendimiento_service(session: Session) -> RendimientoService:
+    return RendimientoService(
+        RendimientoRepository(session),
+        RutaRepository(session),
+        UnitPerformanceSummaryRepository(session)
+    )
 
 
-def get_rendimiento_service(
-    repository: RendimientoRepository = Depends(get_rendimiento_repository),
-    ruta_repository: RutaRepository = Depends(get_ruta_repository)
-) -> RendimientoService:
-    return RendimientoService(repository, ruta_repository)
+def get_rendimiento_service(runner: SessionRunner = Depends(get_session_runner)) -> AsyncRendimientoService:
+    return AsyncRendimientoService(runner, build_rendimiento_service(runner.sync_session))
@@ -1,67 +1,159 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Sequence
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from datetime import datetime
+from typing import List, Optional, Sequence, Union
+from app.core.config.settings import settings
 from app.features.rendimiento.api.dependencies import get_rendimiento_service
-from app.features.rendimiento.services.rendimiento_service import RendimientoService
-from app.features.rendimiento.schemas.rendimiento_schemas import RendimientoCreate, RendimientoUpdate, RendimientoRead
+from app.features.rendimiento.services.rendimiento_async_service import AsyncRendimientoService
+from app.features.rendimiento.schemas.rendimiento_schemas import (
+    RendimientoCreate, RendimientoUpdate, RendimientoRead, RendimientoStats, StatsGroupBy,
+    MetricsRecomputeScheduled, RendimientoImportResult
+)
+from app.features.rendimiento.services.rendimiento_export_service import export_rendimientos
+from app.features.rendimiento.services.rendimiento_import_service import run_rendimiento_import
 from app.features.rendimiento.models.rendimiento import Rendimiento
+from app.shared.archive import INCLUDE_ARCHIVED_DESCRIPTION
+from app.shared.etag import IF_MATCH_DESCRIPTION, IF_NONE_MATCH_DESCRIPTION, etag_for, not_modified_response
+from app.shared.export import ExportFormat, export_response
+from app.shared.fast_json import fast_json_response
+from app.shared.file_import import IMPORT_CHUNK_SIZE, ImportFormat, detect_import_format
+from app.shared.pagination import CURSOR_DESCRIPTION, TOTAL_COUNT_HEADER, WITH_COUNT_DESCRIPTION, Page
 
 router = APIRouter(prefix="/performance", tags=["performance"])
 
 
 @router.post("", response_model=RendimientoRead, status_code=201)
-def create_rendimiento(
+async def create_rendimiento(
     rendimiento_create: RendimientoCreate,
-    service: RendimientoService = Depends(get_rendimiento_service)
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
 ) -> Rendimiento:
-    return service.create_rendimiento(rendimiento_create)
+    return await service.create_rendimiento(rendimiento_create)
 
 
-@router.get("", response_model=Sequence[RendimientoRead])
-def get_rendimientos(
+@router.post("/recompute", response_model=MetricsRecomputeScheduled, status_code=202)
+async def recompute_rendimiento_metrics(
+    background_tasks: BackgroundTasks,
+    chunk_size: int = Query(default=10000, ge=100, le=100000, description="Registros procesados por lote"),
+) -> MetricsRecomputeScheduled:
+    # Importado aquí: numpy solo lo usa el recálculo y cargarlo al importar la app alarga cada arranque (~40 ms)
+    from app.features.rendimiento.services.metrics_recompute_service import run_metrics_recompute
+
+    background_tasks.add_task(run_metrics_recompute, chunk_size)
+    return MetricsRecomputeScheduled(detail="Recálculo de métricas programado", chunk_size=chunk_size)
+
+
+@router.post("/import", response_model=RendimientoImportResult)
+async def import_rendimientos(
+    file: UploadFile = File(..., description="Archivo CSV (con encabezado) o NDJSON con registros de rendimiento"),
+    format: Optional[ImportFormat] = Query(default=None, description="Formato del archivo: csv o ndjson; por defecto se deduce de la extensión"),
+    chunk_size: int = Query(default=IMPORT_CHUNK_SIZE, ge=100, le=10000, description="Registros validados e insertados por commit"),
+) -> RendimientoImportResult:
+    import_format = format or detect_import_format(file.filename)
+    if import_format is None:
+        raise HTTPException(status_code=400, detail="No se pudo deducir el formato del archivo; indique format=csv o format=ndjson")
+
+    # El archivo ya está en disco (o en memoria si es pequeño); se lee línea por línea al importar, en el threadpool
+    return await run_in_threadpool(run_rendimiento_import, file.file, import_format, chunk_size)
+
+
+@router.get("", response_model=Union[Sequence[RendimientoRead], Page[RendimientoRead]])
+async def get_rendimientos(
+    response: Response,
     offset: int = Query(default=0, ge=0, description="Número de registros a saltar (paginación)"),
     limit: int = Query(default=100, ge=1, le=100, description="Número máximo de registros a devolver"),
-    service: RendimientoService = Depends(get_rendimiento_service)
-) -> Sequence[Rendimiento]:
-    return service.get_all_rendimientos(offset, limit)
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    include_archived: bool = Query(default=False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    with_count: bool = Query(default=False, description=WITH_COUNT_DESCRIPTION),
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
+) -> Union[Sequence[Rendimiento], Page]:
+    if with_count:
+        response.headers[TOTAL_COUNT_HEADER] = str(await service.count_rendimientos(include_archived))
+    if settings.FAST_LIST_RESPONSES:
+        if cursor is not None:
+            page = await service.get_rendimientos_page_rows(cursor, limit, include_archived)
+            return fast_json_response(dict(page), response)
+        return fast_json_response(await service.get_all_rendimientos_rows(offset, limit, include_archived), response)
+    if cursor is not None:
+        return await service.get_rendimientos_page(cursor, limit, include_archived)
+    return await service.get_all_rendimientos(offset, limit, include_archived)
+
+
+@router.get("/stats", response_model=List[RendimientoStats])
+async def get_rendimiento_stats(
+    group_by: StatsGroupBy = Query(default=StatsGroupBy.UNIT, description="Agrupar por unidad (unit), mes de registro (month) o estado de la ruta (status)"),
+    unit_id: Optional[int] = Query(default=None, description="Filtrar por ID de unidad"),
+    date_from: Optional[datetime] = Query(default=None, description="Fecha inicial de registro (inclusiva)"),
+    date_to: Optional[datetime] = Query(default=None, description="Fecha final de registro (exclusiva)"),
+    include_archived: bool = Query(default=False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
+) -> List[RendimientoStats]:
+    return await service.get_stats(group_by, unit_id, date_from, date_to, include_archived)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_rendimientos_endpoint(
+    format: ExportFormat = Query(default=ExportFormat.CSV, description="Formato de exportación: csv o ndjson"),
+    unit_id: Optional[int] = Query(default=None, description="Filtrar por ID de unidad"),
+    date_from: Optional[datetime] = Query(default=None, description="Fecha inicial de registro (inclusiva)"),
+    date_to: Optional[datetime] = Query(default=None, description="Fecha final de registro (exclusiva)"),
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
+) -> StreamingResponse:
+    await service.validate_export_filters(date_from, date_to)
+    return export_response(export_rendimientos(format, unit_id, date_from, date_to), format, "rendimientos")
 
 
 @router.get("/{rendimiento_id}", response_model=RendimientoRead)
-def get_rendimiento(
+async def get_rendimiento(
     rendimiento_id: int,
-    service: RendimientoService = Depends(get_rendimiento_service)
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None, description=IF_NONE_MATCH_DESCRIPTION),
+    include_archived: bool = Query(default=False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
 ) -> Rendimiento:
-    rendimiento = service.get_rendimiento_by_id(rendimiento_id)
+    if if_none_match:
+        cached = not_modified_response(
+            if_none_match, rendimiento_id, await service.get_rendimiento_version(rendimiento_id, include_archived)
+        )
+        if cached:
+            return cached
+    rendimiento = await service.get_rendimiento_by_id(rendimiento_id, include_archived)
     if not rendimiento:
         raise HTTPException(status_code=404, detail="Rendimiento no encontrado")
+    response.headers["ETag"] = etag_for(rendimiento)
     return rendimiento
 
 
 @router.get("/route/{route_id}", response_model=RendimientoRead)
-def get_rendimiento_by_route(
+async def get_rendimiento_by_route(
     route_id: int,
-    service: RendimientoService = Depends(get_rendimiento_service)
+    include_archived: bool = Query(default=False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
 ) -> Rendimiento:
-    rendimiento = service.get_rendimiento_by_route(route_id)
+    rendimiento = await service.get_rendimiento_by_route(route_id, include_archived)
     if not rendimiento:
         raise HTTPException(status_code=404, detail="Rendimiento no encontrado for this route")
     return rendimiento
 
 
 @router.patch("/{rendimiento_id}", response_model=RendimientoRead)
-def update_rendimiento(
+async def update_rendimiento(
     rendimiento_id: int,
     rendimiento_update: RendimientoUpdate,
-    service: RendimientoService = Depends(get_rendimiento_service)
+    response: Response,
+    if_match: Optional[str] = Header(default=None, description=IF_MATCH_DESCRIPTION),
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
 ) -> Rendimiento:
-    rendimiento = service.update_rendimiento(rendimiento_id, rendimiento_update)
+    rendimiento = await service.update_rendimiento(rendimiento_id, rendimiento_update, if_match)
     if not rendimiento:
         raise HTTPException(status_code=404, detail="Rendimiento no encontrado")
+    response.headers["ETag"] = etag_for(rendimiento)
     return rendimiento
 
 
 @router.delete("/{rendimiento_id}", status_code=204)
-def delete_rendimiento(
+async def delete_rendimiento(
     rendimiento_id: int,
-    service: RendimientoService = Depends(get_rendimiento_service)
+    service: AsyncRendimientoService = Depends(get_rendimiento_service)
 ) -> None:
-    service.delete_rendimiento(rendimiento_id)
+    await service.delete_rendimiento(rendimiento_id)
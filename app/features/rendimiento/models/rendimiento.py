@@ -2,9 +2,13 @@ from datetime import datetime
 from typing import Optional
 from sqlmodel import Field, SQLModel
 from app.core.db.base import Base
+from app.shared.archive import archive_table
 
 
 class Rendimiento(Base, table=True):
+    # Igual que en ruta: los ids de rendimientos archivados no se vuelven a asignar
+    __table_args__ = {"sqlite_autoincrement": True}
+
     id: Optional[int] = Field(default=None, primary_key=True)
     route_id: int = Field(foreign_key="ruta.id", unique=True, index=True)
     distance_traveled_km: float = Field(default=0.0)
@@ -15,6 +19,10 @@ class Rendimiento(Base, table=True):
     fuel_efficiency_km_per_liter: float = Field(default=0.0)
     time_efficiency: float = Field(default=0.0)
     notes: Optional[str] = Field(default=None, max_length=1000)
-    recorded_at: datetime = Field(default_factory=datetime.utcnow)
+    recorded_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
+
+
+# Rendimientos de las rutas archivadas; se mueven junto con su ruta
+rendimiento_archive = archive_table(Rendimiento.__table__, "rendimiento_archive")
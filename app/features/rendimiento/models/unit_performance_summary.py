@@ -0,0 +1,16 @@
+from datetime import datetime
+from typing import Optional
+from sqlmodel import Field
+from app.core.db.base import Base
+
+
+class UnitPerformanceSummary(Base, table=True):
+    __tablename__ = "unit_performance_summary"
+
+    unit_id: int = Field(foreign_key="unidad.id", primary_key=True)
+    total_routes: int = Field(default=0)
+    total_distance_km: float = Field(default=0.0)
+    total_fuel_liters: float = Field(default=0.0)
+    total_time_hours: float = Field(default=0.0)
+    efficiency_score_sum: float = Field(default=0.0)
+    updated_at: Optional[datetime] = None
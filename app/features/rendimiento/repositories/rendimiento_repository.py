@@ -1,47 +1,293 @@
-from typing import Optional, Sequence
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
 from datetime import datetime
+from sqlalchemy import bindparam, delete, func, insert, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Result, Row
 from sqlmodel import Session, select
-from app.features.rendimiento.models.rendimiento import Rendimiento
-from app.features.rendimiento.schemas.rendimiento_schemas import RendimientoCreate, RendimientoUpdate
+from app.core.db.row_counts import count_rows
+from app.features.rendimiento.models.rendimiento import Rendimiento, rendimiento_archive
+from app.features.rendimiento.schemas.rendimiento_schemas import (
+    RendimientoCreate, RendimientoRead, RendimientoUpdate, StatsGroupBy
+)
+from app.features.rutas.models.ruta import Ruta, ruta_archive
+from app.features.unidades.models.unidad import Unidad
+from app.shared.archive import union_archive
+from app.shared.fast_json import fetch_rows, read_columns
+from app.shared.etag import version_matches
+from app.shared.integrity import execute_returning_one
+
+# Columnas de RendimientoRead para los listados con FAST_LIST_RESPONSES
+rendimiento_read_columns = read_columns(RendimientoRead, Rendimiento.__table__)
 
 
 class RendimientoRepository:
     def __init__(self, session: Session):
         self.session = session
 
-    def create(self, rendimiento_create: RendimientoCreate) -> Rendimiento:
-        db_rendimiento = Rendimiento(**rendimiento_create.model_dump())
-        self.session.add(db_rendimiento)
+    def create(self, rendimiento_create: RendimientoCreate, metrics: Optional[Dict[str, float]] = None) -> Rendimiento:
+        row = Rendimiento(**rendimiento_create.model_dump(), **(metrics or {})).model_dump(exclude={"id"})
+        statement = insert(Rendimiento.__table__).values(**row).returning(*Rendimiento.__table__.columns)
+        db_rendimiento = Rendimiento(**execute_returning_one(self.session, statement)._mapping)
         self.session.commit()
-        self.session.refresh(db_rendimiento)
         return db_rendimiento
 
+    def create_many_skip_existing(self, rows: List[Dict[str, Any]]) -> Set[int]:
+        # INSERT ... ON CONFLICT DO NOTHING RETURNING: una ruta registrada por otra solicitud entre la
+        # validación y el insert se omite en lugar de abortar el lote. No hace commit
+        if not rows:
+            return set()
+        table = Rendimiento.__table__
+        statement = (
+            sqlite_insert(table)
+            .on_conflict_do_nothing(index_elements=[table.c.route_id])
+            .returning(table.c.route_id)
+        )
+        return set(self.session.execute(statement, rows).scalars())
+
     def get_by_id(self, rendimiento_id: int) -> Optional[Rendimiento]:
         statement = select(Rendimiento).where(Rendimiento.id == rendimiento_id)
         result = self.session.exec(statement).first()
         return result
 
+    def get_archived_by_id(self, rendimiento_id: int) -> Optional[Rendimiento]:
+        statement = select(*rendimiento_archive.c).where(rendimiento_archive.c.id == rendimiento_id)
+        row = self.session.execute(statement).first()
+        return Rendimiento(**row._mapping) if row else None
+
+    def get_archived_by_route_id(self, route_id: int) -> Optional[Rendimiento]:
+        statement = select(*rendimiento_archive.c).where(rendimiento_archive.c.route_id == route_id)
+        row = self.session.execute(statement).first()
+        return Rendimiento(**row._mapping) if row else None
+
+    def get_version(self, rendimiento_id: int) -> Optional[datetime]:
+        statement = select(Rendimiento.updated_at, Rendimiento.created_at).where(Rendimiento.id == rendimiento_id)
+        row = self.session.exec(statement).first()
+        return (row.updated_at or row.created_at) if row else None
+
     def get_by_route_id(self, route_id: int) -> Optional[Rendimiento]:
         statement = select(Rendimiento).where(Rendimiento.route_id == route_id)
         result = self.session.exec(statement).first()
         return result
 
+    def get_existing_route_ids(self, route_ids: Iterable[int]) -> Set[int]:
+        statement = select(Rendimiento.route_id).where(Rendimiento.route_id.in_(set(route_ids)))
+        return set(self.session.exec(statement).all())
+
     def get_all(self, offset: int = 0, limit: int = 100) -> Sequence[Rendimiento]:
         statement = select(Rendimiento).offset(offset).limit(limit)
         result = self.session.exec(statement).all()
         return result
 
-    def update(self, rendimiento: Rendimiento, rendimiento_update: RendimientoUpdate) -> Rendimiento:
-        rendimiento_data = rendimiento_update.model_dump(exclude_unset=True)
-        for key, value in rendimiento_data.items():
-            setattr(rendimiento, key, value)
-        rendimiento.updated_at = datetime.utcnow()
-        self.session.add(rendimiento)
+    def get_all_rows(self, offset: int = 0, limit: int = 100) -> List[Dict[str, Any]]:
+        statement = select(*rendimiento_read_columns).offset(offset).limit(limit)
+        return fetch_rows(self.session, statement)
+
+    def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> Sequence[Rendimiento]:
+        statement = self._page_statement(select(Rendimiento), after_id, limit)
+        result = self.session.exec(statement).all()
+        return result
+
+    def get_page_rows(self, after_id: Optional[int] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        statement = self._page_statement(select(*rendimiento_read_columns), after_id, limit)
+        return fetch_rows(self.session, statement)
+
+    @staticmethod
+    def _page_statement(statement: Any, after_id: Optional[int], limit: int) -> Any:
+        if after_id is not None:
+            statement = statement.where(Rendimiento.id > after_id)
+        return statement.order_by(Rendimiento.id).limit(limit)
+
+    def get_with_archived(
+        self, after_id: Optional[int] = None, offset: int = 0, limit: int = 100
+    ) -> List[Rendimiento]:
+        rows = self._with_archived_rows(after_id, offset, limit)
+        statement = select(*rows.c).order_by(rows.c.id).offset(offset).limit(limit)
+        return [Rendimiento(**row._mapping) for row in self.session.execute(statement)]
+
+    def get_with_archived_rows(
+        self, after_id: Optional[int] = None, offset: int = 0, limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        rows = self._with_archived_rows(after_id, offset, limit)
+        statement = select(*read_columns(RendimientoRead, rows)).order_by(rows.c.id).offset(offset).limit(limit)
+        return fetch_rows(self.session, statement)
+
+    @staticmethod
+    def _with_archived_rows(after_id: Optional[int], offset: int, limit: int) -> Any:
+        # Cada tabla aporta a lo sumo offset + limit filas en orden de id; los ids no se repiten entre ambas
+        branches = []
+        for table in (Rendimiento.__table__, rendimiento_archive):
+            statement = select(*table.c)
+            if after_id is not None:
+                statement = statement.where(table.c.id > after_id)
+            branches.append(statement.order_by(table.c.id).limit(offset + limit))
+        return union_archive(branches)
+
+    def count(self, include_archived: bool = False) -> int:
+        table_names = [Rendimiento.__tablename__]
+        if include_archived:
+            table_names.append(rendimiento_archive.name)
+        return count_rows(self.session, table_names)
+
+    def get_stats(
+        self,
+        group_by: StatsGroupBy,
+        unit_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        include_archived: bool = False
+    ) -> List[Dict[str, Any]]:
+        # Los filtros se aplican en cada tabla para usar sus índices; el agregado se calcula sobre la unión
+        sources = [(Rendimiento.__table__, Ruta.__table__)]
+        if include_archived:
+            sources.append((rendimiento_archive, ruta_archive))
+        branches = []
+        for table, route_table in sources:
+            statement = (
+                select(
+                    table.c.id,
+                    table.c.efficiency_score,
+                    table.c.fuel_efficiency_km_per_liter,
+                    table.c.time_efficiency,
+                    table.c.distance_traveled_km,
+                    table.c.fuel_consumed_liters,
+                    table.c.recorded_at,
+                    route_table.c.status,
+                    Unidad.id.label("unit_id"),
+                    Unidad.license_plate,
+                )
+                .join(route_table, route_table.c.id == table.c.route_id)
+                .join(Unidad, Unidad.id == route_table.c.unit_id)
+            )
+            if unit_id:
+                statement = statement.where(route_table.c.unit_id == unit_id)
+            if date_from:
+                statement = statement.where(table.c.recorded_at >= date_from)
+            if date_to:
+                statement = statement.where(table.c.recorded_at < date_to)
+            branches.append(statement)
+        rows = union_archive(branches)
+
+        if group_by == StatsGroupBy.UNIT:
+            group_columns = [rows.c.unit_id.label("key"), rows.c.license_plate.label("license_plate")]
+        elif group_by == StatsGroupBy.MONTH:
+            group_columns = [func.strftime("%Y-%m", rows.c.recorded_at).label("key")]
+        else:
+            group_columns = [rows.c.status.label("key")]
+
+        statement = (
+            select(
+                *group_columns,
+                func.count(rows.c.id).label("count"),
+                func.avg(rows.c.efficiency_score).label("avg_efficiency_score"),
+                func.min(rows.c.efficiency_score).label("min_efficiency_score"),
+                func.max(rows.c.efficiency_score).label("max_efficiency_score"),
+                func.avg(rows.c.fuel_efficiency_km_per_liter).label("avg_fuel_efficiency_km_per_liter"),
+                func.min(rows.c.fuel_efficiency_km_per_liter).label("min_fuel_efficiency_km_per_liter"),
+                func.max(rows.c.fuel_efficiency_km_per_liter).label("max_fuel_efficiency_km_per_liter"),
+                func.avg(rows.c.time_efficiency).label("avg_time_efficiency"),
+                func.min(rows.c.time_efficiency).label("min_time_efficiency"),
+                func.max(rows.c.time_efficiency).label("max_time_efficiency"),
+                func.sum(rows.c.distance_traveled_km).label("total_distance_km"),
+                func.sum(rows.c.fuel_consumed_liters).label("total_fuel_liters"),
+            )
+            .group_by(*group_columns)
+            .order_by(group_columns[0])
+        )
+        result = self.session.execute(statement).all()
+        return [dict(row._mapping) for row in result]
+
+    def iter_export(
+        self,
+        unit_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Result:
+        statement = (
+            select(*Rendimiento.__table__.columns, Ruta.unit_id, Ruta.origin, Ruta.destination)
+            .join(Ruta, Ruta.id == Rendimiento.route_id)
+        )
+        if unit_id:
+            statement = statement.where(Ruta.unit_id == unit_id)
+        if date_from:
+            statement = statement.where(Rendimiento.recorded_at >= date_from)
+        if date_to:
+            statement = statement.where(Rendimiento.recorded_at < date_to)
+        statement = statement.order_by(Rendimiento.id).execution_options(yield_per=batch_size)
+        return self.session.connection().execute(statement)
+
+    def get_metric_inputs(self, after_id: int = 0, limit: int = 10000) -> Sequence[Any]:
+        statement = (
+            select(
+                Rendimiento.id,
+                Rendimiento.distance_traveled_km,
+                Rendimiento.fuel_consumed_liters,
+                Rendimiento.actual_time_hours,
+                Ruta.estimated_time_hours,
+            )
+            .join(Ruta, Ruta.id == Rendimiento.route_id)
+            .where(Rendimiento.id > after_id)
+            .order_by(Rendimiento.id)
+            .limit(limit)
+        )
+        return self.session.exec(statement).all()
+
+    def bulk_update_metrics(self, metrics: List[Dict[str, Any]]) -> None:
+        # UPDATE por llave primaria con executemany; cada dict incluye "rendimiento_id"
+        table = Rendimiento.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("rendimiento_id"))
+            .values(
+                average_speed_kmh=bindparam("average_speed_kmh"),
+                fuel_efficiency_km_per_liter=bindparam("fuel_efficiency_km_per_liter"),
+                time_efficiency=bindparam("time_efficiency"),
+                efficiency_score=bindparam("efficiency_score"),
+                updated_at=datetime.utcnow(),
+            )
+        )
+        self.session.execute(statement, metrics)
         self.session.commit()
-        self.session.refresh(rendimiento)
-        return rendimiento
 
-    def delete(self, rendimiento: Rendimiento) -> bool:
-        self.session.delete(rendimiento)
+    def update(
+        self,
+        rendimiento: Rendimiento,
+        rendimiento_update: RendimientoUpdate,
+        metrics: Optional[Dict[str, float]] = None,
+        expected_version: Optional[datetime] = None
+    ) -> Optional[Rendimiento]:
+        values = {
+            **rendimiento_update.model_dump(exclude_unset=True),
+            **(metrics or {}),
+            "updated_at": datetime.utcnow(),
+        }
+        table = Rendimiento.__table__
+        statement = update(table).where(table.c.id == rendimiento.id)
+        if expected_version is not None:
+            statement = statement.where(version_matches(table, expected_version))
+        statement = statement.values(**values).returning(*table.columns)
+        row = execute_returning_one(self.session, statement)
+        if row is None:
+            # También descarta el delta del resumen que el servicio dejó pendiente en la transacción
+            self.session.rollback()
+            return None
         self.session.commit()
-        return True
+        return Rendimiento(**row._mapping)
+
+    def archive_by_route_ids(self, route_ids: Sequence[int]) -> int:
+        # No hace commit: RutaRepository.archive confirma el movimiento junto con el de las rutas
+        table = Rendimiento.__table__
+        self.session.execute(
+            insert(rendimiento_archive).from_select(
+                list(table.c.keys()), select(*table.c).where(table.c.route_id.in_(route_ids))
+            )
+        )
+        return self.session.execute(delete(table).where(table.c.route_id.in_(route_ids))).rowcount
+
+    def delete(self, rendimiento_id: int) -> Optional[Row]:
+        # DELETE ... RETURNING con la unidad de la ruta: el delta del resumen sale de la fila que este DELETE borró,
+        # no de una lectura previa. Sin fila, otra solicitud ya lo eliminó. No hace commit
+        table = Rendimiento.__table__
+        unit_id = select(Ruta.unit_id).where(Ruta.id == table.c.route_id).correlate(table).scalar_subquery()
+        statement = delete(table).where(table.c.id == rendimiento_id).returning(*table.columns, unit_id.label("unit_id"))
+        return self.session.execute(statement).first()
@@ -0,0 +1,125 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import bindparam, delete, func, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from app.features.rendimiento.models.rendimiento import Rendimiento, rendimiento_archive
+from app.features.rendimiento.models.unit_performance_summary import UnitPerformanceSummary
+from app.features.rutas.models.ruta import Ruta, ruta_archive
+from app.shared.archive import union_archive
+
+
+class UnitPerformanceSummaryRepository:
+    def __init__(self, session: Session):
+        self.session = session
+
+    def get_by_unit_id(self, unit_id: int) -> Optional[UnitPerformanceSummary]:
+        return self.session.get(UnitPerformanceSummary, unit_id)
+
+    def apply_delta(
+        self,
+        unit_id: int,
+        routes: int = 0,
+        distance_km: float = 0.0,
+        fuel_liters: float = 0.0,
+        time_hours: float = 0.0,
+        efficiency_score: float = 0.0
+    ) -> None:
+        # No hace commit: el delta se guarda en la misma transacción que el cambio del rendimiento
+        table = UnitPerformanceSummary.__table__
+        statement = sqlite_insert(table).values(
+            unit_id=unit_id,
+            total_routes=routes,
+            total_distance_km=distance_km,
+            total_fuel_liters=fuel_liters,
+            total_time_hours=time_hours,
+            efficiency_score_sum=efficiency_score,
+            updated_at=datetime.utcnow()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.unit_id],
+            set_={
+                "total_routes": table.c.total_routes + statement.excluded.total_routes,
+                "total_distance_km": table.c.total_distance_km + statement.excluded.total_distance_km,
+                "total_fuel_liters": table.c.total_fuel_liters + statement.excluded.total_fuel_liters,
+                "total_time_hours": table.c.total_time_hours + statement.excluded.total_time_hours,
+                "efficiency_score_sum": table.c.efficiency_score_sum + statement.excluded.efficiency_score_sum,
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        self.session.execute(statement)
+
+    def apply_deltas(self, deltas: List[Dict[str, Any]]) -> None:
+        # El mismo upsert que apply_delta con executemany: se compila una sola vez para todas las unidades.
+        # Cada dict incluye unit_id, routes, distance_km, fuel_liters, time_hours y efficiency_score. No hace commit
+        if not deltas:
+            return
+        table = UnitPerformanceSummary.__table__
+        statement = sqlite_insert(table).values(
+            unit_id=bindparam("unit_id"),
+            total_routes=bindparam("routes"),
+            total_distance_km=bindparam("distance_km"),
+            total_fuel_liters=bindparam("fuel_liters"),
+            total_time_hours=bindparam("time_hours"),
+            efficiency_score_sum=bindparam("efficiency_score"),
+            updated_at=datetime.utcnow()
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.unit_id],
+            set_={
+                "total_routes": table.c.total_routes + statement.excluded.total_routes,
+                "total_distance_km": table.c.total_distance_km + statement.excluded.total_distance_km,
+                "total_fuel_liters": table.c.total_fuel_liters + statement.excluded.total_fuel_liters,
+                "total_time_hours": table.c.total_time_hours + statement.excluded.total_time_hours,
+                "efficiency_score_sum": table.c.efficiency_score_sum + statement.excluded.efficiency_score_sum,
+                "updated_at": statement.excluded.updated_at,
+            }
+        )
+        self.session.execute(statement, deltas)
+
+    def rebuild(self) -> int:
+        table = UnitPerformanceSummary.__table__
+        # Los rendimientos archivados siguen contando en el resumen de su unidad
+        rows = union_archive(
+            select(
+                route_table.c.unit_id,
+                performance_table.c.id,
+                performance_table.c.distance_traveled_km,
+                performance_table.c.fuel_consumed_liters,
+                performance_table.c.actual_time_hours,
+                performance_table.c.efficiency_score,
+            ).join(route_table, route_table.c.id == performance_table.c.route_id)
+            for performance_table, route_table in (
+                (Rendimiento.__table__, Ruta.__table__),
+                (rendimiento_archive, ruta_archive),
+            )
+        )
+        aggregates = (
+            select(
+                rows.c.unit_id,
+                func.count(rows.c.id),
+                func.sum(rows.c.distance_traveled_km),
+                func.sum(rows.c.fuel_consumed_liters),
+                func.sum(rows.c.actual_time_hours),
+                func.sum(rows.c.efficiency_score),
+                func.datetime("now"),
+            )
+            .group_by(rows.c.unit_id)
+        )
+        self.session.execute(delete(table))
+        result = self.session.execute(
+            insert(table).from_select(
+                [
+                    table.c.unit_id,
+                    table.c.total_routes,
+                    table.c.total_distance_km,
+                    table.c.total_fuel_liters,
+                    table.c.total_time_hours,
+                    table.c.efficiency_score_sum,
+                    table.c.updated_at,
+                ],
+                aggregates
+            )
+        )
+        self.session.commit()
+        return result.rowcount
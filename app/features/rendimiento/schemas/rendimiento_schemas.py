@@ -1,6 +1,7 @@
-from typing import Optional
+from typing import List, Optional
 from sqlmodel import SQLModel
 from datetime import datetime
+from enum import Enum
 
 
 class RendimientoBase(SQLModel):
@@ -31,3 +32,53 @@ class RendimientoRead(RendimientoBase):
     recorded_at: datetime
     created_at: datetime
     updated_at: Optional[datetime]
+
+
+class StatsGroupBy(str, Enum):
+    UNIT = "unit"
+    MONTH = "month"
+    STATUS = "status"
+
+
+class RendimientoStats(SQLModel):
+    key: str
+    license_plate: Optional[str] = None
+    count: int
+    avg_efficiency_score: float
+    min_efficiency_score: float
+    max_efficiency_score: float
+    avg_fuel_efficiency_km_per_liter: float
+    min_fuel_efficiency_km_per_liter: float
+    max_fuel_efficiency_km_per_liter: float
+    avg_time_efficiency: float
+    min_time_efficiency: float
+    max_time_efficiency: float
+    total_distance_km: float
+    total_fuel_liters: float
+
+
+class UnitPerformanceSummaryRead(SQLModel):
+    unit_id: int
+    total_routes: int
+    total_distance_km: float
+    total_fuel_liters: float
+    total_time_hours: float
+    average_efficiency_score: float
+    updated_at: Optional[datetime]
+
+
+class MetricsRecomputeScheduled(SQLModel):
+    detail: str
+    chunk_size: int
+
+
+class RendimientoImportError(SQLModel):
+    line: int
+    status_code: int
+    detail: str
+
+
+class RendimientoImportResult(SQLModel):
+    processed: int
+    created: int
+    errors: List[RendimientoImportError]
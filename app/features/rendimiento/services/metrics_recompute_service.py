@@ -0,0 +1,84 @@
+from typing import Dict, List
+import numpy as np
+from sqlmodel import Session
+from app.core.db.session import engine
+from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+
+
+class MetricsRecomputeService:
+    def __init__(
+        self,
+        repository: RendimientoRepository,
+        summary_repository: UnitPerformanceSummaryRepository
+    ):
+        self.repository = repository
+        self.summary_repository = summary_repository
+
+    @staticmethod
+    def calculate_metrics_batch(
+        distance_traveled_km: np.ndarray,
+        fuel_consumed_liters: np.ndarray,
+        actual_time_hours: np.ndarray,
+        estimated_time_hours: np.ndarray
+    ) -> Dict[str, List[float]]:
+        # Misma fórmula y orden de operaciones que RendimientoService._calculate_metrics
+        with np.errstate(divide="ignore", invalid="ignore"):
+            average_speed_kmh = np.where(
+                actual_time_hours > 0, distance_traveled_km / actual_time_hours, 0.0
+            )
+            fuel_efficiency_km_per_liter = np.where(
+                fuel_consumed_liters > 0, distance_traveled_km / fuel_consumed_liters, 0.0
+            )
+            time_efficiency = np.where(
+                estimated_time_hours > 0, (estimated_time_hours / actual_time_hours) * 100, 100.0
+            )
+        time_efficiency = np.clip(time_efficiency, 0, 100)
+        efficiency_score = (time_efficiency + np.minimum(100, fuel_efficiency_km_per_liter * 10)) / 2
+
+        # np.round no redondea igual que round() en todos los casos; el redondeo final
+        # se hace con round() para que los valores coincidan exactamente con el cálculo por fila
+        return {
+            "average_speed_kmh": [round(value, 2) for value in average_speed_kmh.tolist()],
+            "fuel_efficiency_km_per_liter": [round(value, 2) for value in fuel_efficiency_km_per_liter.tolist()],
+            "time_efficiency": [round(value, 2) for value in time_efficiency.tolist()],
+            "efficiency_score": [round(value, 2) for value in efficiency_score.tolist()],
+        }
+
+    def recompute_all(self, chunk_size: int = 10000) -> int:
+        processed = 0
+        after_id = 0
+        while True:
+            rows = self.repository.get_metric_inputs(after_id, chunk_size)
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            data = np.array([row[1:] for row in rows], dtype=np.float64)
+            metrics = self.calculate_metrics_batch(data[:, 0], data[:, 1], data[:, 2], data[:, 3])
+
+            self.repository.bulk_update_metrics([
+                {
+                    "rendimiento_id": rendimiento_id,
+                    "average_speed_kmh": metrics["average_speed_kmh"][index],
+                    "fuel_efficiency_km_per_liter": metrics["fuel_efficiency_km_per_liter"][index],
+                    "time_efficiency": metrics["time_efficiency"][index],
+                    "efficiency_score": metrics["efficiency_score"][index],
+                }
+                for index, rendimiento_id in enumerate(ids)
+            ])
+            processed += len(ids)
+            after_id = ids[-1]
+
+        # El resumen por unidad acumula efficiency_score, así que se reconstruye al terminar
+        self.summary_repository.rebuild()
+        return processed
+
+
+def run_metrics_recompute(chunk_size: int = 10000) -> int:
+    with Session(engine) as session:
+        service = MetricsRecomputeService(
+            RendimientoRepository(session),
+            UnitPerformanceSummaryRepository(session)
+        )
+        return service.recompute_all(chunk_size)
@@ -0,0 +1,76 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from app.core.db.runner import AsyncService
+from app.features.rendimiento.models.rendimiento import Rendimiento
+from app.features.rendimiento.schemas.rendimiento_schemas import (
+    RendimientoCreate, RendimientoStats, RendimientoUpdate, StatsGroupBy
+)
+from app.shared.pagination import Page
+from app.features.rendimiento.services.rendimiento_service import RendimientoService
+
+
+class AsyncRendimientoService(AsyncService[RendimientoService]):
+    async def create_rendimiento(self, rendimiento_create: RendimientoCreate) -> Rendimiento:
+        return await self.runner.call(self.service.create_rendimiento, rendimiento_create)
+
+    async def get_rendimiento_by_id(self, rendimiento_id: int, include_archived: bool = False) -> Optional[Rendimiento]:
+        return await self.runner.call(self.service.get_rendimiento_by_id, rendimiento_id, include_archived)
+
+    async def get_rendimiento_version(self, rendimiento_id: int, include_archived: bool = False) -> Optional[datetime]:
+        return await self.runner.call(self.service.get_rendimiento_version, rendimiento_id, include_archived)
+
+    async def get_rendimiento_by_route(self, route_id: int, include_archived: bool = False) -> Optional[Rendimiento]:
+        return await self.runner.call(self.service.get_rendimiento_by_route, route_id, include_archived)
+
+    async def get_all_rendimientos(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        include_archived: bool = False
+    ) -> Sequence[Rendimiento]:
+        return await self.runner.call(self.service.get_all_rendimientos, offset, limit, include_archived)
+
+    async def get_all_rendimientos_rows(
+        self,
+        offset: int = 0,
+        limit: int = 100,
+        include_archived: bool = False
+    ) -> List[Dict[str, Any]]:
+        return await self.runner.call(self.service.get_all_rendimientos_rows, offset, limit, include_archived)
+
+    async def count_rendimientos(self, include_archived: bool = False) -> int:
+        return await self.runner.call(self.service.count_rendimientos, include_archived)
+
+    async def get_rendimientos_page(self, cursor: str, limit: int = 100, include_archived: bool = False) -> Page:
+        return await self.runner.call(self.service.get_rendimientos_page, cursor, limit, include_archived)
+
+    async def get_rendimientos_page_rows(self, cursor: str, limit: int = 100, include_archived: bool = False) -> Page:
+        return await self.runner.call(self.service.get_rendimientos_page_rows, cursor, limit, include_archived)
+
+    async def get_stats(
+        self,
+        group_by: StatsGroupBy,
+        unit_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        include_archived: bool = False
+    ) -> List[RendimientoStats]:
+        return await self.runner.call(self.service.get_stats, group_by, unit_id, date_from, date_to, include_archived)
+
+    async def validate_export_filters(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> None:
+        await self.runner.call(self.service.validate_export_filters, date_from, date_to)
+
+    async def update_rendimiento(
+        self,
+        rendimiento_id: int,
+        rendimiento_update: RendimientoUpdate,
+        if_match: Optional[str] = None
+    ) -> Optional[Rendimiento]:
+        return await self.runner.call(self.service.update_rendimiento, rendimiento_id, rendimiento_update, if_match)
+
+    async def delete_rendimiento(self, rendimiento_id: int) -> bool:
+        return await self.runner.call(self.service.delete_rendimiento, rendimiento_id)
@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Iterator, Optional
+from sqlmodel import Session
+from app.core.db.session import read_engine
+from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
+from app.shared.export import EXPORT_BATCH_SIZE, ExportFormat, encode_rows
+
+
+def export_rendimientos(
+    export_format: ExportFormat,
+    unit_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None
+) -> Iterator[bytes]:
+    with Session(read_engine) as session:
+        result = RendimientoRepository(session).iter_export(unit_id, date_from, date_to, EXPORT_BATCH_SIZE)
+        yield from encode_rows(list(result.keys()), result, export_format)
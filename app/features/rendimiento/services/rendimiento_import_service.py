@@ -0,0 +1,25 @@
+from typing import Iterable
+from sqlmodel import Session
+from app.core.db.session import engine
+from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.schemas.rendimiento_schemas import RendimientoImportResult
+from app.features.rendimiento.services.rendimiento_service import RendimientoService
+from app.features.rutas.repositories.ruta_repository import RutaRepository
+from app.shared.file_import import IMPORT_CHUNK_SIZE, ImportFormat
+
+
+def run_rendimiento_import(
+    raw_lines: Iterable[bytes],
+    import_format: ImportFormat,
+    chunk_size: int = IMPORT_CHUNK_SIZE
+) -> RendimientoImportResult:
+    # Se llama con run_in_threadpool y una sesión síncrona propia: leer el archivo, validar y escribir en lotes
+    # dura segundos, y con DB_ASYNC run_sync lo ejecutaría en el hilo del event loop
+    with Session(engine) as session:
+        service = RendimientoService(
+            RendimientoRepository(session),
+            RutaRepository(session),
+            UnitPerformanceSummaryRepository(session)
+        )
+        return service.import_rendimientos(raw_lines, import_format, chunk_size)
@@ -1,20 +1,37 @@
-from typing import Optional, Sequence, Any
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Any
 from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
-from app.features.rendimiento.schemas.rendimiento_schemas import RendimientoCreate, RendimientoUpdate
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.schemas.rendimiento_schemas import (
+    RendimientoBase, RendimientoCreate, RendimientoUpdate, RendimientoStats, StatsGroupBy,
+    RendimientoImportError, RendimientoImportResult
+)
 from app.features.rendimiento.models.rendimiento import Rendimiento
 from app.features.rutas.repositories.ruta_repository import RutaRepository
-from app.features.rutas.models.ruta import RouteStatus
+from app.features.rutas.models.ruta import Ruta, RouteStatus
+from app.shared.etag import check_if_match, precondition_failed
+from app.shared.file_import import IMPORT_CHUNK_SIZE, ImportFormat, ParsedRecord, chunked, parse_records
+from app.shared.integrity import raise_unique_violation
+from app.shared.pagination import Page, build_page, decode_cursor
+
+RENDIMIENTO_UNIQUE_MESSAGES = {
+    "rendimiento.route_id": "Ya existe un registro de rendimiento para esta ruta",
+}
 
 
 class RendimientoService:
     def __init__(
         self, 
         repository: RendimientoRepository,
-        ruta_repository: RutaRepository
+        ruta_repository: RutaRepository,
+        summary_repository: UnitPerformanceSummaryRepository
     ):
         self.repository = repository
         self.ruta_repository = ruta_repository
+        self.summary_repository = summary_repository
 
     def _calculate_metrics(
         self,
@@ -46,8 +63,12 @@ class RendimientoService:
             "efficiency_score": round(efficiency_score, 2)
         }
 
-    def create_rendimiento(self, rendimiento_create: RendimientoCreate) -> Rendimiento:
-        ruta = self.ruta_repository.get_by_id(rendimiento_create.route_id)
+    def _validate_rendimiento_create(
+        self,
+        rendimiento_create: RendimientoCreate,
+        ruta: Optional[Ruta],
+        already_recorded: bool
+    ) -> None:
         if not ruta:
             raise HTTPException(status_code=404, detail="Ruta no encontrada")
 
@@ -57,8 +78,7 @@ class RendimientoService:
                 detail=f"El rendimiento solo puede ser guardado para rutas completadas."
             )
 
-        existing_rendimiento = self.repository.get_by_route_id(rendimiento_create.route_id)
-        if existing_rendimiento:
+        if already_recorded:
             raise HTTPException(
                 status_code=400, 
                 detail="Ya existe un registro de rendimiento para esta ruta"
@@ -73,6 +93,14 @@ class RendimientoService:
         if rendimiento_create.actual_time_hours <= 0:
             raise HTTPException(status_code=400, detail="El tiempo actual debe ser mayor a 0")
 
+    def create_rendimiento(self, rendimiento_create: RendimientoCreate) -> Rendimiento:
+        ruta = self.ruta_repository.get_cached(rendimiento_create.route_id)
+        if ruta and ruta.status != RouteStatus.COMPLETADA:
+            # COMPLETADA es final; cualquier otro estado en cache puede haber cambiado en otro proceso
+            ruta = self.ruta_repository.get_by_id(rendimiento_create.route_id)
+        # La unicidad de route_id la garantiza el índice único: no se consulta antes de insertar
+        self._validate_rendimiento_create(rendimiento_create, ruta, already_recorded=False)
+
         metrics = self._calculate_metrics(
             rendimiento_create.distance_traveled_km,
             rendimiento_create.fuel_consumed_liters,
@@ -80,40 +108,187 @@ class RendimientoService:
             ruta
         )
 
-        db_rendimiento = Rendimiento(
-            route_id=rendimiento_create.route_id,
-            distance_traveled_km=rendimiento_create.distance_traveled_km,
-            fuel_consumed_liters=rendimiento_create.fuel_consumed_liters,
-            actual_time_hours=rendimiento_create.actual_time_hours,
-            notes=rendimiento_create.notes,
-            **metrics
+        # El delta se aplica primero: el commit de create guarda ambos en la misma transacción
+        # y, si el insert viola la restricción, el rollback también lo revierte
+        self.summary_repository.apply_delta(
+            ruta.unit_id,
+            routes=1,
+            distance_km=rendimiento_create.distance_traveled_km,
+            fuel_liters=rendimiento_create.fuel_consumed_liters,
+            time_hours=rendimiento_create.actual_time_hours,
+            efficiency_score=metrics["efficiency_score"]
         )
+        try:
+            return self.repository.create(rendimiento_create, metrics)
+        except IntegrityError as exc:
+            raise_unique_violation(exc, RENDIMIENTO_UNIQUE_MESSAGES)
+
+    def import_rendimientos(
+        self,
+        raw_lines: Iterable[bytes],
+        import_format: ImportFormat,
+        chunk_size: int = IMPORT_CHUNK_SIZE
+    ) -> RendimientoImportResult:
+        processed = 0
+        created = 0
+        errors: List[RendimientoImportError] = []
+        records = parse_records(raw_lines, import_format, list(RendimientoBase.model_fields))
+        for chunk in chunked(records, chunk_size):
+            processed += len(chunk)
+            created += self._import_chunk(chunk, errors)
+        errors.sort(key=lambda error: error.line)
+        return RendimientoImportResult(processed=processed, created=created, errors=errors)
+
+    def _import_chunk(self, chunk: List[ParsedRecord], errors: List[RendimientoImportError]) -> int:
+        candidates = []
+        for record in chunk:
+            if record.error:
+                errors.append(RendimientoImportError(line=record.line, status_code=400, detail=record.error))
+                continue
+            try:
+                candidates.append((record.line, RendimientoCreate.model_validate(record.data)))
+            except ValidationError as exc:
+                errors.append(RendimientoImportError(line=record.line, status_code=400, detail=_validation_detail(exc)))
+
+        # Dos consultas IN por lote en lugar de dos consultas por registro
+        route_ids = [rendimiento_create.route_id for _, rendimiento_create in candidates]
+        rutas = {ruta.id: ruta for ruta in self.ruta_repository.get_by_ids(route_ids)}
+        recorded = self.repository.get_existing_route_ids(route_ids)
+
+        pending = {}
+        now = datetime.utcnow()
+        for line, rendimiento_create in candidates:
+            ruta = rutas.get(rendimiento_create.route_id)
+            try:
+                self._validate_rendimiento_create(rendimiento_create, ruta, rendimiento_create.route_id in recorded)
+            except HTTPException as exc:
+                errors.append(RendimientoImportError(line=line, status_code=exc.status_code, detail=exc.detail))
+                continue
+            # Una ruta repetida en el archivo se rechaza igual que una ya registrada
+            recorded.add(rendimiento_create.route_id)
+
+            metrics = self._calculate_metrics(
+                rendimiento_create.distance_traveled_km,
+                rendimiento_create.fuel_consumed_liters,
+                rendimiento_create.actual_time_hours,
+                ruta
+            )
+            row = {**rendimiento_create.model_dump(), **metrics, "recorded_at": now, "created_at": now}
+            pending[rendimiento_create.route_id] = (line, ruta.unit_id, row)
+
+        inserted = self.repository.create_many_skip_existing([row for _, _, row in pending.values()])
+
+        # Los deltas del resumen se acumulan por unidad y se aplican en un solo executemany por lote
+        deltas: Dict[int, Dict[str, float]] = {}
+        for route_id, (line, unit_id, row) in pending.items():
+            if route_id not in inserted:
+                errors.append(RendimientoImportError(
+                    line=line, status_code=400, detail="Ya existe un registro de rendimiento para esta ruta"
+                ))
+                continue
+            delta = deltas.setdefault(unit_id, {
+                "unit_id": unit_id, "routes": 0, "distance_km": 0.0, "fuel_liters": 0.0,
+                "time_hours": 0.0, "efficiency_score": 0.0
+            })
+            delta["routes"] += 1
+            delta["distance_km"] += row["distance_traveled_km"]
+            delta["fuel_liters"] += row["fuel_consumed_liters"]
+            delta["time_hours"] += row["actual_time_hours"]
+            delta["efficiency_score"] += row["efficiency_score"]
+        self.summary_repository.apply_deltas(list(deltas.values()))
 
-        self.repository.session.add(db_rendimiento)
         self.repository.session.commit()
-        self.repository.session.refresh(db_rendimiento)
-        return db_rendimiento
+        return len(inserted)
+
+    def get_rendimiento_by_id(self, rendimiento_id: int, include_archived: bool = False) -> Optional[Rendimiento]:
+        rendimiento = self.repository.get_by_id(rendimiento_id)
+        if not rendimiento and include_archived:
+            rendimiento = self.repository.get_archived_by_id(rendimiento_id)
+        return rendimiento
 
-    def get_rendimiento_by_id(self, rendimiento_id: int) -> Optional[Rendimiento]:
-        return self.repository.get_by_id(rendimiento_id)
+    def get_rendimiento_version(self, rendimiento_id: int, include_archived: bool = False) -> Optional[datetime]:
+        version = self.repository.get_version(rendimiento_id)
+        if version is None and include_archived:
+            rendimiento = self.repository.get_archived_by_id(rendimiento_id)
+            version = (rendimiento.updated_at or rendimiento.created_at) if rendimiento else None
+        return version
 
-    def get_rendimiento_by_route(self, route_id: int) -> Optional[Rendimiento]:
-        ruta = self.ruta_repository.get_by_id(route_id)
+    def get_rendimiento_by_route(self, route_id: int, include_archived: bool = False) -> Optional[Rendimiento]:
+        ruta = self.ruta_repository.get_cached(route_id)
+        if not ruta and include_archived and self.ruta_repository.get_archived_by_id(route_id):
+            return self.repository.get_archived_by_route_id(route_id)
         if not ruta:
             raise HTTPException(status_code=404, detail="Ruta no encontrada")
         return self.repository.get_by_route_id(route_id)
 
-    def get_all_rendimientos(self, offset: int = 0, limit: int = 100) -> Sequence[Rendimiento]:
+    def get_all_rendimientos(
+        self, offset: int = 0, limit: int = 100, include_archived: bool = False
+    ) -> Sequence[Rendimiento]:
+        if include_archived:
+            return self.repository.get_with_archived(None, offset, limit)
         return self.repository.get_all(offset, limit)
 
+    def get_all_rendimientos_rows(
+        self, offset: int = 0, limit: int = 100, include_archived: bool = False
+    ) -> List[Dict[str, Any]]:
+        if include_archived:
+            return self.repository.get_with_archived_rows(None, offset, limit)
+        return self.repository.get_all_rows(offset, limit)
+
+    def count_rendimientos(self, include_archived: bool = False) -> int:
+        return self.repository.count(include_archived)
+
+    def get_rendimientos_page(self, cursor: str, limit: int = 100, include_archived: bool = False) -> Page:
+        after_id = decode_cursor(cursor).get("id")
+        if include_archived:
+            rendimientos = self.repository.get_with_archived(after_id, 0, limit + 1)
+        else:
+            rendimientos = self.repository.get_page(after_id, limit + 1)
+        return build_page(rendimientos, limit, lambda rendimiento: {"id": rendimiento.id})
+
+    def get_rendimientos_page_rows(self, cursor: str, limit: int = 100, include_archived: bool = False) -> Page:
+        after_id = decode_cursor(cursor).get("id")
+        if include_archived:
+            rows = self.repository.get_with_archived_rows(after_id, 0, limit + 1)
+        else:
+            rows = self.repository.get_page_rows(after_id, limit + 1)
+        return build_page(rows, limit, lambda row: {"id": row["id"]})
+
+    def get_stats(
+        self,
+        group_by: StatsGroupBy,
+        unit_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        include_archived: bool = False
+    ) -> List[RendimientoStats]:
+        if date_from and date_to and date_from >= date_to:
+            raise HTTPException(status_code=400, detail="La fecha inicial debe ser menor a la fecha final")
+
+        rows = self.repository.get_stats(group_by, unit_id, date_from, date_to, include_archived)
+        return [
+            RendimientoStats(**{**row, "key": row["key"].value if group_by == StatsGroupBy.STATUS else str(row["key"])})
+            for row in rows
+        ]
+
+    def validate_export_filters(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> None:
+        if date_from and date_to and date_from >= date_to:
+            raise HTTPException(status_code=400, detail="La fecha inicial debe ser menor a la fecha final")
+
     def update_rendimiento(
         self, 
         rendimiento_id: int, 
-        rendimiento_update: RendimientoUpdate
+        rendimiento_update: RendimientoUpdate,
+        if_match: Optional[str] = None
     ) -> Optional[Rendimiento]:
         rendimiento = self.repository.get_by_id(rendimiento_id)
         if not rendimiento:
             raise HTTPException(status_code=404, detail="Rendimiento no encontrado")
+        expected_version = check_if_match(if_match, rendimiento)
 
         if rendimiento_update.distance_traveled_km is not None:
             if rendimiento_update.distance_traveled_km <= 0:
@@ -129,6 +304,7 @@ class RendimientoService:
 
         update_data = rendimiento_update.model_dump(exclude_unset=True)
 
+        metrics = None
         needs_recalc = False
         for key in ["distance_traveled_km", "fuel_consumed_liters", "actual_time_hours"]:
             if key in update_data:
@@ -136,24 +312,56 @@ class RendimientoService:
                 break
 
         if needs_recalc:
-            ruta = self.ruta_repository.get_by_id(rendimiento.route_id)
+            ruta = self.ruta_repository.get_cached(rendimiento.route_id)
             distance = update_data.get("distance_traveled_km", rendimiento.distance_traveled_km)
             fuel = update_data.get("fuel_consumed_liters", rendimiento.fuel_consumed_liters)
             time_hours = update_data.get("actual_time_hours", rendimiento.actual_time_hours)
 
             metrics = self._calculate_metrics(distance, fuel, time_hours, ruta)
-            update_data.update(metrics)
 
-        for key, value in update_data.items():
-            setattr(rendimiento, key, value)
+            self.summary_repository.apply_delta(
+                ruta.unit_id,
+                distance_km=distance - rendimiento.distance_traveled_km,
+                fuel_liters=fuel - rendimiento.fuel_consumed_liters,
+                time_hours=time_hours - rendimiento.actual_time_hours,
+                efficiency_score=metrics["efficiency_score"] - rendimiento.efficiency_score
+            )
 
-        self.repository.session.add(rendimiento)
-        self.repository.session.commit()
-        self.repository.session.refresh(rendimiento)
-        return rendimiento
+        # Siempre condicionado a la versión leída, haya If-Match o no: el delta se calculó contra esa versión y sin
+        # fila el repositorio revierte el delta junto con el UPDATE
+        updated = self.repository.update(
+            rendimiento, rendimiento_update, metrics, rendimiento.updated_at or rendimiento.created_at
+        )
+        if updated is not None:
+            return updated
+        if expected_version is not None:
+            raise precondition_failed()
+        if self.repository.get_version(rendimiento_id) is None:
+            return None
+        raise HTTPException(status_code=409, detail="El rendimiento cambió durante la solicitud; vuelva a intentarlo")
 
     def delete_rendimiento(self, rendimiento_id: int) -> bool:
-        rendimiento = self.repository.get_by_id(rendimiento_id)
-        if not rendimiento:
+        deleted = self.repository.delete(rendimiento_id)
+        if deleted is None:
             raise HTTPException(status_code=404, detail="Rendimiento no encontrado")
-        return self.repository.delete(rendimiento)
+
+        # Con la fila devuelta por el DELETE: dos eliminaciones simultáneas no restan el mismo registro dos veces
+        if deleted.unit_id is not None:
+            self.summary_repository.apply_delta(
+                deleted.unit_id,
+                routes=-1,
+                distance_km=-deleted.distance_traveled_km,
+                fuel_liters=-deleted.fuel_consumed_liters,
+                time_hours=-deleted.actual_time_hours,
+                efficiency_score=-deleted.efficiency_score
+            )
+        self.repository.session.commit()
+        return True
+
+
+def _validation_detail(exc: ValidationError) -> str:
+    fields = []
+    for error in exc.errors():
+        field = ".".join(str(part) for part in error["loc"])
+        fields.append(f"{field} (requerido)" if error["type"] == "missing" else field)
+    return f"Valores inválidos: {', '.join(fields)}"
@@ -1,58 +1,205 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Sequence, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from typing import List, Sequence, Optional, Union
+from app.core.config.settings import settings
 from app.features.rutas.api.dependencies import get_ruta_service
-from app.features.rutas.services.ruta_service import RutaService
-from app.features.rutas.schemas.ruta_schemas import RutaCreate, RutaUpdate, RutaStatusUpdate, RutaRead
+from app.features.rutas.services.ruta_async_service import AsyncRutaService
+from app.features.rutas.services.ruta_export_service import export_rutas
+from app.features.rutas.services.ruta_event_service import subscribe_ruta_events, validate_event_filters
+from app.features.rutas.schemas.ruta_schemas import (
+    RutaCreate, RutaUpdate, RutaStatusUpdate, RutaRead, RutaBulkCreate, RutaBulkResult, RutaFullRead,
+    RutaBulkStatusUpdate, RutaBulkStatusResult, RutaLocationSuggestion
+)
 from app.features.rutas.models.ruta import Ruta, RouteStatus
+from app.shared.archive import INCLUDE_ARCHIVED_DESCRIPTION
+from app.shared.event_stream import (
+    LAST_EVENT_ID_DESCRIPTION, event_stream_response, parse_last_event_id, send_websocket_events
+)
+from app.shared.etag import IF_MATCH_DESCRIPTION, IF_NONE_MATCH_DESCRIPTION, etag_for, not_modified_response
+from app.shared.export import ExportFormat, export_response
+from app.shared.fast_json import fast_json_response
+from app.shared.pagination import CURSOR_DESCRIPTION, TOTAL_COUNT_HEADER, WITH_COUNT_DESCRIPTION, Page
 
 router = APIRouter(prefix="/routes", tags=["routes"])
 
 
 @router.post("", response_model=RutaRead, status_code=201)
-def create_ruta(ruta_create: RutaCreate, service: RutaService = Depends(get_ruta_service)) -> Ruta:
-    return service.create_ruta(ruta_create)
+async def create_ruta(ruta_create: RutaCreate, service: AsyncRutaService = Depends(get_ruta_service)) -> Ruta:
+    return await service.create_ruta(ruta_create)
 
 
-@router.get("", response_model=Sequence[RutaRead])
-def get_rutas(
+@router.post("/bulk", response_model=RutaBulkResult)
+async def create_rutas_bulk(bulk_create: RutaBulkCreate, service: AsyncRutaService = Depends(get_ruta_service)) -> RutaBulkResult:
+    return await service.create_rutas_bulk(bulk_create)
+
+
+@router.patch("/status", response_model=RutaBulkStatusResult)
+async def update_rutas_status(
+    bulk_update: RutaBulkStatusUpdate, service: AsyncRutaService = Depends(get_ruta_service)
+) -> RutaBulkStatusResult:
+    # Un solo UPDATE condicional para todas las rutas; el resultado reporta cada id que no cambió
+    return await service.update_rutas_status(bulk_update)
+
+
+@router.get("", response_model=Union[Sequence[RutaRead], Page[RutaRead]])
+async def get_rutas(
+    response: Response,
+    status: Optional[RouteStatus] = Query(default=None, description="Filtrar por estado de la ruta (ASIGNADA, EN_RUTA, COMPLETADA, CANCELADA)"),
+    unit_id: Optional[int] = Query(default=None, description="Filtrar por ID de unidad asignada"),
+    offset: int = Query(default=0, ge=0, description="Número de registros a saltar (paginación)"),
+    limit: int = Query(default=100, ge=1, le=100, description="Número máximo de registros a devolver"),
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    include_archived: bool = Query(default=False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    with_count: bool = Query(default=False, description=WITH_COUNT_DESCRIPTION),
+    q: Optional[str] = Query(default=None, min_length=1, max_length=255, description="Buscar por palabras o prefijos en origen y destino (sin distinguir acentos ni mayúsculas)"),
+    service: AsyncRutaService = Depends(get_ruta_service)
+) -> Union[Sequence[Ruta], Page]:
+    if with_count:
+        response.headers[TOTAL_COUNT_HEADER] = str(await service.count_rutas(status, unit_id, include_archived, q))
+    if settings.FAST_LIST_RESPONSES:
+        if cursor is not None:
+            page = await service.get_rutas_page_rows(status, unit_id, cursor, limit, include_archived, q)
+            return fast_json_response(dict(page), response)
+        return fast_json_response(
+            await service.get_all_rutas_rows(status, unit_id, offset, limit, include_archived, q), response
+        )
+    if cursor is not None:
+        return await service.get_rutas_page(status, unit_id, cursor, limit, include_archived, q)
+    return await service.get_all_rutas(status, unit_id, offset, limit, include_archived, q)
+
+
+@router.get("/locations/suggest", response_model=List[RutaLocationSuggestion])
+async def suggest_locations(
+    prefix: str = Query(min_length=1, max_length=100, description="Inicio del nombre de la ciudad o ubicación"),
+    limit: int = Query(default=10, ge=1, le=50, description="Número máximo de sugerencias"),
+    service: AsyncRutaService = Depends(get_ruta_service)
+) -> List[RutaLocationSuggestion]:
+    # Responde desde el índice de ubicaciones distintas, ordenadas por número de rutas en vivo
+    return await service.suggest_locations(prefix, limit)
+
+
+@router.get("/full", response_model=Union[List[RutaFullRead], Page[RutaFullRead]])
+async def get_rutas_full(
+    response: Response,
     status: Optional[RouteStatus] = Query(default=None, description="Filtrar por estado de la ruta (ASIGNADA, EN_RUTA, COMPLETADA, CANCELADA)"),
     unit_id: Optional[int] = Query(default=None, description="Filtrar por ID de unidad asignada"),
     offset: int = Query(default=0, ge=0, description="Número de registros a saltar (paginación)"),
     limit: int = Query(default=100, ge=1, le=100, description="Número máximo de registros a devolver"),
-    service: RutaService = Depends(get_ruta_service)
-) -> Sequence[Ruta]:
-    return service.get_all_rutas(status, unit_id, offset, limit)
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    with_count: bool = Query(default=False, description=WITH_COUNT_DESCRIPTION),
+    service: AsyncRutaService = Depends(get_ruta_service)
+) -> Union[List[RutaFullRead], Page]:
+    if with_count:
+        response.headers[TOTAL_COUNT_HEADER] = str(await service.count_rutas(status, unit_id))
+    # Cada ruta con su unidad, conductor y rendimiento en una sola consulta
+    if cursor is not None:
+        return await service.get_rutas_full_page(status, unit_id, cursor, limit)
+    return await service.get_all_rutas_full(status, unit_id, offset, limit)
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_rutas_endpoint(
+    format: ExportFormat = Query(default=ExportFormat.CSV, description="Formato de exportación: csv o ndjson"),
+    status: Optional[RouteStatus] = Query(default=None, description="Filtrar por estado de la ruta (ASIGNADA, EN_RUTA, COMPLETADA, CANCELADA)"),
+    unit_id: Optional[int] = Query(default=None, description="Filtrar por ID de unidad asignada"),
+    service: AsyncRutaService = Depends(get_ruta_service)
+) -> StreamingResponse:
+    await service.validate_export_filters(unit_id)
+    return export_response(export_rutas(format, status, unit_id), format, "rutas")
+
+
+STREAM_STATUS_DESCRIPTION = (
+    "Filtrar por el estado nuevo de la ruta (se puede repetir); para ver salir las rutas de un estado incluir "
+    "también los estados destino"
+)
+
+
+@router.get("/stream", response_class=StreamingResponse)
+async def stream_rutas(
+    status: Optional[List[RouteStatus]] = Query(default=None, description=STREAM_STATUS_DESCRIPTION),
+    unit_id: Optional[int] = Query(default=None, description="Filtrar por ID de unidad asignada"),
+    last_event_id: Optional[str] = Header(default=None, description=LAST_EVENT_ID_DESCRIPTION)
+) -> StreamingResponse:
+    # Server-Sent Events con las altas y cambios de estado confirmados, en lugar de consultar GET /routes
+    await run_in_threadpool(validate_event_filters, unit_id)
+    subscription = subscribe_ruta_events(status, unit_id, parse_last_event_id(last_event_id))
+    return event_stream_response(subscription, settings.EVENT_HEARTBEAT_SECONDS)
+
+
+@router.websocket("/ws")
+async def rutas_websocket(
+    websocket: WebSocket,
+    status: Optional[List[RouteStatus]] = Query(default=None),
+    unit_id: Optional[int] = Query(default=None),
+    last_event_id: Optional[str] = Query(default=None)
+) -> None:
+    # Mismos eventos que /routes/stream; el navegador no puede enviar headers en un WebSocket, así que el
+    # último id va en la query
+    try:
+        await run_in_threadpool(validate_event_filters, unit_id)
+    except HTTPException as exc:
+        await websocket.close(code=1008, reason=exc.detail)
+        return
+    await websocket.accept()
+    subscription = subscribe_ruta_events(status, unit_id, parse_last_event_id(last_event_id))
+    await send_websocket_events(websocket, subscription, settings.EVENT_HEARTBEAT_SECONDS)
+
 
 @router.get("/{ruta_id}", response_model=RutaRead)
-def get_ruta(ruta_id: int, service: RutaService = Depends(get_ruta_service)) -> Ruta:
-    ruta = service.get_ruta_by_id(ruta_id)
+async def get_ruta(
+    ruta_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None, description=IF_NONE_MATCH_DESCRIPTION),
+    include_archived: bool = Query(default=False, description=INCLUDE_ARCHIVED_DESCRIPTION),
+    service: AsyncRutaService = Depends(get_ruta_service)
+) -> Ruta:
+    if if_none_match:
+        cached = not_modified_response(
+            if_none_match, ruta_id, await service.get_ruta_version(ruta_id, include_archived)
+        )
+        if cached:
+            return cached
+    ruta = await service.get_ruta_by_id(ruta_id, include_archived)
     if not ruta:
         raise HTTPException(status_code=404, detail="Ruta no encontrada")
+    response.headers["ETag"] = etag_for(ruta)
     return ruta
 
+
+@router.get("/{ruta_id}/full", response_model=RutaFullRead)
+async def get_ruta_full(ruta_id: int, service: AsyncRutaService = Depends(get_ruta_service)) -> RutaFullRead:
+    return await service.get_ruta_full(ruta_id)
+
 @router.patch("/{ruta_id}", response_model=RutaRead)
-def update_ruta(
+async def update_ruta(
     ruta_id: int,
     ruta_update: RutaUpdate,
-    service: RutaService = Depends(get_ruta_service)
+    response: Response,
+    if_match: Optional[str] = Header(default=None, description=IF_MATCH_DESCRIPTION),
+    service: AsyncRutaService = Depends(get_ruta_service)
 ) -> Ruta:
-    ruta = service.update_ruta(ruta_id, ruta_update)
+    ruta = await service.update_ruta(ruta_id, ruta_update, if_match)
     if not ruta:
         raise HTTPException(status_code=404, detail="Ruta no encontrada")
+    response.headers["ETag"] = etag_for(ruta)
     return ruta
 
 @router.patch("/{ruta_id}/status", response_model=RutaRead)
-def update_ruta_status(
+async def update_ruta_status(
     ruta_id: int,
     status_update: RutaStatusUpdate,
-    service: RutaService = Depends(get_ruta_service)
+    response: Response,
+    if_match: Optional[str] = Header(default=None, description=IF_MATCH_DESCRIPTION),
+    service: AsyncRutaService = Depends(get_ruta_service)
 ) -> Ruta:
-    ruta = service.update_ruta_status(ruta_id, status_update)
+    ruta = await service.update_ruta_status(ruta_id, status_update, if_match)
     if not ruta:
         raise HTTPException(status_code=404, detail="Ruta no encontrada")
+    response.headers["ETag"] = etag_for(ruta)
     return ruta
 
 
 @router.delete("/{ruta_id}", status_code=204)
-def delete_ruta(ruta_id: int, service: RutaService = Depends(get_ruta_service)) -> None:
-    service.delete_ruta(ruta_id)
+async def delete_ruta(ruta_id: int, service: AsyncRutaService = Depends(get_ruta_service)) -> None:
+    await service.delete_ruta(ruta_id)
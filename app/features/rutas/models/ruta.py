@@ -1,8 +1,10 @@
 from datetime import datetime
 from typing import Optional
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 from enum import Enum
 from app.core.db.base import Base
+from app.shared.archive import archive_table
 
 
 class RouteStatus(str, Enum):
@@ -12,7 +14,20 @@ class RouteStatus(str, Enum):
     CANCELADA = "CANCELADA"
 
 
+# Estados finales: el job de retención solo archiva rutas en estos estados
+FINISHED_STATUSES = (RouteStatus.COMPLETADA, RouteStatus.CANCELADA)
+
+
 class Ruta(Base, table=True):
+    # Índices alineados con los filtros de RutaRepository.get_all/get_page:
+    # status + orden por id, y unit_id + status + orden por id
+    __table_args__ = (
+        Index("ix_ruta_status_id", "status", "id"),
+        Index("ix_ruta_unit_id_status_id", "unit_id", "status", "id"),
+        # Sin AUTOINCREMENT SQLite reutiliza max(id) + 1 y un id archivado podría volver a asignarse
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     origin: str = Field(max_length=255)
     destination: str = Field(max_length=255)
@@ -20,8 +35,12 @@ class Ruta(Base, table=True):
     estimated_time_hours: float = Field(default=0.0)
     status: RouteStatus = Field(default=RouteStatus.ASIGNADA)
     unit_id: int = Field(foreign_key="unidad.id", index=True)
-    assigned_at: datetime = Field(default_factory=datetime.utcnow)
+    assigned_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     started_at: Optional[datetime] = None
-    completed_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = Field(default=None, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: Optional[datetime] = None
+
+
+# Rutas COMPLETADA/CANCELADA movidas por el job de retención (RutaArchiveService)
+ruta_archive = archive_table(Ruta.__table__, "ruta_archive")
@@ -1,9 +1,34 @@
 from datetime import datetime
-from typing import Optional, Sequence
-from datetime import datetime
+from typing import Any, Collection, Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import delete, exists, func, insert, update
+from sqlalchemy.engine import Result
 from sqlmodel import Session, select, or_
-from app.features.rutas.models.ruta import Ruta, RouteStatus
-from app.features.rutas.schemas.ruta_schemas import RutaCreate, RutaUpdate
+from app.core.db.row_counts import count_rows
+from app.core.db.search_index import RutaLocation, match_clause, match_ids, ruta_fts, ruta_location_fts
+from app.features.rendimiento.models.rendimiento import Rendimiento
+from app.features.rutas.models.ruta import FINISHED_STATUSES, Ruta, RouteStatus, ruta_archive
+from app.features.rutas.schemas.ruta_schemas import RutaCreate, RutaEventType, RutaRead, RutaUpdate
+from app.features.unidades.models.unidad import Unidad
+from app.features.users.models.user import User
+from app.core.config.settings import settings
+from app.shared.archive import union_archive
+from app.shared.cache import TTLCache
+from app.shared.event_bus import EventBus
+from app.shared.fast_json import fetch_rows, read_columns
+from app.shared.etag import version_matches
+from app.shared.integrity import execute_returning_one
+
+ruta_cache = TTLCache("ruta", settings.CACHE_MAXSIZE, settings.CACHE_TTL_SECONDS)
+# Altas y cambios de estado confirmados, para GET /routes/stream y /routes/ws
+ruta_events = EventBus("ruta", settings.EVENT_BUFFER_SIZE, settings.EVENT_QUEUE_SIZE)
+# Columnas de RutaRead para los listados con FAST_LIST_RESPONSES
+ruta_read_columns = read_columns(RutaRead, Ruta.__table__)
+
+
+def publish_ruta_events(event_type: RutaEventType, rutas: Iterable[Ruta]) -> None:
+    # Solo después del commit: un suscriptor nunca recibe un cambio que luego se revierte
+    for ruta in rutas:
+        ruta_events.publish(event_type.value, ruta.id, ruta.model_dump(mode="json"))
 
 
 class RutaRepository:
@@ -11,17 +36,72 @@ class RutaRepository:
         self.session = session
 
     def create(self, ruta_create: RutaCreate) -> Ruta:
-        db_ruta = Ruta(**ruta_create.model_dump())
-        self.session.add(db_ruta)
+        row = Ruta(**ruta_create.model_dump()).model_dump(exclude={"id"})
+        statement = insert(Ruta.__table__).values(**row).returning(*Ruta.__table__.columns)
+        db_ruta = Ruta(**execute_returning_one(self.session, statement)._mapping)
         self.session.commit()
-        self.session.refresh(db_ruta)
+        publish_ruta_events(RutaEventType.CREATED, [db_ruta])
         return db_ruta
 
+    def create_many(self, ruta_creates: Sequence[RutaCreate]) -> List[Ruta]:
+        # Un solo INSERT ... RETURNING con todos los registros y un solo commit
+        rows = [Ruta(**ruta_create.model_dump()).model_dump(exclude={"id"}) for ruta_create in ruta_creates]
+        if not rows:
+            return []
+        statement = insert(Ruta.__table__).returning(*Ruta.__table__.columns)
+        result = self.session.execute(statement, rows)
+        rutas = sorted((Ruta(**row._mapping) for row in result), key=lambda ruta: ruta.id)
+        self.session.commit()
+        publish_ruta_events(RutaEventType.CREATED, rutas)
+        return rutas
+
     def get_by_id(self, ruta_id: int) -> Optional[Ruta]:
         statement = select(Ruta).where(Ruta.id == ruta_id)
         result = self.session.exec(statement).first()
         return result
 
+    def get_by_ids(self, ruta_ids: Iterable[int]) -> Sequence[Ruta]:
+        statement = select(Ruta).where(Ruta.id.in_(set(ruta_ids)))
+        result = self.session.exec(statement).all()
+        return result
+
+    def get_archived_by_id(self, ruta_id: int) -> Optional[Ruta]:
+        statement = select(*ruta_archive.c).where(ruta_archive.c.id == ruta_id)
+        row = self.session.execute(statement).first()
+        return Ruta(**row._mapping) if row else None
+
+    def get_version(self, ruta_id: int) -> Optional[datetime]:
+        # Solo las columnas de versión, para responder If-None-Match sin cargar la fila completa
+        statement = select(Ruta.updated_at, Ruta.created_at).where(Ruta.id == ruta_id)
+        row = self.session.exec(statement).first()
+        return (row.updated_at or row.created_at) if row else None
+
+    def get_cached(self, ruta_id: int) -> Optional[Ruta]:
+        # Devuelve una copia desacoplada de la sesión: solo para validaciones, no para modificarla
+        data = ruta_cache.get(ruta_id)
+        if data is None:
+            ruta = self.get_by_id(ruta_id)
+            if not ruta:
+                return None
+            data = ruta.model_dump()
+            ruta_cache.set(ruta_id, data)
+        return Ruta(**data)
+
+    @staticmethod
+    def _apply_filters(
+        statement: Any,
+        status: Optional[RouteStatus],
+        unit_id: Optional[int],
+        match_query: Optional[str] = None
+    ) -> Any:
+        if status:
+            statement = statement.where(Ruta.status == status)
+        if unit_id:
+            statement = statement.where(Ruta.unit_id == unit_id)
+        if match_query:
+            statement = statement.where(Ruta.id.in_(match_ids(ruta_fts, match_query)))
+        return statement
+
     def get_by_unit_id(
         self, 
         unit_id: int, 
@@ -41,40 +121,345 @@ class RutaRepository:
         status: Optional[RouteStatus] = None,
         unit_id: Optional[int] = None,
         offset: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        match_query: Optional[str] = None
     ) -> Sequence[Ruta]:
-        statement = select(Ruta)
+        statement = self._all_statement(select(Ruta), status, unit_id, offset, limit, match_query)
+        result = self.session.exec(statement).all()
+        return result
+
+    def get_all_rows(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+        match_query: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        statement = self._all_statement(select(*ruta_read_columns), status, unit_id, offset, limit, match_query)
+        return fetch_rows(self.session, statement)
+
+    def _all_statement(
+        self,
+        statement: Any,
+        status: Optional[RouteStatus],
+        unit_id: Optional[int],
+        offset: int,
+        limit: int,
+        match_query: Optional[str] = None
+    ) -> Any:
+        if match_query and not unit_id:
+            statement = self._search_statement(statement, status, match_query)
+        else:
+            statement = self._apply_filters(statement, status, unit_id, match_query)
+        return statement.offset(offset).limit(limit)
+
+    def get_page(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100,
+        match_query: Optional[str] = None
+    ) -> Sequence[Ruta]:
+        statement = self._page_statement(select(Ruta), status, unit_id, after_id, limit, match_query)
+        result = self.session.exec(statement).all()
+        return result
+
+    def get_page_rows(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100,
+        match_query: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        statement = self._page_statement(select(*ruta_read_columns), status, unit_id, after_id, limit, match_query)
+        return fetch_rows(self.session, statement)
+
+    def get_with_archived(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> List[Ruta]:
+        rows = self._with_archived_rows(status, unit_id, after_id, offset, limit)
+        statement = select(*rows.c).order_by(rows.c.id).offset(offset).limit(limit)
+        return [Ruta(**row._mapping) for row in self.session.execute(statement)]
+
+    def get_with_archived_rows(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        rows = self._with_archived_rows(status, unit_id, after_id, offset, limit)
+        statement = select(*read_columns(RutaRead, rows)).order_by(rows.c.id).offset(offset).limit(limit)
+        return fetch_rows(self.session, statement)
+
+    @staticmethod
+    def _with_archived_rows(
+        status: Optional[RouteStatus],
+        unit_id: Optional[int],
+        after_id: Optional[int],
+        offset: int,
+        limit: int
+    ) -> Any:
+        # Cada tabla aporta a lo sumo offset + limit filas en orden de id; los ids no se repiten entre ambas
+        branches = []
+        for table in (Ruta.__table__, ruta_archive):
+            statement = select(*table.c)
+            if status:
+                statement = statement.where(table.c.status == status)
+            if unit_id:
+                statement = statement.where(table.c.unit_id == unit_id)
+            if after_id is not None:
+                statement = statement.where(table.c.id > after_id)
+            branches.append(statement.order_by(table.c.id).limit(offset + limit))
+        return union_archive(branches)
+
+    def count(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        include_archived: bool = False,
+        match_query: Optional[str] = None
+    ) -> int:
+        if match_query:
+            # La búsqueda solo cubre rutas en vivo; sin otros filtros el índice FTS5 cuenta solo
+            if not status and not unit_id:
+                statement = select(func.count()).select_from(ruta_fts).where(match_clause(ruta_fts, match_query))
+            else:
+                statement = self._apply_filters(select(func.count()).select_from(Ruta), status, unit_id, match_query)
+            return self.session.exec(statement).one()
+
+        tables = [Ruta.__table__]
+        if include_archived:
+            tables.append(ruta_archive)
+        if not unit_id:
+            statuses = [status.value] if status else None
+            return count_rows(self.session, [table.name for table in tables], statuses)
+
+        # Sin contador por unidad: COUNT sobre el índice (unit_id, status, id), sin leer la tabla
+        total = 0
+        for table in tables:
+            statement = select(func.count()).select_from(table).where(table.c.unit_id == unit_id)
+            if status:
+                statement = statement.where(table.c.status == status)
+            total += self.session.exec(statement).one()
+        return total
+
+    def _page_statement(
+        self,
+        statement: Any,
+        status: Optional[RouteStatus],
+        unit_id: Optional[int],
+        after_id: Optional[int],
+        limit: int,
+        match_query: Optional[str] = None
+    ) -> Any:
+        if match_query and not unit_id:
+            statement = self._search_statement(statement, status, match_query, after_id)
+            return statement.limit(limit)
+
+        # Con filtro de estado la llave es (status, id); como status es fijo basta comparar id
+        statement = self._apply_filters(statement, status, unit_id, match_query)
+        if after_id is not None:
+            statement = statement.where(Ruta.id > after_id)
+        if status:
+            statement = statement.order_by(Ruta.status, Ruta.id)
+        else:
+            statement = statement.order_by(Ruta.id)
+        return statement.limit(limit)
+
+    @staticmethod
+    def _search_statement(
+        statement: Any,
+        status: Optional[RouteStatus],
+        match_query: str,
+        after_id: Optional[int] = None
+    ) -> Any:
+        # Parte del índice FTS5 en orden de rowid (el id de la ruta) y se detiene al juntar LIMIT filas, en lugar de
+        # materializar todas las coincidencias para el IN. Con unit_id se usa el IN de _apply_filters: el índice
+        # (unit_id, status, id) es más selectivo que una ciudad frecuente
+        statement = statement.join(ruta_fts, ruta_fts.c.rowid == Ruta.id).where(match_clause(ruta_fts, match_query))
         if status:
             statement = statement.where(Ruta.status == status)
-        if unit_id:
-            statement = statement.where(Ruta.unit_id == unit_id)
-        statement = statement.offset(offset).limit(limit)
+        if after_id is not None:
+            statement = statement.where(ruta_fts.c.rowid > after_id)
+        return statement.order_by(ruta_fts.c.rowid)
+
+    def _full_statement(self) -> Any:
+        # Ruta + unidad + conductor + rendimiento (si existe) en una sola consulta
+        return (
+            select(Ruta, Unidad, User, Rendimiento)
+            .join(Unidad, Unidad.id == Ruta.unit_id)
+            .join(User, User.id == Unidad.user_id)
+            .outerjoin(Rendimiento, Rendimiento.route_id == Ruta.id)
+        )
+
+    def get_full(self, ruta_id: int) -> Optional[Tuple[Ruta, Unidad, User, Optional[Rendimiento]]]:
+        statement = self._full_statement().where(Ruta.id == ruta_id)
+        result = self.session.exec(statement).first()
+        return result
+
+    def get_full_all(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> Sequence[Tuple[Ruta, Unidad, User, Optional[Rendimiento]]]:
+        statement = self._apply_filters(self._full_statement(), status, unit_id)
+        statement = statement.order_by(Ruta.id).offset(offset).limit(limit)
+        result = self.session.exec(statement).all()
+        return result
+
+    def get_full_page(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        after_id: Optional[int] = None,
+        limit: int = 100
+    ) -> Sequence[Tuple[Ruta, Unidad, User, Optional[Rendimiento]]]:
+        statement = self._page_statement(self._full_statement(), status, unit_id, after_id, limit)
         result = self.session.exec(statement).all()
         return result
 
-    def update(self, ruta: Ruta, ruta_update: RutaUpdate) -> Ruta:
-        ruta_data = ruta_update.model_dump(exclude_unset=True)
-        for key, value in ruta_data.items():
-            setattr(ruta, key, value)
-        ruta.updated_at = datetime.utcnow()
-        self.session.add(ruta)
+    def iter_export(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        batch_size: int = 1000
+    ) -> Result:
+        # Cada ruta con su rendimiento (si existe). yield_per lee del cursor por lotes sin cargar todo,
+        # y se ejecuta sobre la conexión porque son columnas sueltas, sin entidades ORM que construir
+        performance_columns = [
+            column.label(f"performance_{column.name}")
+            for column in Rendimiento.__table__.columns
+            if column.name != "route_id"
+        ]
+        statement = (
+            select(*Ruta.__table__.columns, *performance_columns)
+            .outerjoin(Rendimiento, Rendimiento.route_id == Ruta.id)
+        )
+        statement = self._apply_filters(statement, status, unit_id)
+        statement = statement.order_by(Ruta.id).execution_options(yield_per=batch_size)
+        return self.session.connection().execute(statement)
+
+    def update(self, ruta: Ruta, ruta_update: RutaUpdate, expected_version: Optional[datetime] = None) -> Optional[Ruta]:
+        values = {**ruta_update.model_dump(exclude_unset=True), "updated_at": datetime.utcnow()}
+        return self._update_returning(ruta.id, values, expected_version)
+
+    def update_status(
+        self,
+        ruta_ids: Collection[int],
+        status: RouteStatus,
+        allowed_from: Collection[RouteStatus],
+        expected_version: Optional[datetime] = None
+    ) -> List[Ruta]:
+        # UPDATE condicional: solo cambian las rutas cuyo estado actual admite la transición, así dos
+        # solicitudes simultáneas no pueden sacar la misma ruta del mismo estado. Las que no cambian
+        # no vuelven en RETURNING
+        if not ruta_ids or not allowed_from:
+            return []
+        now = datetime.utcnow()
+        table = Ruta.__table__
+        values = {"status": status, "updated_at": now}
+        # coalesce conserva la primera hora de inicio/fin igual que antes, sin leer la fila
+        if status == RouteStatus.EN_RUTA:
+            values["started_at"] = func.coalesce(table.c.started_at, now)
+        if status == RouteStatus.COMPLETADA:
+            values["completed_at"] = func.coalesce(table.c.completed_at, now)
+        statement = update(table).where(table.c.id.in_(set(ruta_ids)), table.c.status.in_(set(allowed_from)))
+        if expected_version is not None:
+            statement = statement.where(version_matches(table, expected_version))
+        statement = statement.values(**values).returning(*table.columns)
+        rutas = [Ruta(**row._mapping) for row in self.session.execute(statement)]
         self.session.commit()
-        self.session.refresh(ruta)
-        return ruta
-
-    def update_status(self, ruta: Ruta, status: RouteStatus) -> Ruta:
-        ruta.status = status
-        if status == RouteStatus.EN_RUTA and not ruta.started_at:
-            ruta.started_at = datetime.utcnow()
-        if status == RouteStatus.COMPLETADA and not ruta.completed_at:
-            ruta.completed_at = datetime.utcnow()
-        ruta.updated_at = datetime.utcnow()
-        self.session.add(ruta)
+        for ruta in rutas:
+            ruta_cache.invalidate(ruta.id)
+        publish_ruta_events(RutaEventType.STATUS_CHANGED, rutas)
+        return rutas
+
+    def _update_returning(
+        self, ruta_id: int, values: Dict[str, Any], expected_version: Optional[datetime] = None
+    ) -> Optional[Ruta]:
+        table = Ruta.__table__
+        statement = update(table).where(table.c.id == ruta_id)
+        if expected_version is not None:
+            statement = statement.where(version_matches(table, expected_version))
+        statement = statement.values(**values).returning(*table.columns)
+        row = execute_returning_one(self.session, statement)
+        if row is None:
+            self.session.rollback()
+            return None
         self.session.commit()
-        self.session.refresh(ruta)
-        return ruta
+        ruta_cache.invalidate(ruta_id)
+        return Ruta(**row._mapping)
+
+    def suggest_locations(self, match_query: str, limit: int = 10) -> Sequence[RutaLocation]:
+        # Busca en el índice de nombres distintos, no en las rutas: el costo depende de cuántas ciudades
+        # coinciden con el prefijo, no del número de rutas
+        statement = (
+            select(RutaLocation)
+            .where(RutaLocation.id.in_(match_ids(ruta_location_fts, match_query)), RutaLocation.route_count > 0)
+            .order_by(RutaLocation.route_count.desc(), RutaLocation.name)
+            .limit(limit)
+        )
+        return self.session.exec(statement).all()
 
-    def delete(self, ruta: Ruta) -> bool:
-        self.session.delete(ruta)
+    def get_archivable_ids(self, finished_before: datetime, after_id: int = 0, limit: int = 1000) -> List[int]:
+        # Fin de la ruta: completed_at si se completó, su última actualización si se canceló.
+        # Se conservan la ruta y el rendimiento con el id más alto: en bases creadas antes de AUTOINCREMENT
+        # SQLite asigna max(id) + 1 y podría volver a usar un id archivado
+        finished_at = func.coalesce(Ruta.completed_at, Ruta.updated_at, Ruta.created_at)
+        statement = (
+            select(Ruta.id)
+            .outerjoin(Rendimiento, Rendimiento.route_id == Ruta.id)
+            .where(
+                Ruta.status.in_(FINISHED_STATUSES),
+                Ruta.id > after_id,
+                Ruta.id < select(func.max(Ruta.id)).scalar_subquery(),
+                or_(Rendimiento.id.is_(None), Rendimiento.id < select(func.max(Rendimiento.id)).scalar_subquery()),
+                finished_at < finished_before,
+            )
+            .order_by(Ruta.id)
+            .limit(limit)
+        )
+        return list(self.session.exec(statement).all())
+
+    def archive(self, ruta_ids: Sequence[int]) -> int:
+        # Copia y borrado en la misma transacción que el movimiento de sus rendimientos
+        # (RendimientoRepository.archive_by_route_ids): cada ruta queda en vivo o archivada, nunca en ambas
+        table = Ruta.__table__
+        self.session.execute(
+            insert(ruta_archive).from_select(list(table.c.keys()), select(*table.c).where(table.c.id.in_(ruta_ids)))
+        )
+        archived = self.session.execute(delete(table).where(table.c.id.in_(ruta_ids))).rowcount
+        self.session.commit()
+        for ruta_id in ruta_ids:
+            ruta_cache.invalidate(ruta_id)
+        return archived
+
+    def delete(self, ruta_id: int) -> bool:
+        # Un solo DELETE condicional: la base no aplica la llave foránea de rendimiento, así que una ruta en progreso
+        # o con rendimiento (que cuenta en unit_performance_summary) no se borra aunque cambie tras la validación
+        statement = delete(Ruta).where(
+            Ruta.id == ruta_id,
+            Ruta.status != RouteStatus.EN_RUTA,
+            ~exists().where(Rendimiento.route_id == Ruta.id),
+        )
+        deleted = self.session.execute(statement).rowcount > 0
         self.session.commit()
-        return True
+        if deleted:
+            ruta_cache.invalidate(ruta_id)
+        return deleted
+
+    def has_performance(self, ruta_id: int) -> bool:
+        statement = select(Rendimiento.id).where(Rendimiento.route_id == ruta_id)
+        return self.session.exec(statement).first() is not None
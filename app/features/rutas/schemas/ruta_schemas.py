@@ -1,7 +1,10 @@
-from typing import Optional
-from sqlmodel import SQLModel
+from enum import Enum
+from typing import List, Optional
+from sqlmodel import Field, SQLModel
 from datetime import datetime
 from app.features.rutas.models.ruta import RouteStatus
+from app.features.rendimiento.schemas.rendimiento_schemas import RendimientoRead
+from app.features.unidades.schemas.unidad_schemas import UnidadWithDriverRead
 
 
 class RutaBase(SQLModel):
@@ -33,5 +36,59 @@ class RutaRead(RutaBase):
     updated_at: Optional[datetime]
 
 
+class RutaWithPerformanceRead(RutaRead):
+    performance: Optional[RendimientoRead] = None
+
+
+class RutaFullRead(RutaWithPerformanceRead):
+    unit: UnidadWithDriverRead
+
+
 class RutaStatusUpdate(SQLModel):
     status: RouteStatus
+
+
+class RutaBulkStatusUpdate(SQLModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
+    status: RouteStatus
+
+
+class RutaBulkCreate(SQLModel):
+    routes: List[RutaCreate] = Field(min_length=1, max_length=1000)
+
+
+class RutaBulkError(SQLModel):
+    index: int
+    status_code: int
+    detail: str
+
+
+class RutaBulkResult(SQLModel):
+    created: List[RutaRead]
+    errors: List[RutaBulkError]
+
+
+class RutaBulkStatusError(SQLModel):
+    id: int
+    status_code: int
+    detail: str
+
+
+class RutaBulkStatusResult(SQLModel):
+    updated: List[RutaRead]
+    errors: List[RutaBulkStatusError]
+
+
+class RutaEventType(str, Enum):
+    CREATED = "route.created"
+    STATUS_CHANGED = "route.status_changed"
+
+
+class RutaLocationSuggestion(SQLModel):
+    name: str
+    route_count: int
+
+
+class RutaArchiveResult(SQLModel):
+    routes: int
+    performance_records: int
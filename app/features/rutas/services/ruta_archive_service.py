@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from sqlmodel import Session
+from app.core.config.settings import settings
+from app.core.db.session import engine
+from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
+from app.features.rutas.repositories.ruta_repository import RutaRepository
+from app.features.rutas.schemas.ruta_schemas import RutaArchiveResult
+
+
+class RutaArchiveService:
+    def __init__(self, repository: RutaRepository, rendimiento_repository: RendimientoRepository):
+        self.repository = repository
+        self.rendimiento_repository = rendimiento_repository
+
+    def archive_finished(
+        self,
+        older_than_days: int = settings.ARCHIVE_AFTER_DAYS,
+        chunk_size: int = settings.ARCHIVE_CHUNK_SIZE
+    ) -> RutaArchiveResult:
+        finished_before = datetime.utcnow() - timedelta(days=older_than_days)
+        routes = 0
+        performance_records = 0
+        after_id = 0
+        while True:
+            ruta_ids = self.repository.get_archivable_ids(finished_before, after_id, chunk_size)
+            if not ruta_ids:
+                break
+
+            # Un commit por lote: las transacciones son cortas y una interrupción deja los lotes
+            # anteriores archivados y el resto en vivo. El resumen por unidad no cambia
+            performance_records += self.rendimiento_repository.archive_by_route_ids(ruta_ids)
+            routes += self.repository.archive(ruta_ids)
+            after_id = ruta_ids[-1]
+
+        return RutaArchiveResult(routes=routes, performance_records=performance_records)
+
+
+def run_ruta_archive(
+    older_than_days: int = settings.ARCHIVE_AFTER_DAYS,
+    chunk_size: int = settings.ARCHIVE_CHUNK_SIZE
+) -> RutaArchiveResult:
+    with Session(engine) as session:
+        service = RutaArchiveService(RutaRepository(session), RendimientoRepository(session))
+        return service.archive_finished(older_than_days, chunk_size)
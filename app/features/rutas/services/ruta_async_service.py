@@ -0,0 +1,130 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from app.core.db.runner import AsyncService
+from app.features.rutas.models.ruta import RouteStatus, Ruta
+from app.features.rutas.schemas.ruta_schemas import (
+    RutaBulkCreate, RutaBulkResult, RutaBulkStatusResult, RutaBulkStatusUpdate, RutaCreate, RutaFullRead,
+    RutaLocationSuggestion, RutaStatusUpdate, RutaUpdate
+)
+from app.shared.pagination import Page
+from app.features.rutas.services.ruta_service import RutaService
+
+
+class AsyncRutaService(AsyncService[RutaService]):
+    async def create_ruta(self, ruta_create: RutaCreate) -> Ruta:
+        return await self.runner.call(self.service.create_ruta, ruta_create)
+
+    async def create_rutas_bulk(self, bulk_create: RutaBulkCreate) -> RutaBulkResult:
+        return await self.runner.call(self.service.create_rutas_bulk, bulk_create)
+
+    async def get_ruta_by_id(self, ruta_id: int, include_archived: bool = False) -> Optional[Ruta]:
+        return await self.runner.call(self.service.get_ruta_by_id, ruta_id, include_archived)
+
+    async def get_ruta_version(self, ruta_id: int, include_archived: bool = False) -> Optional[datetime]:
+        return await self.runner.call(self.service.get_ruta_version, ruta_id, include_archived)
+
+    async def get_all_rutas(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> Sequence[Ruta]:
+        return await self.runner.call(self.service.get_all_rutas, status, unit_id, offset, limit, include_archived, q)
+
+    async def get_all_rutas_rows(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.runner.call(
+            self.service.get_all_rutas_rows, status, unit_id, offset, limit, include_archived, q
+        )
+
+    async def count_rutas(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> int:
+        return await self.runner.call(self.service.count_rutas, status, unit_id, include_archived, q)
+
+    async def suggest_locations(self, prefix: str, limit: int = 10) -> List[RutaLocationSuggestion]:
+        return await self.runner.call(self.service.suggest_locations, prefix, limit)
+
+    async def validate_export_filters(self, unit_id: Optional[int] = None) -> None:
+        await self.runner.call(self.service.validate_export_filters, unit_id)
+
+    async def get_rutas_page(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        cursor: str = "",
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> Page:
+        return await self.runner.call(self.service.get_rutas_page, status, unit_id, cursor, limit, include_archived, q)
+
+    async def get_rutas_page_rows(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        cursor: str = "",
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> Page:
+        return await self.runner.call(
+            self.service.get_rutas_page_rows, status, unit_id, cursor, limit, include_archived, q
+        )
+
+    async def get_ruta_full(self, ruta_id: int) -> RutaFullRead:
+        return await self.runner.call(self.service.get_ruta_full, ruta_id)
+
+    async def get_all_rutas_full(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> List[RutaFullRead]:
+        return await self.runner.call(self.service.get_all_rutas_full, status, unit_id, offset, limit)
+
+    async def get_rutas_full_page(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        cursor: str = "",
+        limit: int = 100
+    ) -> Page:
+        return await self.runner.call(self.service.get_rutas_full_page, status, unit_id, cursor, limit)
+
+    async def update_ruta(
+        self,
+        ruta_id: int,
+        ruta_update: RutaUpdate,
+        if_match: Optional[str] = None
+    ) -> Optional[Ruta]:
+        return await self.runner.call(self.service.update_ruta, ruta_id, ruta_update, if_match)
+
+    async def update_ruta_status(
+        self,
+        ruta_id: int,
+        status_update: RutaStatusUpdate,
+        if_match: Optional[str] = None
+    ) -> Optional[Ruta]:
+        return await self.runner.call(self.service.update_ruta_status, ruta_id, status_update, if_match)
+
+    async def update_rutas_status(self, bulk_update: RutaBulkStatusUpdate) -> RutaBulkStatusResult:
+        return await self.runner.call(self.service.update_rutas_status, bulk_update)
+
+    async def delete_ruta(self, ruta_id: int) -> bool:
+        return await self.runner.call(self.service.delete_ruta, ruta_id)
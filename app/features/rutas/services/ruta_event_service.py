@@ -0,0 +1,33 @@
+from typing import Collection, Optional
+from fastapi import HTTPException
+from sqlmodel import Session
+from app.core.db.session import read_engine
+from app.features.rutas.models.ruta import RouteStatus
+from app.features.rutas.repositories.ruta_repository import ruta_events
+from app.features.unidades.repositories.unidad_repository import UnidadRepository
+from app.shared.event_bus import Event, Subscription
+
+
+def validate_event_filters(unit_id: Optional[int] = None) -> None:
+    # Sesión propia y corta: la suscripción dura lo que la conexión y no debe retener una conexión del pool
+    if not unit_id:
+        return
+    with Session(read_engine) as session:
+        if not UnidadRepository(session).get_cached(unit_id):
+            raise HTTPException(status_code=404, detail="Unidad no encontrada")
+
+
+def subscribe_ruta_events(
+    statuses: Optional[Collection[RouteStatus]] = None,
+    unit_id: Optional[int] = None,
+    last_event_id: Optional[int] = None
+) -> Subscription:
+    # El filtro de estado se aplica al estado nuevo de la ruta
+    status_values = {status.value for status in statuses} if statuses else None
+
+    def matches(event: Event) -> bool:
+        if unit_id and event.data["unit_id"] != unit_id:
+            return False
+        return status_values is None or event.data["status"] in status_values
+
+    return ruta_events.subscribe(matches, last_event_id)
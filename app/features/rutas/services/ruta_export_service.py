@@ -0,0 +1,17 @@
+from typing import Iterator, Optional
+from sqlmodel import Session
+from app.core.db.session import read_engine
+from app.features.rutas.models.ruta import RouteStatus
+from app.features.rutas.repositories.ruta_repository import RutaRepository
+from app.shared.export import EXPORT_BATCH_SIZE, ExportFormat, encode_rows
+
+
+def export_rutas(
+    export_format: ExportFormat,
+    status: Optional[RouteStatus] = None,
+    unit_id: Optional[int] = None
+) -> Iterator[bytes]:
+    # Sesión propia: la sesión del request se cierra antes de que StreamingResponse consuma el generador
+    with Session(read_engine) as session:
+        result = RutaRepository(session).iter_export(status, unit_id, EXPORT_BATCH_SIZE)
+        yield from encode_rows(list(result.keys()), result, export_format)
@@ -1,9 +1,32 @@
-from typing import Optional, Sequence
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
 from fastapi import HTTPException
 from app.features.rutas.repositories.ruta_repository import RutaRepository
-from app.features.rutas.schemas.ruta_schemas import RutaCreate, RutaUpdate, RutaStatusUpdate
+from app.features.rutas.schemas.ruta_schemas import (
+    RutaCreate, RutaUpdate, RutaStatusUpdate, RutaBulkCreate, RutaBulkError, RutaBulkResult, RutaFullRead,
+    RutaBulkStatusUpdate, RutaBulkStatusError, RutaBulkStatusResult, RutaLocationSuggestion
+)
+from app.core.db.search_index import build_match_query
+from app.features.rendimiento.models.rendimiento import Rendimiento
 from app.features.rutas.models.ruta import Ruta, RouteStatus
+from app.features.unidades.models.unidad import Unidad
+from app.features.unidades.schemas.unidad_schemas import UnidadWithDriverRead
+from app.features.users.models.user import User
 from app.features.unidades.repositories.unidad_repository import UnidadRepository
+from app.shared.etag import check_if_match, precondition_failed
+from app.shared.pagination import Page, build_page, decode_cursor
+
+
+VALID_TRANSITIONS = {
+    RouteStatus.ASIGNADA: [RouteStatus.EN_RUTA, RouteStatus.CANCELADA],
+    RouteStatus.EN_RUTA: [RouteStatus.COMPLETADA, RouteStatus.CANCELADA],
+}
+
+# Estados de origen admitidos por cada estado destino, para el WHERE status IN (...) del UPDATE
+ALLOWED_FROM = {
+    status: [current for current, targets in VALID_TRANSITIONS.items() if status in targets]
+    for status in RouteStatus
+}
 
 
 class RutaService:
@@ -11,8 +34,7 @@ class RutaService:
         self.repository = repository
         self.unidad_repository = unidad_repository
 
-    def create_ruta(self, ruta_create: RutaCreate) -> Ruta:
-        unidad = self.unidad_repository.get_by_id(ruta_create.unit_id)
+    def _validate_ruta_create(self, ruta_create: RutaCreate, unidad: Optional[Unidad]) -> None:
         if not unidad:
             raise HTTPException(status_code=404, detail="Unidad no encontrada")
 
@@ -25,10 +47,43 @@ class RutaService:
         if ruta_create.estimated_time_hours <= 0:
             raise HTTPException(status_code=400, detail="El tiempo estimado debe ser mayor a 0")
 
+    def create_ruta(self, ruta_create: RutaCreate) -> Ruta:
+        unidad = self.unidad_repository.get_cached(ruta_create.unit_id)
+        self._validate_ruta_create(ruta_create, unidad)
         return self.repository.create(ruta_create)
 
-    def get_ruta_by_id(self, ruta_id: int) -> Optional[Ruta]:
-        return self.repository.get_by_id(ruta_id)
+    def create_rutas_bulk(self, bulk_create: RutaBulkCreate) -> RutaBulkResult:
+        # Una sola consulta IN para todas las unidades referenciadas en el lote
+        unidades = {
+            unidad.id: unidad
+            for unidad in self.unidad_repository.get_by_ids(r.unit_id for r in bulk_create.routes)
+        }
+
+        valid_rutas = []
+        errors = []
+        for index, ruta_create in enumerate(bulk_create.routes):
+            try:
+                self._validate_ruta_create(ruta_create, unidades.get(ruta_create.unit_id))
+            except HTTPException as exc:
+                errors.append(RutaBulkError(index=index, status_code=exc.status_code, detail=exc.detail))
+                continue
+            valid_rutas.append(ruta_create)
+
+        created = self.repository.create_many(valid_rutas)
+        return RutaBulkResult(created=created, errors=errors)
+
+    def get_ruta_by_id(self, ruta_id: int, include_archived: bool = False) -> Optional[Ruta]:
+        ruta = self.repository.get_by_id(ruta_id)
+        if not ruta and include_archived:
+            ruta = self.repository.get_archived_by_id(ruta_id)
+        return ruta
+
+    def get_ruta_version(self, ruta_id: int, include_archived: bool = False) -> Optional[datetime]:
+        version = self.repository.get_version(ruta_id)
+        if version is None and include_archived:
+            ruta = self.repository.get_archived_by_id(ruta_id)
+            version = (ruta.updated_at or ruta.created_at) if ruta else None
+        return version
 
     def get_rutas_by_unit(
         self, 
@@ -37,7 +92,7 @@ class RutaService:
         offset: int = 0, 
         limit: int = 100
     ) -> Sequence[Ruta]:
-        unidad = self.unidad_repository.get_by_id(unit_id)
+        unidad = self.unidad_repository.get_cached(unit_id)
         if not unidad:
             raise HTTPException(status_code=404, detail="Unidad no encontrada")
         return self.repository.get_by_unit_id(unit_id, status, offset, limit)
@@ -47,18 +102,149 @@ class RutaService:
         status: Optional[RouteStatus] = None,
         unit_id: Optional[int] = None,
         offset: int = 0,
-        limit: int = 100
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
     ) -> Sequence[Ruta]:
+        match_query = self._search_match_query(q, include_archived)
+        self._validate_unit_filter(unit_id)
+        if include_archived:
+            return self.repository.get_with_archived(status, unit_id, None, offset, limit)
+        return self.repository.get_all(status, unit_id, offset, limit, match_query)
+
+    def get_all_rutas_rows(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        match_query = self._search_match_query(q, include_archived)
+        self._validate_unit_filter(unit_id)
+        if include_archived:
+            return self.repository.get_with_archived_rows(status, unit_id, None, offset, limit)
+        return self.repository.get_all_rows(status, unit_id, offset, limit, match_query)
+
+    def count_rutas(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> int:
+        match_query = self._search_match_query(q, include_archived)
+        return self.repository.count(status, unit_id, include_archived, match_query)
+
+    def _search_match_query(self, q: Optional[str], include_archived: bool = False) -> Optional[str]:
+        if q is None:
+            return None
+        # El índice de búsqueda solo cubre las rutas en vivo
+        if include_archived:
+            raise HTTPException(status_code=400, detail="La búsqueda no admite include_archived")
+        match_query = build_match_query(q)
+        if not match_query:
+            raise HTTPException(status_code=400, detail="La búsqueda debe incluir al menos una palabra")
+        return match_query
+
+    def suggest_locations(self, prefix: str, limit: int = 10) -> List[RutaLocationSuggestion]:
+        match_query = build_match_query(prefix)
+        if not match_query:
+            return []
+        locations = self.repository.suggest_locations(match_query, limit)
+        return [RutaLocationSuggestion(name=location.name, route_count=location.route_count) for location in locations]
+
+    def _validate_unit_filter(self, unit_id: Optional[int]) -> None:
         if unit_id:
-            unidad = self.unidad_repository.get_by_id(unit_id)
+            unidad = self.unidad_repository.get_cached(unit_id)
             if not unidad:
                 raise HTTPException(status_code=404, detail="Unidad no encontrada")
-        return self.repository.get_all(status, unit_id, offset, limit)
 
-    def update_ruta(self, ruta_id: int, ruta_update: RutaUpdate) -> Optional[Ruta]:
+    def validate_export_filters(self, unit_id: Optional[int] = None) -> None:
+        self._validate_unit_filter(unit_id)
+
+    def _decode_page_cursor(self, status: Optional[RouteStatus], cursor: str) -> Optional[int]:
+        values = decode_cursor(cursor)
+        cursor_status = status.value if status else None
+        if values and values.get("status") != cursor_status:
+            raise HTTPException(status_code=400, detail="El cursor no corresponde al filtro de estado")
+        return values.get("id")
+
+    def get_rutas_page(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        cursor: str = "",
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> Page:
+        match_query = self._search_match_query(q, include_archived)
+        self._validate_unit_filter(unit_id)
+        after_id = self._decode_page_cursor(status, cursor)
+        if include_archived:
+            rutas = self.repository.get_with_archived(status, unit_id, after_id, 0, limit + 1)
+        else:
+            rutas = self.repository.get_page(status, unit_id, after_id, limit + 1, match_query)
+        cursor_status = status.value if status else None
+        return build_page(rutas, limit, lambda ruta: {"status": cursor_status, "id": ruta.id})
+
+    def get_rutas_page_rows(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        cursor: str = "",
+        limit: int = 100,
+        include_archived: bool = False,
+        q: Optional[str] = None
+    ) -> Page:
+        match_query = self._search_match_query(q, include_archived)
+        self._validate_unit_filter(unit_id)
+        after_id = self._decode_page_cursor(status, cursor)
+        if include_archived:
+            rows = self.repository.get_with_archived_rows(status, unit_id, after_id, 0, limit + 1)
+        else:
+            rows = self.repository.get_page_rows(status, unit_id, after_id, limit + 1, match_query)
+        cursor_status = status.value if status else None
+        return build_page(rows, limit, lambda row: {"status": cursor_status, "id": row["id"]})
+
+    def get_ruta_full(self, ruta_id: int) -> RutaFullRead:
+        row = self.repository.get_full(ruta_id)
+        if not row:
+            raise HTTPException(status_code=404, detail="Ruta no encontrada")
+        return build_ruta_full_read(*row)
+
+    def get_all_rutas_full(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        offset: int = 0,
+        limit: int = 100
+    ) -> List[RutaFullRead]:
+        self._validate_unit_filter(unit_id)
+        rows = self.repository.get_full_all(status, unit_id, offset, limit)
+        return [build_ruta_full_read(*row) for row in rows]
+
+    def get_rutas_full_page(
+        self,
+        status: Optional[RouteStatus] = None,
+        unit_id: Optional[int] = None,
+        cursor: str = "",
+        limit: int = 100
+    ) -> Page:
+        self._validate_unit_filter(unit_id)
+        after_id = self._decode_page_cursor(status, cursor)
+        rows = self.repository.get_full_page(status, unit_id, after_id, limit + 1)
+        cursor_status = status.value if status else None
+        page = build_page(rows, limit, lambda row: {"status": cursor_status, "id": row[0].id})
+        return Page(items=[build_ruta_full_read(*row) for row in page.items], next_cursor=page.next_cursor)
+
+    def update_ruta(self, ruta_id: int, ruta_update: RutaUpdate, if_match: Optional[str] = None) -> Optional[Ruta]:
         ruta = self.repository.get_by_id(ruta_id)
         if not ruta:
             raise HTTPException(status_code=404, detail="Ruta no encontrada")
+        expected_version = check_if_match(if_match, ruta)
 
         if ruta.status == RouteStatus.COMPLETADA:
             raise HTTPException(status_code=400, detail="No se puede actualizar una ruta completada")
@@ -69,36 +255,57 @@ class RutaService:
         if ruta_update.estimated_time_hours is not None and ruta_update.estimated_time_hours <= 0:
             raise HTTPException(status_code=400, detail="El tiempo estimado debe ser mayor a 0")
 
-        return self.repository.update(ruta, ruta_update)
-
-    def update_ruta_status(self, ruta_id: int, status_update: RutaStatusUpdate) -> Optional[Ruta]:
-        ruta = self.repository.get_by_id(ruta_id)
-        if not ruta:
-            raise HTTPException(status_code=404, detail="Ruta no encontrada")
+        updated = self.repository.update(ruta, ruta_update, expected_version)
+        if updated is None and expected_version is not None:
+            raise precondition_failed()
+        return updated
 
-        current_status = ruta.status
+    def update_ruta_status(
+        self, ruta_id: int, status_update: RutaStatusUpdate, if_match: Optional[str] = None
+    ) -> Optional[Ruta]:
         new_status = status_update.status
+        expected_version = None
+        if if_match is not None:
+            ruta = self.repository.get_by_id(ruta_id)
+            if not ruta:
+                raise HTTPException(status_code=404, detail="Ruta no encontrada")
+            expected_version = check_if_match(if_match, ruta)
 
-        if current_status == RouteStatus.COMPLETADA:
-            raise HTTPException(status_code=400, detail="No se puede cambiar el estado de una ruta completada")
+        rutas = self.repository.update_status([ruta_id], new_status, ALLOWED_FROM[new_status], expected_version)
+        if rutas:
+            return rutas[0]
+        # La ruta solo se lee cuando la transición no se aplicó, para responder con el motivo
+        # get_version lee columnas y no la instancia del identity map, que con If-Match ya se cargó antes del UPDATE
+        if expected_version is not None and self.repository.get_version(ruta_id) != expected_version:
+            raise precondition_failed()
+        raise transition_error(self.repository.get_by_id(ruta_id), new_status)
 
-        if current_status == RouteStatus.CANCELADA:
-            raise HTTPException(status_code=400, detail="No se puede cambiar el estado de una ruta cancelada")
-
-        valid_transitions = {
-            RouteStatus.ASIGNADA: [RouteStatus.EN_RUTA, RouteStatus.CANCELADA],
-            RouteStatus.EN_RUTA: [RouteStatus.COMPLETADA, RouteStatus.CANCELADA],
+    def update_rutas_status(self, bulk_update: RutaBulkStatusUpdate) -> RutaBulkStatusResult:
+        new_status = bulk_update.status
+        ruta_ids = list(dict.fromkeys(bulk_update.ids))
+        updated = {
+            ruta.id: ruta
+            for ruta in self.repository.update_status(ruta_ids, new_status, ALLOWED_FROM[new_status])
         }
 
-        if new_status not in valid_transitions.get(current_status, []):
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Transición de estado inválida from {current_status} to {new_status}"
-            )
+        # Una sola consulta IN para explicar las rutas que no cambiaron
+        pending = [ruta_id for ruta_id in ruta_ids if ruta_id not in updated]
+        current = {ruta.id: ruta for ruta in self.repository.get_by_ids(pending)} if pending else {}
+        errors = []
+        for ruta_id in pending:
+            exc = transition_error(current.get(ruta_id), new_status)
+            errors.append(RutaBulkStatusError(id=ruta_id, status_code=exc.status_code, detail=exc.detail))
 
-        return self.repository.update_status(ruta, new_status)
+        return RutaBulkStatusResult(
+            updated=[updated[ruta_id] for ruta_id in ruta_ids if ruta_id in updated],
+            errors=errors,
+        )
 
     def delete_ruta(self, ruta_id: int) -> bool:
+        if self.repository.delete(ruta_id):
+            return True
+
+        # La ruta solo se lee si el DELETE no se aplicó, para responder el motivo
         ruta = self.repository.get_by_id(ruta_id)
         if not ruta:
             raise HTTPException(status_code=404, detail="Ruta no encontrada")
@@ -106,4 +313,46 @@ class RutaService:
         if ruta.status == RouteStatus.EN_RUTA:
             raise HTTPException(status_code=400, detail="No se puede eliminar una ruta que está en progreso")
 
-        return self.repository.delete(ruta)
+        if self.repository.has_performance(ruta_id):
+            raise HTTPException(
+                status_code=409,
+                detail="No se puede eliminar una ruta con rendimiento registrado; elimine primero el rendimiento"
+            )
+
+        # Otra solicitud cambió la ruta entre el DELETE y la lectura
+        raise HTTPException(status_code=409, detail="La ruta cambió durante la solicitud")
+
+
+def build_ruta_full_read(
+    ruta: Ruta,
+    unidad: Unidad,
+    user: User,
+    rendimiento: Optional[Rendimiento]
+) -> RutaFullRead:
+    return RutaFullRead(
+        **ruta.model_dump(),
+        performance=rendimiento.model_dump() if rendimiento else None,
+        unit=UnidadWithDriverRead(**unidad.model_dump(), driver=user.model_dump()),
+    )
+
+
+def transition_error(ruta: Optional[Ruta], new_status: RouteStatus) -> HTTPException:
+    if not ruta:
+        return HTTPException(status_code=404, detail="Ruta no encontrada")
+
+    current_status = ruta.status
+
+    if current_status == RouteStatus.COMPLETADA:
+        return HTTPException(status_code=400, detail="No se puede cambiar el estado de una ruta completada")
+
+    if current_status == RouteStatus.CANCELADA:
+        return HTTPException(status_code=400, detail="No se puede cambiar el estado de una ruta cancelada")
+
+    if new_status not in VALID_TRANSITIONS.get(current_status, []):
+        return HTTPException(
+            status_code=400,
+            detail=f"Transición de estado inválida from {current_status} to {new_status}"
+        )
+
+    # La transición era válida al leer la ruta: otra solicitud cambió su estado entre el UPDATE y la lectura
+    return HTTPException(status_code=409, detail="El estado de la ruta cambió durante la solicitud")
@@ -1,19 +1,20 @@
 from fastapi import Depends
 from sqlmodel import Session
-from app.core.db.session import get_session
-from app.core.db.session import get_session as get_session_unidad
+from app.core.db.runner import SessionRunner, get_session_runner
 from app.features.unidades.repositories.unidad_repository import UnidadRepository
+from app.features.unidades.services.unidad_async_service import AsyncUnidadService
 from app.features.unidades.services.unidad_service import UnidadService
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
 from app.features.users.repositories.user_repository import UserRepository
-from app.features.users.api.dependencies import get_user_repository
 
 
-def get_unidad_repository(session: Session = Depends(get_session_unidad)) -> UnidadRepository:
-    return UnidadRepository(session)
+def build_unidad_service(session: Session) -> UnidadService:
+    return UnidadService(
+        UnidadRepository(session),
+        UserRepository(session),
+        UnitPerformanceSummaryRepository(session)
+    )
 
 
-def get_unidad_service(
-    repository: UnidadRepository = Depends(get_unidad_repository),
-    user_repository: UserRepository = Depends(get_user_repository)
-) -> UnidadService:
-    return UnidadService(repository, user_repository)
+def get_unidad_service(runner: SessionRunner = Depends(get_session_runner)) -> AsyncUnidadService:
+    return AsyncUnidadService(runner, build_unidad_service(runner.sync_session))
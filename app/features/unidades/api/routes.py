@@ -1,46 +1,87 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Sequence
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from typing import Optional, Sequence, Union
 from app.features.unidades.api.dependencies import get_unidad_service
-from app.features.unidades.services.unidad_service import UnidadService
+from app.features.unidades.services.unidad_async_service import AsyncUnidadService
 from app.features.unidades.schemas.unidad_schemas import UnidadCreate, UnidadUpdate, UnidadRead
+from app.features.unidades.schemas.unidad_dashboard_schemas import UnidadDashboardRead
 from app.features.unidades.models.unidad import Unidad
+from app.features.rendimiento.schemas.rendimiento_schemas import UnitPerformanceSummaryRead
+from app.shared.etag import IF_MATCH_DESCRIPTION, IF_NONE_MATCH_DESCRIPTION, etag_for, not_modified_response
+from app.shared.pagination import CURSOR_DESCRIPTION, TOTAL_COUNT_HEADER, WITH_COUNT_DESCRIPTION, Page
 
 router = APIRouter(prefix="/units", tags=["units"])
 
 
 @router.post("", response_model=UnidadRead, status_code=201)
-def create_unidad(unidad_create: UnidadCreate, service: UnidadService = Depends(get_unidad_service)) -> Unidad:
-    return service.create_unidad(unidad_create)
+async def create_unidad(unidad_create: UnidadCreate, service: AsyncUnidadService = Depends(get_unidad_service)) -> Unidad:
+    return await service.create_unidad(unidad_create)
 
 
-@router.get("", response_model=Sequence[UnidadRead])
-def get_unidades(
+@router.get("", response_model=Union[Sequence[UnidadRead], Page[UnidadRead]])
+async def get_unidades(
+    response: Response,
     offset: int = Query(default=0, ge=0, description="Número de registros a saltar (paginación)"),
     limit: int = Query(default=100, ge=1, le=100, description="Número máximo de registros a devolver"),
-    service: UnidadService = Depends(get_unidad_service)
-) -> Sequence[Unidad]:
-    return service.get_all_unidades(offset, limit)
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    with_count: bool = Query(default=False, description=WITH_COUNT_DESCRIPTION),
+    service: AsyncUnidadService = Depends(get_unidad_service)
+) -> Union[Sequence[Unidad], Page]:
+    if with_count:
+        response.headers[TOTAL_COUNT_HEADER] = str(await service.count_unidades())
+    if cursor is not None:
+        return await service.get_unidades_page(cursor, limit)
+    return await service.get_all_unidades(offset, limit)
 
 @router.get("/{unidad_id}", response_model=UnidadRead)
-def get_unidad(unidad_id: int, service: UnidadService = Depends(get_unidad_service)) -> Unidad:
-    unidad = service.get_unidad_by_id(unidad_id)
+async def get_unidad(
+    unidad_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None, description=IF_NONE_MATCH_DESCRIPTION),
+    service: AsyncUnidadService = Depends(get_unidad_service)
+) -> Unidad:
+    if if_none_match:
+        cached = not_modified_response(if_none_match, unidad_id, await service.get_unidad_version(unidad_id))
+        if cached:
+            return cached
+    unidad = await service.get_unidad_by_id(unidad_id)
     if not unidad:
         raise HTTPException(status_code=404, detail="Unidad no encontrada")
+    response.headers["ETag"] = etag_for(unidad)
     return unidad
 
 
+@router.get("/{unidad_id}/performance-summary", response_model=UnitPerformanceSummaryRead)
+async def get_unidad_performance_summary(
+    unidad_id: int,
+    service: AsyncUnidadService = Depends(get_unidad_service)
+) -> UnitPerformanceSummaryRead:
+    return await service.get_performance_summary(unidad_id)
+
+
+@router.get("/{unidad_id}/dashboard", response_model=UnidadDashboardRead)
+async def get_unidad_dashboard(
+    unidad_id: int,
+    routes_limit: int = Query(default=10, ge=1, le=100, description="Número de rutas recientes a incluir"),
+    service: AsyncUnidadService = Depends(get_unidad_service)
+) -> UnidadDashboardRead:
+    return await service.get_dashboard(unidad_id, routes_limit)
+
+
 @router.patch("/{unidad_id}", response_model=UnidadRead)
-def update_unidad(
+async def update_unidad(
     unidad_id: int,
     unidad_update: UnidadUpdate,
-    service: UnidadService = Depends(get_unidad_service)
+    response: Response,
+    if_match: Optional[str] = Header(default=None, description=IF_MATCH_DESCRIPTION),
+    service: AsyncUnidadService = Depends(get_unidad_service)
 ) -> Unidad:
-    unidad = service.update_unidad(unidad_id, unidad_update)
+    unidad = await service.update_unidad(unidad_id, unidad_update, if_match)
     if not unidad:
         raise HTTPException(status_code=404, detail="Unidad no encontrada")
+    response.headers["ETag"] = etag_for(unidad)
     return unidad
 
 
 @router.delete("/{unidad_id}", status_code=204)
-def delete_unidad(unidad_id: int, service: UnidadService = Depends(get_unidad_service)) -> None:
-    service.delete_unidad(unidad_id)
+async def delete_unidad(unidad_id: int, service: AsyncUnidadService = Depends(get_unidad_service)) -> None:
+    await service.delete_unidad(unidad_id)
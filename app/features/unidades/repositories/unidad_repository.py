@@ -1,8 +1,20 @@
-from typing import Optional, Sequence
+from typing import Iterable, Optional, Sequence, Tuple
 from datetime import datetime
-from sqlmodel import Session, select
+from sqlalchemy import insert, update
+from sqlmodel import Session, and_, select
+from app.features.rendimiento.models.rendimiento import Rendimiento
+from app.features.rendimiento.models.unit_performance_summary import UnitPerformanceSummary
+from app.features.rutas.models.ruta import Ruta
 from app.features.unidades.models.unidad import Unidad
+from app.features.users.models.user import User
 from app.features.unidades.schemas.unidad_schemas import UnidadCreate, UnidadUpdate
+from app.core.config.settings import settings
+from app.core.db.row_counts import count_rows
+from app.shared.etag import version_matches
+from app.shared.integrity import execute_returning_one
+from app.shared.cache import TTLCache
+
+unidad_cache = TTLCache("unidad", settings.CACHE_MAXSIZE, settings.CACHE_TTL_SECONDS)
 
 
 class UnidadRepository:
@@ -10,10 +22,10 @@ class UnidadRepository:
         self.session = session
 
     def create(self, unidad_create: UnidadCreate) -> Unidad:
-        db_unidad = Unidad(**unidad_create.model_dump())
-        self.session.add(db_unidad)
+        row = Unidad(**unidad_create.model_dump()).model_dump(exclude={"id"})
+        statement = insert(Unidad.__table__).values(**row).returning(*Unidad.__table__.columns)
+        db_unidad = Unidad(**execute_returning_one(self.session, statement)._mapping)
         self.session.commit()
-        self.session.refresh(db_unidad)
         return db_unidad
 
     def get_by_id(self, unidad_id: int) -> Optional[Unidad]:
@@ -21,6 +33,48 @@ class UnidadRepository:
         result = self.session.exec(statement).first()
         return result
 
+    def get_version(self, unidad_id: int) -> Optional[datetime]:
+        statement = select(Unidad.updated_at, Unidad.created_at).where(Unidad.id == unidad_id)
+        row = self.session.exec(statement).first()
+        return (row.updated_at or row.created_at) if row else None
+
+    def get_cached(self, unidad_id: int) -> Optional[Unidad]:
+        # Devuelve una copia desacoplada de la sesión: solo para validaciones, no para modificarla
+        data = unidad_cache.get(unidad_id)
+        if data is None:
+            unidad = self.get_by_id(unidad_id)
+            if not unidad:
+                return None
+            data = unidad.model_dump()
+            unidad_cache.set(unidad_id, data)
+        return Unidad(**data)
+
+    def get_by_ids(self, unidad_ids: Iterable[int]) -> Sequence[Unidad]:
+        statement = select(Unidad).where(Unidad.id.in_(set(unidad_ids)))
+        result = self.session.exec(statement).all()
+        return result
+
+    def get_dashboard(
+        self,
+        unidad_id: int,
+        routes_limit: int = 10
+    ) -> Sequence[Tuple[Unidad, User, Optional[UnitPerformanceSummary], Optional[Ruta], Optional[Rendimiento]]]:
+        # Una fila por ruta reciente (o una sola fila sin ruta); unidad, conductor y resumen se repiten
+        recent_route_ids = (
+            select(Ruta.id).where(Ruta.unit_id == unidad_id).order_by(Ruta.id.desc()).limit(routes_limit)
+        )
+        statement = (
+            select(Unidad, User, UnitPerformanceSummary, Ruta, Rendimiento)
+            .join(User, User.id == Unidad.user_id)
+            .outerjoin(UnitPerformanceSummary, UnitPerformanceSummary.unit_id == Unidad.id)
+            .outerjoin(Ruta, and_(Ruta.unit_id == Unidad.id, Ruta.id.in_(recent_route_ids)))
+            .outerjoin(Rendimiento, Rendimiento.route_id == Ruta.id)
+            .where(Unidad.id == unidad_id)
+            .order_by(Ruta.id.desc())
+        )
+        result = self.session.exec(statement).all()
+        return result
+
     def get_by_license_plate(self, license_plate: str) -> Optional[Unidad]:
         statement = select(Unidad).where(Unidad.license_plate == license_plate)
         result = self.session.exec(statement).first()
@@ -36,19 +90,38 @@ class UnidadRepository:
         result = self.session.exec(statement).all()
         return result
 
-    def update(self, unidad: Unidad, unidad_update: UnidadUpdate) -> Unidad:
-        unidad_data = unidad_update.model_dump(exclude_unset=True)
-        for key, value in unidad_data.items():
-            setattr(unidad, key, value)
-        unidad.updated_at = datetime.utcnow()
-        self.session.add(unidad)
+    def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> Sequence[Unidad]:
+        statement = select(Unidad)
+        if after_id is not None:
+            statement = statement.where(Unidad.id > after_id)
+        statement = statement.order_by(Unidad.id).limit(limit)
+        result = self.session.exec(statement).all()
+        return result
+
+    def count(self) -> int:
+        return count_rows(self.session, [Unidad.__tablename__])
+
+    def update(
+        self, unidad: Unidad, unidad_update: UnidadUpdate, expected_version: Optional[datetime] = None
+    ) -> Optional[Unidad]:
+        values = {**unidad_update.model_dump(exclude_unset=True), "updated_at": datetime.utcnow()}
+        table = Unidad.__table__
+        statement = update(table).where(table.c.id == unidad.id)
+        if expected_version is not None:
+            statement = statement.where(version_matches(table, expected_version))
+        statement = statement.values(**values).returning(*table.columns)
+        row = execute_returning_one(self.session, statement)
+        if row is None:
+            self.session.rollback()
+            return None
         self.session.commit()
-        self.session.refresh(unidad)
-        return unidad
+        unidad_cache.invalidate(unidad.id)
+        return Unidad(**row._mapping)
 
     def delete(self, unidad: Unidad) -> bool:
         self.session.delete(unidad)
         self.session.commit()
+        unidad_cache.invalidate(unidad.id)
         return True
 
     def check_license_plate_exists(self, license_plate: str, exclude_id: Optional[int] = None) -> bool:
@@ -0,0 +1,9 @@
+from typing import List
+from app.features.rendimiento.schemas.rendimiento_schemas import UnitPerformanceSummaryRead
+from app.features.rutas.schemas.ruta_schemas import RutaWithPerformanceRead
+from app.features.unidades.schemas.unidad_schemas import UnidadWithDriverRead
+
+
+class UnidadDashboardRead(UnidadWithDriverRead):
+    performance_summary: UnitPerformanceSummaryRead
+    recent_routes: List[RutaWithPerformanceRead]
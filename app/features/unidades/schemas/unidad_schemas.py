@@ -1,6 +1,7 @@
 from typing import Optional
 from sqlmodel import SQLModel
 from datetime import datetime
+from app.features.users.schemas.user_schemas import UserRead
 
 
 class UnidadBase(SQLModel):
@@ -30,3 +31,7 @@ class UnidadRead(UnidadBase):
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime]
+
+
+class UnidadWithDriverRead(UnidadRead):
+    driver: UserRead
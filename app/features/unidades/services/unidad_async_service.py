@@ -0,0 +1,46 @@
+from datetime import datetime
+from typing import Optional, Sequence
+from app.core.db.runner import AsyncService
+from app.features.rendimiento.schemas.rendimiento_schemas import UnitPerformanceSummaryRead
+from app.features.unidades.models.unidad import Unidad
+from app.features.unidades.schemas.unidad_dashboard_schemas import UnidadDashboardRead
+from app.features.unidades.schemas.unidad_schemas import UnidadCreate, UnidadUpdate
+from app.shared.pagination import Page
+from app.features.unidades.services.unidad_service import UnidadService
+
+
+class AsyncUnidadService(AsyncService[UnidadService]):
+    async def create_unidad(self, unidad_create: UnidadCreate) -> Unidad:
+        return await self.runner.call(self.service.create_unidad, unidad_create)
+
+    async def get_unidad_by_id(self, unidad_id: int) -> Optional[Unidad]:
+        return await self.runner.call(self.service.get_unidad_by_id, unidad_id)
+
+    async def get_unidad_version(self, unidad_id: int) -> Optional[datetime]:
+        return await self.runner.call(self.service.get_unidad_version, unidad_id)
+
+    async def get_all_unidades(self, offset: int = 0, limit: int = 100) -> Sequence[Unidad]:
+        return await self.runner.call(self.service.get_all_unidades, offset, limit)
+
+    async def count_unidades(self) -> int:
+        return await self.runner.call(self.service.count_unidades)
+
+    async def get_unidades_page(self, cursor: str, limit: int = 100) -> Page:
+        return await self.runner.call(self.service.get_unidades_page, cursor, limit)
+
+    async def get_performance_summary(self, unidad_id: int) -> UnitPerformanceSummaryRead:
+        return await self.runner.call(self.service.get_performance_summary, unidad_id)
+
+    async def get_dashboard(self, unidad_id: int, routes_limit: int = 10) -> UnidadDashboardRead:
+        return await self.runner.call(self.service.get_dashboard, unidad_id, routes_limit)
+
+    async def update_unidad(
+        self,
+        unidad_id: int,
+        unidad_update: UnidadUpdate,
+        if_match: Optional[str] = None
+    ) -> Optional[Unidad]:
+        return await self.runner.call(self.service.update_unidad, unidad_id, unidad_update, if_match)
+
+    async def delete_unidad(self, unidad_id: int) -> bool:
+        return await self.runner.call(self.service.delete_unidad, unidad_id)
@@ -1,44 +1,61 @@
+from datetime import datetime
 from typing import Optional, Sequence, List
 from fastapi import HTTPException
+from sqlalchemy.exc import IntegrityError
 from app.features.unidades.repositories.unidad_repository import UnidadRepository
 from app.features.unidades.schemas.unidad_schemas import UnidadCreate, UnidadUpdate
 from app.features.unidades.models.unidad import Unidad
 from app.features.users.repositories.user_repository import UserRepository
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.models.unit_performance_summary import UnitPerformanceSummary
+from app.features.rendimiento.schemas.rendimiento_schemas import UnitPerformanceSummaryRead
+from app.features.rutas.schemas.ruta_schemas import RutaWithPerformanceRead
+from app.features.unidades.schemas.unidad_dashboard_schemas import UnidadDashboardRead
+from app.shared.etag import check_if_match, precondition_failed
+from app.shared.integrity import raise_unique_violation
+from app.shared.pagination import Page, build_page, decode_cursor
+
+UNIDAD_UNIQUE_MESSAGES = {
+    # Relación 1:1 usuario-unidad
+    "unidad.user_id": "Este usuario ya tiene una unidad asignada. Cada usuario puede tener solo una unidad.",
+    "unidad.license_plate": "La placa ya está registrada",
+}
 
 
 class UnidadService:
-    def __init__(self, repository: UnidadRepository, user_repository: UserRepository):
+    def __init__(
+        self,
+        repository: UnidadRepository,
+        user_repository: UserRepository,
+        summary_repository: UnitPerformanceSummaryRepository
+    ):
         self.repository = repository
         self.user_repository = user_repository
+        self.summary_repository = summary_repository
 
     def create_unidad(self, unidad_create: UnidadCreate) -> Unidad:
         user = self.user_repository.get_by_id(unidad_create.user_id)
         if not user:
             raise HTTPException(status_code=404, detail="Usuario no encontrado")
 
-        # Verificar que el usuario no tenga ya una unidad asignada (relación 1:1)
-        existing_user_unidad = self.repository.get_by_user_id(unidad_create.user_id)
-        if existing_user_unidad:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Este usuario ya tiene una unidad asignada. Cada usuario puede tener solo una unidad."
-            )
-
-        existing_unidad = self.repository.get_by_license_plate(unidad_create.license_plate)
-        if existing_unidad:
-            raise HTTPException(status_code=400, detail="La placa ya está registrada")
-
         if unidad_create.year < 1900 or unidad_create.year > 2026:
             raise HTTPException(status_code=400, detail="Año inválido")
 
         if unidad_create.capacity <= 0:
             raise HTTPException(status_code=400, detail="La capacidad debe ser mayor a 0")
 
-        return self.repository.create(unidad_create)
+        # Usuario con unidad y placa repetida los detectan los índices únicos al insertar
+        try:
+            return self.repository.create(unidad_create)
+        except IntegrityError as exc:
+            raise_unique_violation(exc, UNIDAD_UNIQUE_MESSAGES)
 
     def get_unidad_by_id(self, unidad_id: int) -> Optional[Unidad]:
         return self.repository.get_by_id(unidad_id)
 
+    def get_unidad_version(self, unidad_id: int) -> Optional[datetime]:
+        return self.repository.get_version(unidad_id)
+
     def get_unidades_by_user(self, user_id: int, offset: int = 0, limit: int = 100) -> List[Unidad]:
         user = self.user_repository.get_by_id(user_id)
         if not user:
@@ -49,15 +66,78 @@ class UnidadService:
     def get_all_unidades(self, offset: int = 0, limit: int = 100) -> Sequence[Unidad]:
         return self.repository.get_all(offset, limit)
 
-    def update_unidad(self, unidad_id: int, unidad_update: UnidadUpdate) -> Optional[Unidad]:
+    def count_unidades(self) -> int:
+        return self.repository.count()
+
+    def get_unidades_page(self, cursor: str, limit: int = 100) -> Page:
+        after_id = decode_cursor(cursor).get("id")
+        unidades = self.repository.get_page(after_id, limit + 1)
+        return build_page(unidades, limit, lambda unidad: {"id": unidad.id})
+
+    def get_performance_summary(self, unidad_id: int) -> UnitPerformanceSummaryRead:
+        summary = self.summary_repository.get_by_unit_id(unidad_id)
+        if not summary:
+            # Solo se consulta la unidad cuando aún no tiene rendimientos registrados
+            unidad = self.repository.get_by_id(unidad_id)
+            if not unidad:
+                raise HTTPException(status_code=404, detail="Unidad no encontrada")
+        return self._build_summary_read(unidad_id, summary)
+
+    def _build_summary_read(
+        self,
+        unidad_id: int,
+        summary: Optional[UnitPerformanceSummary]
+    ) -> UnitPerformanceSummaryRead:
+        if not summary:
+            return UnitPerformanceSummaryRead(
+                unit_id=unidad_id,
+                total_routes=0,
+                total_distance_km=0.0,
+                total_fuel_liters=0.0,
+                total_time_hours=0.0,
+                average_efficiency_score=0.0,
+                updated_at=None
+            )
+
+        average_efficiency_score = (
+            summary.efficiency_score_sum / summary.total_routes
+            if summary.total_routes > 0 else 0.0
+        )
+        return UnitPerformanceSummaryRead(
+            unit_id=summary.unit_id,
+            total_routes=summary.total_routes,
+            total_distance_km=round(summary.total_distance_km, 2),
+            total_fuel_liters=round(summary.total_fuel_liters, 2),
+            total_time_hours=round(summary.total_time_hours, 2),
+            average_efficiency_score=round(average_efficiency_score, 2),
+            updated_at=summary.updated_at
+        )
+
+    def get_dashboard(self, unidad_id: int, routes_limit: int = 10) -> UnidadDashboardRead:
+        rows = self.repository.get_dashboard(unidad_id, routes_limit)
+        if not rows:
+            raise HTTPException(status_code=404, detail="Unidad no encontrada")
+
+        unidad, user, summary, _, _ = rows[0]
+        return UnidadDashboardRead(
+            **unidad.model_dump(),
+            driver=user.model_dump(),
+            performance_summary=self._build_summary_read(unidad_id, summary),
+            recent_routes=[
+                RutaWithPerformanceRead(
+                    **ruta.model_dump(),
+                    performance=rendimiento.model_dump() if rendimiento else None
+                )
+                for _, _, _, ruta, rendimiento in rows
+                if ruta is not None
+            ],
+        )
+
+    def update_unidad(self, unidad_id: int, unidad_update: UnidadUpdate, if_match: Optional[str] = None) -> Optional[Unidad]:
         unidad = self.repository.get_by_id(unidad_id)
         if not unidad:
             raise HTTPException(status_code=404, detail="Unidad no encontrada")
-
-        if unidad_update.license_plate:
-            existing = self.repository.check_license_plate_exists(unidad_update.license_plate, unidad_id)
-            if existing:
-                raise HTTPException(status_code=400, detail="La placa ya está registrada")
+        expected_version = check_if_match(if_match, unidad)
 
         if unidad_update.year is not None:
             if unidad_update.year < 1900 or unidad_update.year > 2026:
@@ -66,7 +146,13 @@ class UnidadService:
         if unidad_update.capacity is not None and unidad_update.capacity <= 0:
             raise HTTPException(status_code=400, detail="La capacidad debe ser mayor a 0")
 
-        return self.repository.update(unidad, unidad_update)
+        try:
+            updated = self.repository.update(unidad, unidad_update, expected_version)
+        except IntegrityError as exc:
+            raise_unique_violation(exc, UNIDAD_UNIQUE_MESSAGES)
+        if updated is None and expected_version is not None:
+            raise precondition_failed()
+        return updated
 
     def delete_unidad(self, unidad_id: int) -> bool:
         unidad = self.repository.get_by_id(unidad_id)
@@ -1,13 +1,14 @@
 from fastapi import Depends
 from sqlmodel import Session
-from app.core.db.session import get_session
+from app.core.db.runner import SessionRunner, get_session_runner
 from app.features.users.repositories.user_repository import UserRepository
+from app.features.users.services.user_async_service import AsyncUserService
 from app.features.users.services.user_service import UserService
 
 
-def get_user_repository(session: Session = Depends(get_session)) -> UserRepository:
-    return UserRepository(session)
+def build_user_service(session: Session) -> UserService:
+    return UserService(UserRepository(session))
 
 
-def get_user_service(repository: UserRepository = Depends(get_user_repository)) -> UserService:
-    return UserService(repository)
+def get_user_service(runner: SessionRunner = Depends(get_session_runner)) -> AsyncUserService:
+    return AsyncUserService(runner, build_user_service(runner.sync_session))
@@ -1,54 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import Sequence
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
+from typing import Optional, Sequence, Union
 from sqlmodel import Session
 from app.core.db.session import get_session
 from app.features.users.api.dependencies import get_user_service
-from app.features.users.services.user_service import UserService
-from app.features.users.schemas.user_schemas import UserCreate, UserUpdate, UserRead
+from app.features.users.services.user_async_service import AsyncUserService
+from app.features.users.schemas.user_schemas import (
+    UserCreate, UserUpdate, UserRead, UserBulkCreate, UserBulkResult
+)
+from app.features.users.services.password_hasher import hash_password_async
 from app.features.users.models.user import User
+from app.shared.etag import IF_MATCH_DESCRIPTION, IF_NONE_MATCH_DESCRIPTION, etag_for, not_modified_response
+from app.shared.pagination import CURSOR_DESCRIPTION, TOTAL_COUNT_HEADER, WITH_COUNT_DESCRIPTION, Page
 
 router = APIRouter(prefix="/users", tags=["users"])
 
 
 @router.post("", response_model=UserRead, status_code=201)
-def create_user(user_create: UserCreate, service: UserService = Depends(get_user_service)) -> User:
-    existing_user = service.get_user_by_email(user_create.email)
+async def create_user(user_create: UserCreate, service: AsyncUserService = Depends(get_user_service)) -> User:
+    # Se consulta antes para no calcular el hash de un correo repetido; el índice único cubre la carrera
+    existing_user = await service.get_user_by_email(user_create.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="El correo electrónico ya está registrado")
-    return service.create_user(user_create)
+    hashed_password = await hash_password_async(user_create.password)
+    return await service.create_user(user_create, hashed_password)
 
 
-@router.get("", response_model=Sequence[UserRead])
-def get_users(
+@router.post("/bulk", response_model=UserBulkResult)
+async def create_users_bulk(
+    bulk_create: UserBulkCreate,
+    service: AsyncUserService = Depends(get_user_service)
+) -> UserBulkResult:
+    return await service.create_users_bulk(bulk_create)
+
+
+@router.get("", response_model=Union[Sequence[UserRead], Page[UserRead]])
+async def get_users(
+    response: Response,
     offset: int = Query(default=0, ge=0, description="Número de registros a saltar (paginación)"),
     limit: int = Query(default=100, ge=1, le=100, description="Número máximo de registros a devolver"),
-    service: UserService = Depends(get_user_service)
-) -> Sequence[User]:
-    return service.get_all_users(offset, limit)
+    cursor: Optional[str] = Query(default=None, description=CURSOR_DESCRIPTION),
+    with_count: bool = Query(default=False, description=WITH_COUNT_DESCRIPTION),
+    service: AsyncUserService = Depends(get_user_service)
+) -> Union[Sequence[User], Page]:
+    if with_count:
+        response.headers[TOTAL_COUNT_HEADER] = str(await service.count_users())
+    if cursor is not None:
+        return await service.get_users_page(cursor, limit)
+    return await service.get_all_users(offset, limit)
 
 
 @router.get("/{user_id}", response_model=UserRead)
-def get_user(user_id: int, service: UserService = Depends(get_user_service)) -> User:
-    user = service.get_user_by_id(user_id)
+async def get_user(
+    user_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(default=None, description=IF_NONE_MATCH_DESCRIPTION),
+    service: AsyncUserService = Depends(get_user_service)
+) -> User:
+    if if_none_match:
+        cached = not_modified_response(if_none_match, user_id, await service.get_user_version(user_id))
+        if cached:
+            return cached
+    user = await service.get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    response.headers["ETag"] = etag_for(user)
     return user
 
 
 @router.patch("/{user_id}", response_model=UserRead)
-def update_user(
+async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    service: UserService = Depends(get_user_service)
+    response: Response,
+    if_match: Optional[str] = Header(default=None, description=IF_MATCH_DESCRIPTION),
+    service: AsyncUserService = Depends(get_user_service)
 ) -> User:
-    user = service.update_user(user_id, user_update)
+    user = await service.update_user(user_id, user_update, if_match)
     if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    response.headers["ETag"] = etag_for(user)
     return user
 
 
 @router.delete("/{user_id}", status_code=204)
-def delete_user(user_id: int, service: UserService = Depends(get_user_service)) -> None:
-    success = service.delete_user(user_id)
+async def delete_user(user_id: int, service: AsyncUserService = Depends(get_user_service)) -> None:
+    success = await service.delete_user(user_id)
     if not success:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
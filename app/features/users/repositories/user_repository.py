@@ -1,8 +1,12 @@
-from typing import Optional, Sequence
+from typing import Iterable, List, Optional, Sequence
 from datetime import datetime
+from sqlalchemy import insert, update
 from sqlmodel import Session, select
+from app.core.db.row_counts import count_rows
 from app.features.users.models.user import User
 from app.features.users.schemas.user_schemas import UserCreate, UserUpdate
+from app.shared.etag import version_matches
+from app.shared.integrity import execute_returning_all, execute_returning_one
 
 
 class UserRepository:
@@ -10,42 +14,88 @@ class UserRepository:
         self.session = session
 
     def create(self, user_create: UserCreate, hashed_password: str) -> User:
-        db_user = User(
+        row = User(
             email=user_create.email,
             username=user_create.username,
             full_name=user_create.full_name,
             phone=user_create.phone,
             hashed_password=hashed_password
-        )
-        self.session.add(db_user)
+        ).model_dump(exclude={"id"})
+        statement = insert(User.__table__).values(**row).returning(*User.__table__.columns)
+        db_user = User(**execute_returning_one(self.session, statement)._mapping)
         self.session.commit()
-        self.session.refresh(db_user)
         return db_user
 
+    def create_many(self, user_creates: Sequence[UserCreate], hashed_passwords: Sequence[str]) -> List[User]:
+        rows = [
+            User(
+                email=user_create.email,
+                username=user_create.username,
+                full_name=user_create.full_name,
+                phone=user_create.phone,
+                hashed_password=hashed_password
+            ).model_dump(exclude={"id"})
+            for user_create, hashed_password in zip(user_creates, hashed_passwords)
+        ]
+        if not rows:
+            return []
+        statement = insert(User.__table__).returning(*User.__table__.columns)
+        result = execute_returning_all(self.session, statement, rows)
+        users = sorted((User(**row._mapping) for row in result), key=lambda user: user.id)
+        self.session.commit()
+        return users
+
     def get_by_id(self, user_id: int) -> Optional[User]:
         statement = select(User).where(User.id == user_id)
         result = self.session.exec(statement).first()
         return result
 
+    def get_version(self, user_id: int) -> Optional[datetime]:
+        statement = select(User.updated_at, User.created_at).where(User.id == user_id)
+        row = self.session.exec(statement).first()
+        return (row.updated_at or row.created_at) if row else None
+
     def get_by_email(self, email: str) -> Optional[User]:
         statement = select(User).where(User.email == email)
         result = self.session.exec(statement).first()
         return result
 
+    def get_existing_emails(self, emails: Iterable[str]) -> Sequence[str]:
+        statement = select(User.email).where(User.email.in_(set(emails)))
+        result = self.session.exec(statement).all()
+        return result
+
     def get_all(self, offset: int = 0, limit: int = 100) -> Sequence[User]:
         statement = select(User).offset(offset).limit(limit)
         result = self.session.exec(statement).all()
         return result
 
-    def update(self, user: User, user_update: UserUpdate) -> User:
-        user_data = user_update.model_dump(exclude_unset=True)
-        for key, value in user_data.items():
-            setattr(user, key, value)
-        user.updated_at = datetime.utcnow()
-        self.session.add(user)
+    def get_page(self, after_id: Optional[int] = None, limit: int = 100) -> Sequence[User]:
+        statement = select(User)
+        if after_id is not None:
+            statement = statement.where(User.id > after_id)
+        statement = statement.order_by(User.id).limit(limit)
+        result = self.session.exec(statement).all()
+        return result
+
+    def count(self) -> int:
+        return count_rows(self.session, [User.__tablename__])
+
+    def update(
+        self, user: User, user_update: UserUpdate, expected_version: Optional[datetime] = None
+    ) -> Optional[User]:
+        values = {**user_update.model_dump(exclude_unset=True), "updated_at": datetime.utcnow()}
+        table = User.__table__
+        statement = update(table).where(table.c.id == user.id)
+        if expected_version is not None:
+            statement = statement.where(version_matches(table, expected_version))
+        statement = statement.values(**values).returning(*table.columns)
+        row = execute_returning_one(self.session, statement)
+        if row is None:
+            self.session.rollback()
+            return None
         self.session.commit()
-        self.session.refresh(user)
-        return user
+        return User(**row._mapping)
 
     def delete(self, user: User) -> bool:
         self.session.delete(user)
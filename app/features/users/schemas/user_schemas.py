@@ -1,5 +1,5 @@
-from typing import Optional
-from sqlmodel import SQLModel
+from typing import List, Optional
+from sqlmodel import Field, SQLModel
 from datetime import datetime
 
 
@@ -28,3 +28,18 @@ class UserRead(UserBase):
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime]
+
+
+class UserBulkCreate(SQLModel):
+    users: List[UserCreate] = Field(min_length=1, max_length=500)
+
+
+class UserBulkError(SQLModel):
+    index: int
+    status_code: int
+    detail: str
+
+
+class UserBulkResult(SQLModel):
+    created: List[UserRead]
+    errors: List[UserBulkError]
@@ -0,0 +1,58 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence
+from passlib.context import CryptContext
+from app.core.config.settings import settings
+
+# Un solo CryptContext por proceso (también en los procesos del pool)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    # El lifespan lo crea al arrancar; fuera del servidor (scripts, benchmarks) se crea al primer uso.
+    # forkserver y no fork: hacer fork del servidor, que ya tiene hilos (threadpool, aiosqlite, pool de conexiones),
+    # copia a los workers locks tomados por otros hilos y puede bloquearlos
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+            if "forkserver" in multiprocessing.get_all_start_methods():
+                context = multiprocessing.get_context("forkserver")
+                # Los workers salen del forkserver con este módulo (passlib y bcrypt) ya importado
+                context.set_forkserver_preload([__name__])
+            else:
+                context = multiprocessing.get_context("spawn")
+            _executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+        return _executor
+
+
+def start_hash_executor() -> None:
+    get_hash_executor()
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), hash_password, password)
+
+
+async def hash_passwords_async(passwords: Sequence[str]) -> List[str]:
+    return list(await asyncio.gather(*(hash_password_async(password) for password in passwords)))
+
+
+def shutdown_hash_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            # Esperar a que terminen los workers libera sus semáforos; los hashes pendientes se cancelan
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
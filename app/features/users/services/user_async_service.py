@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.core.db.runner import AsyncService
+from app.features.users.models.user import User
+from app.features.users.schemas.user_schemas import (
+    UserBulkCreate, UserBulkError, UserBulkResult, UserCreate, UserUpdate
+)
+from app.features.users.services.password_hasher import hash_passwords_async
+from app.shared.pagination import Page
+from app.features.users.services.user_service import UserService
+
+
+class AsyncUserService(AsyncService[UserService]):
+    async def create_user(self, user_create: UserCreate, hashed_password: Optional[str] = None) -> User:
+        return await self.runner.call(self.service.create_user, user_create, hashed_password)
+
+    async def validate_users_bulk(self, bulk_create: UserBulkCreate) -> List[UserBulkError]:
+        return await self.runner.call(self.service.validate_users_bulk, bulk_create)
+
+    async def create_users_bulk(self, bulk_create: UserBulkCreate) -> UserBulkResult:
+        errors = await self.validate_users_bulk(bulk_create)
+        valid_users = self.service.valid_users_bulk(bulk_create, errors)
+
+        # Los hashes se calculan en paralelo en el pool de procesos, fuera del event loop y sin ocupar la sesión
+        hashed_passwords = await hash_passwords_async([user.password for user in valid_users.values()])
+        created, conflicts = await self.insert_users_bulk(valid_users, hashed_passwords)
+        return UserBulkResult(created=created, errors=sorted(errors + conflicts, key=lambda error: error.index))
+
+    async def insert_users_bulk(
+        self,
+        valid_users: Dict[int, UserCreate],
+        hashed_passwords: Sequence[str]
+    ) -> Tuple[List[User], List[UserBulkError]]:
+        return await self.runner.call(self.service.insert_users_bulk, valid_users, hashed_passwords)
+
+    async def get_user_by_id(self, user_id: int) -> Optional[User]:
+        return await self.runner.call(self.service.get_user_by_id, user_id)
+
+    async def get_user_version(self, user_id: int) -> Optional[datetime]:
+        return await self.runner.call(self.service.get_user_version, user_id)
+
+    async def get_user_by_email(self, email: str) -> Optional[User]:
+        return await self.runner.call(self.service.get_user_by_email, email)
+
+    async def get_all_users(self, offset: int = 0, limit: int = 100) -> Sequence[User]:
+        return await self.runner.call(self.service.get_all_users, offset, limit)
+
+    async def count_users(self) -> int:
+        return await self.runner.call(self.service.count_users)
+
+    async def get_users_page(self, cursor: str, limit: int = 100) -> Page:
+        return await self.runner.call(self.service.get_users_page, cursor, limit)
+
+    async def update_user(
+        self,
+        user_id: int,
+        user_update: UserUpdate,
+        if_match: Optional[str] = None
+    ) -> Optional[User]:
+        return await self.runner.call(self.service.update_user, user_id, user_update, if_match)
+
+    async def delete_user(self, user_id: int) -> bool:
+        return await self.runner.call(self.service.delete_user, user_id)
@@ -1,36 +1,118 @@
-from typing import Optional, Sequence
-from passlib.context import CryptContext
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.exc import IntegrityError
 from app.features.users.repositories.user_repository import UserRepository
-from app.features.users.schemas.user_schemas import UserCreate, UserUpdate
+from app.features.users.schemas.user_schemas import (
+    UserCreate, UserUpdate, UserBulkCreate, UserBulkError
+)
+from app.features.users.services import password_hasher
 from app.features.users.models.user import User
+from app.shared.etag import check_if_match, precondition_failed
+from app.shared.integrity import raise_unique_violation, unique_violation_column
+from app.shared.pagination import Page, build_page, decode_cursor
+
+USER_UNIQUE_MESSAGES = {
+    "user.email": "El correo electrónico ya está registrado",
+}
 
 
 class UserService:
     def __init__(self, repository: UserRepository):
         self.repository = repository
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
     def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+        return password_hasher.hash_password(password)
+
+    def create_user(self, user_create: UserCreate, hashed_password: Optional[str] = None) -> User:
+        # Las rutas calculan el hash en el pool de procesos y lo pasan ya listo
+        if hashed_password is None:
+            hashed_password = self.hash_password(user_create.password)
+        try:
+            return self.repository.create(user_create, hashed_password)
+        except IntegrityError as exc:
+            raise_unique_violation(exc, USER_UNIQUE_MESSAGES)
+
+    def validate_users_bulk(self, bulk_create: UserBulkCreate) -> List[UserBulkError]:
+        existing_emails = set(self.repository.get_existing_emails(u.email for u in bulk_create.users))
+        seen_emails = set()
+        errors = []
+        for index, user_create in enumerate(bulk_create.users):
+            if user_create.email in existing_emails:
+                errors.append(UserBulkError(
+                    index=index, status_code=400, detail="El correo electrónico ya está registrado"
+                ))
+            elif user_create.email in seen_emails:
+                errors.append(UserBulkError(
+                    index=index, status_code=400, detail="El correo electrónico está repetido en el lote"
+                ))
+            seen_emails.add(user_create.email)
+        return errors
+
+    def valid_users_bulk(self, bulk_create: UserBulkCreate, errors: Sequence[UserBulkError]) -> Dict[int, UserCreate]:
+        # Por índice en el lote, para reportar después los errores con el índice original
+        rejected = {error.index for error in errors}
+        return {index: user for index, user in enumerate(bulk_create.users) if index not in rejected}
 
-    def create_user(self, user_create: UserCreate) -> User:
-        hashed_password = self.hash_password(user_create.password)
-        return self.repository.create(user_create, hashed_password)
+    def insert_users_bulk(
+        self,
+        valid_users: Dict[int, UserCreate],
+        hashed_passwords: Sequence[str]
+    ) -> Tuple[List[User], List[UserBulkError]]:
+        # validate_users_bulk no cubre un alta concurrente del mismo correo; el índice único sí. Las filas cuyo
+        # correo se registró entre la validación y el INSERT pasan a errores y se insertan las demás
+        pending = dict(zip(valid_users, zip(valid_users.values(), hashed_passwords)))
+        errors: List[UserBulkError] = []
+        while True:
+            try:
+                created = self.repository.create_many(
+                    [user for user, _ in pending.values()], [hashed for _, hashed in pending.values()]
+                )
+                return created, errors
+            except IntegrityError as exc:
+                if unique_violation_column(exc) != "user.email":
+                    raise_unique_violation(exc, USER_UNIQUE_MESSAGES)
+                taken = set(self.repository.get_existing_emails(user.email for user, _ in pending.values()))
+                if not taken:
+                    raise_unique_violation(exc, USER_UNIQUE_MESSAGES)
+                for index, (user, _) in list(pending.items()):
+                    if user.email in taken:
+                        del pending[index]
+                        errors.append(UserBulkError(
+                            index=index, status_code=400, detail=USER_UNIQUE_MESSAGES["user.email"]
+                        ))
 
     def get_user_by_id(self, user_id: int) -> Optional[User]:
         return self.repository.get_by_id(user_id)
 
+    def get_user_version(self, user_id: int) -> Optional[datetime]:
+        return self.repository.get_version(user_id)
+
     def get_user_by_email(self, email: str) -> Optional[User]:
         return self.repository.get_by_email(email)
 
     def get_all_users(self, offset: int = 0, limit: int = 100) -> Sequence[User]:
         return self.repository.get_all(offset, limit)
 
-    def update_user(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    def count_users(self) -> int:
+        return self.repository.count()
+
+    def get_users_page(self, cursor: str, limit: int = 100) -> Page:
+        after_id = decode_cursor(cursor).get("id")
+        users = self.repository.get_page(after_id, limit + 1)
+        return build_page(users, limit, lambda user: {"id": user.id})
+
+    def update_user(self, user_id: int, user_update: UserUpdate, if_match: Optional[str] = None) -> Optional[User]:
         user = self.repository.get_by_id(user_id)
         if not user:
             return None
-        return self.repository.update(user, user_update)
+        expected_version = check_if_match(if_match, user)
+        try:
+            updated = self.repository.update(user, user_update, expected_version)
+        except IntegrityError as exc:
+            raise_unique_violation(exc, USER_UNIQUE_MESSAGES)
+        if updated is None and expected_version is not None:
+            raise precondition_failed()
+        return updated
 
     def delete_user(self, user_id: int) -> bool:
         user = self.repository.get_by_id(user_id)
@@ -0,0 +1,29 @@
+from typing import Any, Iterable
+from sqlalchemy import Column, Index, Table, select, union_all
+
+INCLUDE_ARCHIVED_DESCRIPTION = (
+    "Incluir rutas y rendimientos archivados por el job de retención (python manage.py archive-routes)"
+)
+
+
+def archive_table(source: Table, name: str) -> Table:
+    # Mismas columnas e índices que la tabla en vivo, sin llaves foráneas: una fila archivada puede
+    # apuntar a filas que siguen en vivo (unidad) o que también se archivaron (ruta)
+    columns = [
+        Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+        for column in source.columns
+    ]
+    indexes = [
+        Index(
+            index.name.replace(source.name, name, 1),
+            *(column.name for column in index.columns),
+            unique=index.unique
+        )
+        for index in source.indexes
+    ]
+    return Table(name, source.metadata, *columns, *indexes)
+
+
+def union_archive(statements: Iterable[Any]) -> Any:
+    # Cada rama se envuelve en un subquery para conservar su ORDER BY/LIMIT dentro del UNION ALL
+    return union_all(*(select(*statement.subquery().c) for statement in statements)).subquery()
@@ -0,0 +1,58 @@
+from datetime import datetime
+from typing import Any, Optional
+from fastapi import HTTPException, Response
+from sqlalchemy import Table, func
+from sqlalchemy.sql import ColumnElement
+
+IF_NONE_MATCH_DESCRIPTION = "ETag de una respuesta anterior; si el recurso no cambió se responde 304 sin cuerpo"
+IF_MATCH_DESCRIPTION = "ETag esperado del recurso; si cambió se responde 412 y no se aplica la actualización"
+EPOCH = datetime(1970, 1, 1)
+
+
+def make_etag(resource_id: int, version: datetime) -> str:
+    # version = updated_at, o created_at si nunca se actualizó; cada escritura la renueva
+    microseconds = (version.replace(tzinfo=None) - EPOCH) // datetime.resolution
+    return f'W/"{resource_id}-{microseconds:x}"'
+
+
+def etag_for(resource: Any) -> str:
+    return make_etag(resource.id, resource.updated_at or resource.created_at)
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    # Comparación débil también para If-Match: todos los ETags de la API son débiles
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified_response(if_none_match: Optional[str], resource_id: int, version: Optional[datetime]) -> Optional[Response]:
+    if version is None:
+        return None
+    etag = make_etag(resource_id, version)
+    if not etag_matches(if_none_match, etag):
+        return None
+    return Response(status_code=304, headers={"ETag": etag})
+
+
+def precondition_failed() -> HTTPException:
+    return HTTPException(status_code=412, detail="El recurso fue modificado por otra solicitud")
+
+
+def check_if_match(if_match: Optional[str], resource: Any) -> Optional[datetime]:
+    # Devuelve la versión leída para que el UPDATE la exija en su WHERE (version_matches): si otra solicitud
+    # escribe entre la lectura y el UPDATE no vuelve fila y se responde 412. None sin If-Match o con "*"
+    if if_match is None:
+        return None
+    if not etag_matches(if_match, etag_for(resource)):
+        raise precondition_failed()
+    if if_match.strip() == "*":
+        return None
+    return resource.updated_at or resource.created_at
+
+
+def version_matches(table: Table, version: datetime) -> ColumnElement:
+    return func.coalesce(table.c.updated_at, table.c.created_at) == version
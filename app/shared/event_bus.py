@@ -0,0 +1,131 @@
+import asyncio
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, Dict, Hashable, List, NamedTuple, Optional, Set, Tuple
+
+from app.core.metrics.registry import Counter, Gauge
+
+event_subscribers = Gauge("event_subscribers", "Suscriptores conectados a un bus de eventos", ("bus",))
+events_published_total = Counter("events_published_total", "Eventos publicados", ("bus",))
+events_dropped_total = Counter(
+    "events_dropped_total", "Eventos descartados porque la cola de un suscriptor estaba llena", ("bus",)
+)
+
+
+class Event(NamedTuple):
+    id: int
+    type: str
+    # Eventos pendientes con la misma llave se combinan: el suscriptor recibe solo el más reciente
+    key: Hashable
+    data: Dict[str, Any]
+
+
+class Subscription:
+    """Cola acotada de un suscriptor; se consume desde el event loop donde se creó."""
+
+    def __init__(self, bus: "EventBus", matches: Callable[[Event], bool], maxsize: int, after_id: int):
+        self.bus = bus
+        self.matches = matches
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.loop = asyncio.get_running_loop()
+        # Eventos hasta este id ya se repitieron desde el buffer al suscribirse
+        self._after_id = after_id
+        self._pending: "OrderedDict[Hashable, Event]" = OrderedDict()
+        self._wakeup = asyncio.Event()
+
+    def _offer(self, event: Event) -> None:
+        if event.id > self._after_id and self.matches(event):
+            self._enqueue(event)
+
+    def _enqueue(self, event: Event) -> None:
+        # Solo en el event loop del suscriptor
+        self._pending.pop(event.key, None)
+        self._pending[event.key] = event
+        while len(self._pending) > self.maxsize:
+            self._pending.popitem(last=False)
+            self.dropped += 1
+            events_dropped_total.inc(self.bus.name)
+        self._wakeup.set()
+
+    async def next_batch(self, timeout: float) -> Tuple[List[Event], int]:
+        """Espera hasta timeout segundos; devuelve los eventos pendientes y cuántos se descartaron."""
+        if not self._pending and not self.dropped:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self._wakeup.clear()
+        events = list(self._pending.values())
+        self._pending.clear()
+        dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+    def close(self) -> None:
+        self.bus.unsubscribe(self)
+
+
+class EventBus:
+    """Pub/sub en memoria del proceso: publish es seguro desde cualquier hilo y nunca bloquea al publicador.
+
+    Guarda los últimos buffer_size eventos para que un cliente que se reconecta con el último id recibido
+    continúe sin volver a consultar la base de datos.
+    """
+
+    def __init__(self, name: str, buffer_size: int, queue_size: int):
+        self.name = name
+        self.queue_size = queue_size
+        self._last_id = 0
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        # Suscriptores agrupados por event loop: publicar cuesta una llamada por loop, no por suscriptor
+        self._subscribers: Dict[asyncio.AbstractEventLoop, Set[Subscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, event_type: str, key: Hashable, data: Dict[str, Any]) -> Event:
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, key, data)
+            self._buffer.append(event)
+            # Se programa dentro del lock para que cada loop reciba los eventos en orden de id
+            for loop in list(self._subscribers):
+                try:
+                    loop.call_soon_threadsafe(self._dispatch, loop, event)
+                except RuntimeError:
+                    # El event loop de esos suscriptores ya se cerró
+                    event_subscribers.dec(self.name, amount=len(self._subscribers.pop(loop)))
+        events_published_total.inc(self.name)
+        return event
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, event: Event) -> None:
+        with self._lock:
+            subscriptions = list(self._subscribers.get(loop, ()))
+        for subscription in subscriptions:
+            subscription._offer(event)
+
+    def subscribe(self, matches: Callable[[Event], bool], last_event_id: Optional[int] = None) -> Subscription:
+        """Registra un suscriptor; con last_event_id repite los eventos posteriores que siguen en el buffer.
+
+        Si el id ya salió del buffer (o es de otro proceso) el suscriptor empieza marcado con eventos perdidos.
+        """
+        with self._lock:
+            subscription = Subscription(self, matches, self.queue_size, self._last_id)
+            if last_event_id is not None:
+                oldest = self._buffer[0].id if self._buffer else self._last_id + 1
+                if last_event_id < oldest - 1 or last_event_id > self._last_id:
+                    subscription.dropped += 1
+                for event in self._buffer:
+                    if event.id > last_event_id and matches(event):
+                        subscription._enqueue(event)
+            self._subscribers.setdefault(subscription.loop, set()).add(subscription)
+        event_subscribers.inc(self.name)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscribers.get(subscription.loop)
+            if not subscriptions or subscription not in subscriptions:
+                return
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self._subscribers[subscription.loop]
+        event_subscribers.dec(self.name)
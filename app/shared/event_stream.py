@@ -0,0 +1,95 @@
+import asyncio
+import json
+from typing import AsyncIterator, Optional
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.shared.event_bus import Event, Subscription
+
+# Enviado cuando el suscriptor perdió eventos (cola llena o Last-Event-ID fuera del buffer): el cliente
+# debe volver a consultar el listado y seguir escuchando
+RESET_EVENT = "reset"
+
+LAST_EVENT_ID_DESCRIPTION = (
+    "Id del último evento recibido; al reconectar se envían los eventos posteriores que siguen en memoria "
+    "o un evento reset si ya no están"
+)
+
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    # Un id que no es de este servidor se trata como perdido: el cliente recibe reset
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return -1
+
+
+def _format_sse(event_type: str, data: dict, event_id: Optional[int] = None) -> str:
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _sse_events(subscription: Subscription, heartbeat_seconds: float) -> AsyncIterator[str]:
+    try:
+        while True:
+            events, dropped = await subscription.next_batch(heartbeat_seconds)
+            if dropped:
+                yield _format_sse(RESET_EVENT, {"dropped": dropped})
+            if events:
+                yield "".join(_format_sse(event.type, event.data, event.id) for event in events)
+            elif not dropped:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield ": keepalive\n\n"
+    finally:
+        subscription.close()
+
+
+def event_stream_response(subscription: Subscription, heartbeat_seconds: float) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_events(subscription, heartbeat_seconds),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _websocket_message(event: Event) -> dict:
+    return {"id": event.id, "event": event.type, "data": event.data}
+
+
+async def _send_events(websocket: WebSocket, subscription: Subscription, heartbeat_seconds: float) -> None:
+    while True:
+        events, dropped = await subscription.next_batch(heartbeat_seconds)
+        if dropped:
+            await websocket.send_json({"event": RESET_EVENT, "data": {"dropped": dropped}})
+        for event in events:
+            await websocket.send_json(_websocket_message(event))
+
+
+async def _wait_disconnect(websocket: WebSocket) -> None:
+    # El cliente no envía mensajes; se lee solo para enterarse del cierre
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+
+
+async def send_websocket_events(websocket: WebSocket, subscription: Subscription, heartbeat_seconds: float) -> None:
+    tasks = [
+        asyncio.ensure_future(_send_events(websocket, subscription, heartbeat_seconds)),
+        asyncio.ensure_future(_wait_disconnect(websocket)),
+    ]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            # Un envío que falla porque el cliente se fue termina igual que la desconexión
+            exception = None if task.cancelled() else task.exception()
+            if exception and not isinstance(exception, (WebSocketDisconnect, RuntimeError, OSError)):
+                raise exception
+    finally:
+        for task in tasks:
+            task.cancel()
+        subscription.close()
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from operator import attrgetter
+from typing import Any, Callable, Iterable, Iterator, List, Sequence, Tuple
+from fastapi.responses import StreamingResponse
+
+# Filas por lote leídas del cursor (yield_per) y escritas por cada bloque de la respuesta
+EXPORT_BATCH_SIZE = 1000
+
+
+class ExportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+
+
+MEDIA_TYPES = {
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+    ExportFormat.NDJSON: "application/x-ndjson",
+}
+
+
+class _RowConverter:
+    """Convierte Enum y datetime a valores planos solo en las columnas que los contienen."""
+
+    def __init__(self, size: int):
+        self.converters: List[Tuple[int, Callable[[Any], Any]]] = []
+        self.unknown = set(range(size))
+
+    def _detect(self, row: Sequence[Any]) -> None:
+        for index in list(self.unknown):
+            value = row[index]
+            if value is None:
+                continue
+            if isinstance(value, Enum):
+                self.converters.append((index, attrgetter("value")))
+            elif isinstance(value, datetime):
+                self.converters.append((index, datetime.isoformat))
+            self.unknown.discard(index)
+
+    def __call__(self, row: Sequence[Any]) -> List[Any]:
+        if self.unknown:
+            self._detect(row)
+        values = list(row)
+        for index, converter in self.converters:
+            if values[index] is not None:
+                values[index] = converter(values[index])
+        return values
+
+
+def _encode_csv(columns: Sequence[str], rows: Iterable[Sequence[Any]], batch_size: int) -> Iterator[bytes]:
+    convert = _RowConverter(len(columns))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        # csv escribe None como campo vacío
+        writer.writerow(convert(row))
+        pending += 1
+        if pending == batch_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+def _encode_ndjson(columns: Sequence[str], rows: Iterable[Sequence[Any]], batch_size: int) -> Iterator[bytes]:
+    convert = _RowConverter(len(columns))
+    lines = []
+    for row in rows:
+        lines.append(json.dumps(dict(zip(columns, convert(row))), ensure_ascii=False))
+        if len(lines) == batch_size:
+            yield ("\n".join(lines) + "\n").encode()
+            lines = []
+    if lines:
+        yield ("\n".join(lines) + "\n").encode()
+
+
+def encode_rows(
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    export_format: ExportFormat,
+    batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[bytes]:
+    if export_format == ExportFormat.CSV:
+        return _encode_csv(columns, rows, batch_size)
+    return _encode_ndjson(columns, rows, batch_size)
+
+
+def export_response(chunks: Iterator[bytes], export_format: ExportFormat, filename: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'},
+    )
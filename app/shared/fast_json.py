@@ -0,0 +1,23 @@
+from typing import Any, Dict, List, Type
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy.sql import ColumnElement
+from sqlmodel import Session
+
+
+def read_columns(read_model: Type[BaseModel], selectable: Any) -> List[ColumnElement]:
+    # En el orden de los campos del esquema: el JSON sale con las mismas llaves y en el mismo orden que con
+    # response_model. Sirve para tablas y para la unión con el archivo
+    return [selectable.c[name] for name in read_model.model_fields]
+
+
+def fetch_rows(session: Session, statement: Any) -> List[Dict[str, Any]]:
+    # Diccionarios directo del cursor: sin instancias del modelo ni identity map de la sesión
+    return [dict(row) for row in session.execute(statement).mappings()]
+
+
+def fast_json_response(content: Any, response: Response) -> ORJSONResponse:
+    # Devolver la respuesta evita que FastAPI vuelva a validar cada fila contra response_model; los headers puestos
+    # en el parámetro response (X-Total-Count) se copian porque FastAPI ya no los aplica
+    return ORJSONResponse(content, headers=dict(response.headers))
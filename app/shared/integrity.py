@@ -0,0 +1,40 @@
+import re
+from typing import Any, Dict, List, NoReturn, Optional
+from fastapi import HTTPException
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session
+
+UNIQUE_VIOLATION_PATTERN = re.compile(r"UNIQUE constraint failed: ([\w.]+)")
+
+
+def execute_returning_one(session: Session, statement: Any) -> Optional[Row]:
+    # Un solo INSERT/UPDATE ... RETURNING en lugar de escribir y volver a leer con refresh().
+    # Si viola una restricción se revierte la transacción para que la sesión siga usable
+    try:
+        return session.execute(statement).first()
+    except IntegrityError:
+        session.rollback()
+        raise
+
+
+def execute_returning_all(session: Session, statement: Any, rows: List[Dict[str, Any]]) -> List[Row]:
+    # Igual que execute_returning_one para un INSERT ... RETURNING de varias filas (executemany)
+    try:
+        return session.execute(statement, rows).all()
+    except IntegrityError:
+        session.rollback()
+        raise
+
+
+def unique_violation_column(exc: IntegrityError) -> Optional[str]:
+    # SQLite reporta "tabla.columna" (la primera, si el índice es compuesto)
+    match = UNIQUE_VIOLATION_PATTERN.search(str(exc.orig))
+    return match.group(1) if match else None
+
+
+def raise_unique_violation(exc: IntegrityError, messages: Dict[str, str]) -> NoReturn:
+    detail = messages.get(unique_violation_column(exc) or "")
+    if detail is None:
+        raise exc
+    raise HTTPException(status_code=400, detail=detail) from exc
@@ -0,0 +1,47 @@
+import base64
+import json
+from typing import Any, Callable, Dict, Generic, List, Optional, Sequence, TypeVar
+from fastapi import HTTPException
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+CURSOR_DESCRIPTION = (
+    "Cursor opaco para paginación por llave. Enviar vacío para la primera página y "
+    "después el valor de next_cursor; si se envía, la respuesta incluye items y next_cursor"
+)
+
+WITH_COUNT_DESCRIPTION = (
+    "Si es true, la respuesta incluye el header X-Total-Count con el total de registros que cumplen los filtros"
+)
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    if not cursor:
+        return {}
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if not isinstance(values, dict) or not isinstance(values.get("id"), int):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return values
+
+
+def build_page(rows: Sequence[T], limit: int, cursor_values: Callable[[T], Dict[str, Any]]) -> Page:
+    # Los repositorios piden limit + 1 filas para saber si hay una página siguiente
+    items = list(rows[:limit])
+    next_cursor = encode_cursor(cursor_values(items[-1])) if len(rows) > limit else None
+    return Page(items=items, next_cursor=next_cursor)
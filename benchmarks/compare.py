@@ -0,0 +1,50 @@
+"""Compara dos archivos JSON de resultados (benchmarks.load o benchmarks.repositories).
+
+    python -m benchmarks.compare base.json candidato.json --metric p95_ms --threshold 10
+
+Termina con código 1 si alguna entrada empeora más que el umbral (porcentaje).
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict
+
+HIGHER_IS_BETTER = {"rps"}
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding="utf-8") as source:
+        return json.load(source)
+
+
+def main_compare() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--metric", default="p95_ms", help="p50_ms, p95_ms, p99_ms, mean_ms o rps")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Porcentaje de empeoramiento permitido")
+    args = parser.parse_args()
+
+    baseline = load_results(args.baseline)
+    candidate = load_results(args.candidate)
+    if baseline["benchmark"] != candidate["benchmark"]:
+        print(f"Los archivos son de benchmarks distintos: {baseline['benchmark']} vs {candidate['benchmark']}")
+        return 2
+
+    print(f"{baseline['environment']['commit']} -> {candidate['environment']['commit']} ({args.metric})")
+    regressions = 0
+    for name, before in baseline["results"].items():
+        after = candidate["results"].get(name)
+        if after is None or not before.get(args.metric):
+            continue
+        change = (after[args.metric] - before[args.metric]) / before[args.metric] * 100
+        worse = -change if args.metric in HIGHER_IS_BETTER else change
+        marker = "  REGRESIÓN" if worse > args.threshold else ""
+        regressions += bool(marker)
+        print(f"{name:60s} {before[args.metric]:10.3f} {after[args.metric]:10.3f} {change:+7.1f}%{marker}")
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_compare())
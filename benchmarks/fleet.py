@@ -0,0 +1,189 @@
+"""Generador reproducible de una flota sintética para benchmarks.
+
+Carga N usuarios, una unidad por usuario, M rutas repartidas entre todos los RouteStatus y un
+rendimiento por cada ruta completada. Con la misma semilla se generan exactamente los mismos datos.
+
+    python -m benchmarks.fleet --database-url sqlite:///./bench.db --users 200 --routes 20000
+"""
+import argparse
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+import numpy as np
+from sqlalchemy import insert
+from sqlalchemy.engine import Engine
+from sqlmodel import Session, SQLModel
+
+from app.core.config.settings import Settings
+from app.core.db.engine import build_engine
+from app.features.rendimiento.models.rendimiento import Rendimiento
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.services.metrics_recompute_service import MetricsRecomputeService
+from app.features.rutas.models.ruta import Ruta, RouteStatus
+from app.features.unidades.models.unidad import Unidad
+from app.features.users.models.user import User
+from app.features.users.services.password_hasher import hash_password
+import main  # noqa: F401  registra todos los modelos en SQLModel.metadata
+
+CITIES = [
+    "Monterrey", "Saltillo", "Guadalajara", "Ciudad de México", "Querétaro", "Puebla", "Toluca",
+    "Tijuana", "Hermosillo", "Chihuahua", "Torreón", "San Luis Potosí", "Aguascalientes", "León",
+    "Mérida", "Veracruz", "Reynosa", "Nuevo Laredo", "Culiacán", "Morelia",
+]
+BRANDS = ["Kenworth", "Freightliner", "International", "Volvo", "Scania", "Mercedes-Benz"]
+# Proporción aproximada de rutas por estado en una flota real
+STATUS_WEIGHTS = {
+    RouteStatus.ASIGNADA: 0.15,
+    RouteStatus.EN_RUTA: 0.10,
+    RouteStatus.COMPLETADA: 0.65,
+    RouteStatus.CANCELADA: 0.10,
+}
+INSERT_CHUNK = 5000
+
+
+@dataclass
+class FleetSummary:
+    seed: int
+    users: int
+    units: int
+    routes: int
+    routes_by_status: Dict[str, int]
+    rendimientos: int
+    seconds: float
+
+
+def _insert_chunks(session: Session, table, rows: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(rows), INSERT_CHUNK):
+        session.execute(insert(table), rows[start:start + INSERT_CHUNK])
+
+
+def generate_fleet(engine: Engine, users: int, routes: int, seed: int = 42) -> FleetSummary:
+    rng = random.Random(seed)
+    now = datetime(2026, 1, 1)
+    start = time.perf_counter()
+
+    # Un solo hash compartido; generar uno por usuario dominaría el tiempo de carga
+    hashed_password = hash_password("benchmark")
+
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        user_rows = [
+            {
+                "id": index,
+                "email": f"driver{index}@fleet.example.com",
+                "username": f"driver{index}",
+                "full_name": f"Operador {index}",
+                "phone": f"81{rng.randrange(10**7, 10**8)}",
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "created_at": now - timedelta(days=400),
+            }
+            for index in range(1, users + 1)
+        ]
+        unit_rows = [
+            {
+                "id": index,
+                "license_plate": f"FLT-{index:06d}",
+                "brand": rng.choice(BRANDS),
+                "model": f"T{rng.randrange(100, 999)}",
+                "year": rng.randrange(2010, 2026),
+                "capacity": float(rng.randrange(10, 40)),
+                "user_id": index,
+                "is_active": True,
+                "created_at": now - timedelta(days=400),
+            }
+            for index in range(1, users + 1)
+        ]
+
+        statuses = list(STATUS_WEIGHTS)
+        weights = list(STATUS_WEIGHTS.values())
+        route_rows = []
+        completed = []
+        for index in range(1, routes + 1):
+            origin, destination = rng.sample(CITIES, 2)
+            distance_km = round(rng.uniform(40, 1500), 1)
+            estimated_time_hours = round(distance_km / rng.uniform(55, 85), 2)
+            assigned_at = now - timedelta(minutes=rng.randrange(0, 365 * 24 * 60))
+            status = rng.choices(statuses, weights)[0]
+            started_at = assigned_at + timedelta(hours=1) if status in (RouteStatus.EN_RUTA, RouteStatus.COMPLETADA) else None
+            completed_at = None
+            if status == RouteStatus.COMPLETADA:
+                completed_at = started_at + timedelta(hours=estimated_time_hours * rng.uniform(0.8, 1.4))
+                completed.append((index, distance_km, estimated_time_hours, completed_at))
+            route_rows.append({
+                "id": index,
+                "origin": origin,
+                "destination": destination,
+                "distance_km": distance_km,
+                "estimated_time_hours": estimated_time_hours,
+                "status": status.name,
+                "unit_id": rng.randrange(1, users + 1),
+                "assigned_at": assigned_at,
+                "started_at": started_at,
+                "completed_at": completed_at,
+                "created_at": assigned_at,
+            })
+
+        # Las métricas se calculan sobre los valores ya redondeados que se guardan,
+        # igual que lo haría POST /performance con esos mismos datos
+        distance = np.array([round(row[1] * rng.uniform(0.95, 1.15), 2) for row in completed], dtype=np.float64)
+        fuel = np.array([round(value / rng.uniform(2.0, 4.5), 2) for value in distance], dtype=np.float64)
+        actual = np.array([round(row[2] * rng.uniform(0.8, 1.4), 2) for row in completed], dtype=np.float64)
+        estimated = np.array([row[2] for row in completed], dtype=np.float64)
+        metrics = MetricsRecomputeService.calculate_metrics_batch(distance, fuel, actual, estimated)
+        rendimiento_rows = [
+            {
+                "id": index + 1,
+                "route_id": route_id,
+                "distance_traveled_km": float(distance[index]),
+                "fuel_consumed_liters": float(fuel[index]),
+                "actual_time_hours": float(actual[index]),
+                "average_speed_kmh": metrics["average_speed_kmh"][index],
+                "fuel_efficiency_km_per_liter": metrics["fuel_efficiency_km_per_liter"][index],
+                "time_efficiency": metrics["time_efficiency"][index],
+                "efficiency_score": metrics["efficiency_score"][index],
+                "recorded_at": completed_at,
+                "created_at": completed_at,
+            }
+            for index, (route_id, _, _, completed_at) in enumerate(completed)
+        ]
+
+        _insert_chunks(session, User.__table__, user_rows)
+        _insert_chunks(session, Unidad.__table__, unit_rows)
+        _insert_chunks(session, Ruta.__table__, route_rows)
+        _insert_chunks(session, Rendimiento.__table__, rendimiento_rows)
+        session.commit()
+        UnitPerformanceSummaryRepository(session).rebuild()
+
+    routes_by_status = {status.value: 0 for status in RouteStatus}
+    for row in route_rows:
+        routes_by_status[RouteStatus[row["status"]].value] += 1
+    return FleetSummary(
+        seed=seed,
+        users=users,
+        units=users,
+        routes=routes,
+        routes_by_status=routes_by_status,
+        rendimientos=len(rendimiento_rows),
+        seconds=round(time.perf_counter() - start, 3),
+    )
+
+
+def main_generate() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", required=True, help="Base de datos vacía donde se carga la flota")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--routes", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    engine = build_engine(args.database_url, Settings(DB_ECHO=False))
+    summary = generate_fleet(engine, args.users, args.routes, args.seed)
+    engine.dispose()
+    print(asdict(summary))
+
+
+if __name__ == "__main__":
+    main_generate()
@@ -0,0 +1,151 @@
+"""Driver de carga concurrente en proceso contra la aplicación FastAPI.
+
+Carga una flota sintética en una base SQLite temporal y lanza, por cada endpoint, varios clientes
+concurrentes con httpx.ASGITransport (sin red ni servidor). Reporta p50/p95/p99 y requests por segundo.
+
+    python -m benchmarks.load --concurrency 16 --requests 2000 --output load.json
+    python -m benchmarks.load --async-db --output load-async.json
+    python -m benchmarks.load --no-read-routing --output load-primary.json
+    python -m benchmarks.load --fast-list-responses --output load-fast.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from benchmarks.results import summarize_latencies, write_results
+
+
+class Scenario(NamedTuple):
+    name: str
+    method: str
+    # Recibe un generador aleatorio y devuelve (url, cuerpo JSON)
+    request: Callable[[random.Random], tuple]
+
+
+def _scenarios(users: int, routes: int) -> List[Scenario]:
+    statuses = ["ASIGNADA", "EN_RUTA", "COMPLETADA", "CANCELADA"]
+
+    def ruta_body(rng: random.Random) -> Dict[str, Any]:
+        return {
+            "origin": "Monterrey", "destination": "Saltillo", "distance_km": 85,
+            "estimated_time_hours": 1.2, "unit_id": rng.randrange(1, users + 1),
+        }
+
+    return [
+        Scenario("GET /users", "GET", lambda rng: ("/users?limit=100", None)),
+        Scenario("GET /units/{id}", "GET", lambda rng: (f"/units/{rng.randrange(1, users + 1)}", None)),
+        Scenario("GET /units/{id}/performance-summary", "GET", lambda rng: (
+            f"/units/{rng.randrange(1, users + 1)}/performance-summary", None
+        )),
+        Scenario("GET /routes", "GET", lambda rng: ("/routes?limit=100", None)),
+        Scenario("GET /routes?status", "GET", lambda rng: (f"/routes?status={rng.choice(statuses)}&limit=100", None)),
+        Scenario("GET /routes?unit_id&cursor", "GET", lambda rng: (
+            f"/routes?unit_id={rng.randrange(1, users + 1)}&cursor=&limit=100", None
+        )),
+        Scenario("GET /routes/{id}", "GET", lambda rng: (f"/routes/{rng.randrange(1, routes + 1)}", None)),
+        Scenario("GET /performance", "GET", lambda rng: ("/performance?limit=100", None)),
+        Scenario("GET /performance/stats?group_by=unit", "GET", lambda rng: ("/performance/stats?group_by=unit", None)),
+        Scenario("GET /performance/stats?group_by=month", "GET", lambda rng: ("/performance/stats?group_by=month", None)),
+        Scenario("POST /routes", "POST", lambda rng: ("/routes", ruta_body(rng))),
+    ]
+
+
+async def _drive(
+    client: httpx.AsyncClient, scenario: Scenario, requests: int, concurrency: int, rng: random.Random
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    status_codes: Dict[str, int] = {}
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        for _ in remaining:
+            url, body = scenario.request(rng)
+            start = time.perf_counter()
+            response = await client.request(scenario.method, url, json=body)
+            latencies.append((time.perf_counter() - start) * 1000)
+            status_codes[str(response.status_code)] = status_codes.get(str(response.status_code), 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {**summarize_latencies(latencies, elapsed), "status_codes": status_codes}
+
+
+async def run_load(app, scenarios: List[Scenario], requests: int, concurrency: int, warmup: int, seed: int) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for scenario in scenarios:
+            await _drive(client, scenario, warmup, concurrency, rng)
+            results[scenario.name] = await _drive(client, scenario, requests, concurrency, rng)
+            result = results[scenario.name]
+            print(
+                f"{scenario.name:42s} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:8.2f}  "
+                f"p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  {result['status_codes']}"
+            )
+    return results
+
+
+def main_load(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--routes", type=int, default=20000)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests medidos por endpoint")
+    parser.add_argument("--warmup", type=int, default=50, help="Requests de calentamiento por endpoint")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--async-db", action="store_true", help="Ejecutar con DB_ASYNC=true")
+    parser.add_argument("--no-read-routing", action="store_true", help="Lecturas también por el engine principal")
+    parser.add_argument(
+        "--fast-list-responses", action="store_true", help="Listados de rutas y rendimientos con FAST_LIST_RESPONSES=true"
+    )
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        # Settings y el engine compartido se crean al importar la aplicación, así que la base
+        # temporal y el modo async se configuran antes de importarla
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(directory, 'load.db')}"
+        os.environ["DB_ASYNC"] = "true" if args.async_db else "false"
+        os.environ.pop("ASYNC_DATABASE_URL", None)
+        os.environ["DB_READ_ROUTING"] = "false" if args.no_read_routing else "true"
+        os.environ.pop("READ_DATABASE_URL", None)
+        os.environ.pop("ASYNC_READ_DATABASE_URL", None)
+        os.environ["FAST_LIST_RESPONSES"] = "true" if args.fast_list_responses else "false"
+
+        import main
+        from app.core.db.async_session import dispose_async_engine
+        from app.core.db.config import init_db
+        from app.core.db.session import engine
+        from benchmarks.fleet import generate_fleet
+
+        fleet = generate_fleet(engine, args.users, args.routes, args.seed)
+        init_db()
+
+        async def run() -> Dict[str, Any]:
+            try:
+                return await run_load(
+                    main.app, _scenarios(args.users, args.routes), args.requests, args.concurrency, args.warmup, args.seed
+                )
+            finally:
+                await dispose_async_engine()
+
+        results = asyncio.run(run())
+        engine.dispose()
+
+    parameters = {key: value for key, value in vars(args).items() if key != "output"}
+    parameters["fleet"] = asdict(fleet)
+    write_results(args.output, "load", parameters, results)
+
+
+if __name__ == "__main__":
+    main_load()
@@ -0,0 +1,264 @@
+"""Regresión de planes de consulta: ejecuta cada consulta de los repositorios con EXPLAIN QUERY PLAN.
+
+Falla (código de salida 1) si alguna consulta hace un recorrido completo de tabla (SCAN <tabla>)
+que no esté declarado como esperado en su caso.
+
+    python -m benchmarks.query_plans
+"""
+import os
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Callable, FrozenSet, List, NamedTuple, Tuple
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel
+
+from app.core.config.settings import Settings
+from app.core.db.engine import build_engine
+from app.core.db.migrations import migrate
+from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.schemas.rendimiento_schemas import RendimientoCreate, RendimientoUpdate, StatsGroupBy
+from app.features.rutas.models.ruta import RouteStatus
+from app.features.rutas.repositories.ruta_repository import RutaRepository
+from app.features.rutas.schemas.ruta_schemas import RutaCreate, RutaUpdate
+from app.features.unidades.repositories.unidad_repository import UnidadRepository, unidad_cache
+from app.features.unidades.schemas.unidad_schemas import UnidadCreate, UnidadUpdate
+from app.features.users.repositories.user_repository import UserRepository
+from app.features.users.schemas.user_schemas import UserCreate, UserUpdate
+import main  # noqa: F401  registra todos los modelos en SQLModel.metadata
+
+SCAN_PATTERN = re.compile(r"^SCAN (?:TABLE )?(\w+)")
+# VALUES de varias filas (INSERT con insertmanyvalues): "SCAN CONSTANT ROW" o "SCAN 2 CONSTANT ROWS"
+CONSTANT_ROWS_PATTERN = re.compile(r"^SCAN (?:\d+ )?CONSTANT ROWS?$")
+NO_SCAN: FrozenSet[str] = frozenset()
+
+
+class Case(NamedTuple):
+    name: str
+    run: Callable[[Session], object]
+    # Tablas que el caso puede recorrer completas (listados sin filtro acotados por LIMIT, agregados globales)
+    allowed_scans: FrozenSet[str] = NO_SCAN
+
+
+def _seed(session: Session) -> None:
+    users = UserRepository(session)
+    unidades = UnidadRepository(session)
+    rutas = RutaRepository(session)
+    for index in range(3):
+        user = users.create(
+            UserCreate(email=f"driver{index}@example.com", username=f"driver{index}", full_name="Driver", password="x"),
+            "hash"
+        )
+        unidades.create(UnidadCreate(
+            license_plate=f"ABC-{index}", brand="Kenworth", model="T680", year=2020, capacity=30, user_id=user.id
+        ))
+    for index in range(6):
+        ruta = rutas.create(RutaCreate(
+            origin="Monterrey", destination="Saltillo", distance_km=85, estimated_time_hours=1.5, unit_id=index % 3 + 1
+        ))
+        if index % 2 == 0:
+            rutas.update_status([ruta.id], RouteStatus.EN_RUTA, [RouteStatus.ASIGNADA])
+            rutas.update_status([ruta.id], RouteStatus.COMPLETADA, [RouteStatus.EN_RUTA])
+            RendimientoRepository(session).create(RendimientoCreate(
+                route_id=ruta.id, distance_traveled_km=90, fuel_consumed_liters=30, actual_time_hours=1.7
+            ))
+
+
+def _cases() -> List[Case]:
+    since = datetime.utcnow() - timedelta(days=30)
+    until = datetime.utcnow() + timedelta(days=1)
+    bounded_list = frozenset({"user", "unidad", "ruta", "rendimiento"})
+    archive_list = frozenset({"ruta_archive", "rendimiento_archive"})
+
+    return [
+        # Usuarios
+        Case("UserRepository.get_by_id", lambda s: UserRepository(s).get_by_id(1)),
+        Case("UserRepository.get_version", lambda s: UserRepository(s).get_version(1)),
+        Case("UserRepository.get_by_email", lambda s: UserRepository(s).get_by_email("driver1@example.com")),
+        Case("UserRepository.get_existing_emails", lambda s: UserRepository(s).get_existing_emails(["a@b.c", "driver1@example.com"])),
+        Case("UserRepository.get_all", lambda s: UserRepository(s).get_all(1, 10), bounded_list),
+        Case("UserRepository.get_page (primera página)", lambda s: UserRepository(s).get_page(None, 10), bounded_list),
+        Case("UserRepository.get_page", lambda s: UserRepository(s).get_page(1, 10)),
+        Case("UserRepository.count", lambda s: UserRepository(s).count()),
+        Case("UserRepository.update", lambda s: UserRepository(s).update(UserRepository(s).get_by_id(2), UserUpdate(full_name="X"))),
+        Case("UserRepository.create_many", lambda s: UserRepository(s).create_many(
+            [UserCreate(email="bulk@example.com", username="bulk", full_name="Bulk", password="x")], ["hash"]
+        )),
+
+        # Unidades
+        Case("UnidadRepository.get_by_id", lambda s: UnidadRepository(s).get_by_id(1)),
+        Case("UnidadRepository.get_version", lambda s: UnidadRepository(s).get_version(1)),
+        Case("UnidadRepository.get_cached", lambda s: (unidad_cache.clear(), UnidadRepository(s).get_cached(2))),
+        Case("UnidadRepository.get_by_ids", lambda s: UnidadRepository(s).get_by_ids([1, 2])),
+        Case("UnidadRepository.get_dashboard", lambda s: UnidadRepository(s).get_dashboard(1, 10)),
+        Case("UnidadRepository.get_by_license_plate", lambda s: UnidadRepository(s).get_by_license_plate("ABC-1")),
+        Case("UnidadRepository.get_by_user_id", lambda s: UnidadRepository(s).get_by_user_id(1)),
+        Case("UnidadRepository.check_license_plate_exists", lambda s: UnidadRepository(s).check_license_plate_exists("ABC-1", 2)),
+        Case("UnidadRepository.get_all", lambda s: UnidadRepository(s).get_all(0, 10), bounded_list),
+        Case("UnidadRepository.get_page", lambda s: UnidadRepository(s).get_page(1, 10)),
+        Case("UnidadRepository.count", lambda s: UnidadRepository(s).count()),
+        Case("UnidadRepository.update", lambda s: UnidadRepository(s).update(UnidadRepository(s).get_by_id(3), UnidadUpdate(brand="Volvo"))),
+
+        # Rutas
+        Case("RutaRepository.get_by_id", lambda s: RutaRepository(s).get_by_id(1)),
+        Case("RutaRepository.get_version", lambda s: RutaRepository(s).get_version(1)),
+        Case("RutaRepository.get_by_ids", lambda s: RutaRepository(s).get_by_ids([1, 2, 3])),
+        Case("RutaRepository.get_by_unit_id", lambda s: RutaRepository(s).get_by_unit_id(1)),
+        Case("RutaRepository.get_by_unit_id (status)", lambda s: RutaRepository(s).get_by_unit_id(1, RouteStatus.COMPLETADA)),
+        Case("RutaRepository.get_all", lambda s: RutaRepository(s).get_all(None, None, 0, 10), bounded_list),
+        Case("RutaRepository.get_all (status)", lambda s: RutaRepository(s).get_all(RouteStatus.ASIGNADA)),
+        Case("RutaRepository.get_all (unit_id)", lambda s: RutaRepository(s).get_all(None, 2)),
+        Case("RutaRepository.get_all (status, unit_id)", lambda s: RutaRepository(s).get_all(RouteStatus.ASIGNADA, 2)),
+        Case("RutaRepository.get_page", lambda s: RutaRepository(s).get_page(None, None, 1, 10)),
+        Case("RutaRepository.get_page (status)", lambda s: RutaRepository(s).get_page(RouteStatus.ASIGNADA, None, 1, 10)),
+        Case("RutaRepository.get_page (unit_id)", lambda s: RutaRepository(s).get_page(None, 2, 1, 10)),
+        Case("RutaRepository.get_page (status, unit_id)", lambda s: RutaRepository(s).get_page(RouteStatus.ASIGNADA, 2, 1, 10)),
+        Case("RutaRepository.get_all (q)", lambda s: RutaRepository(s).get_all(None, None, 0, 10, '"monte"*')),
+        Case("RutaRepository.get_page (status, q)", lambda s: RutaRepository(s).get_page(RouteStatus.ASIGNADA, None, 1, 10, '"monte"*')),
+        Case("RutaRepository.count (q)", lambda s: RutaRepository(s).count(None, None, False, '"monte"*')),
+        Case("RutaRepository.suggest_locations", lambda s: RutaRepository(s).suggest_locations('"mon"*')),
+        Case("RutaRepository.get_archived_by_id", lambda s: RutaRepository(s).get_archived_by_id(1)),
+        Case("RutaRepository.get_with_archived", lambda s: RutaRepository(s).get_with_archived(None, None, None, 0, 10), bounded_list | archive_list),
+        Case("RutaRepository.get_with_archived (status, unit_id)", lambda s: RutaRepository(s).get_with_archived(RouteStatus.COMPLETADA, 1, 1, 0, 10)),
+        Case("RutaRepository.get_with_archived (status)", lambda s: RutaRepository(s).get_with_archived(RouteStatus.COMPLETADA, None, 1, 0, 10)),
+        Case("RutaRepository.get_archivable_ids", lambda s: RutaRepository(s).get_archivable_ids(until, 0, 100)),
+        Case("RutaRepository.count", lambda s: RutaRepository(s).count()),
+        Case("RutaRepository.count (status, archivo)", lambda s: RutaRepository(s).count(RouteStatus.COMPLETADA, None, True)),
+        Case("RutaRepository.count (status, unit_id, archivo)", lambda s: RutaRepository(s).count(RouteStatus.COMPLETADA, 1, True)),
+        Case("RutaRepository.get_full", lambda s: RutaRepository(s).get_full(1)),
+        Case("RutaRepository.get_full_all", lambda s: RutaRepository(s).get_full_all(None, None, 0, 10), bounded_list),
+        Case("RutaRepository.get_full_all (status, unit_id)", lambda s: RutaRepository(s).get_full_all(RouteStatus.COMPLETADA, 1)),
+        Case("RutaRepository.get_full_page", lambda s: RutaRepository(s).get_full_page(None, None, 1, 10)),
+        Case("RutaRepository.get_full_page (status)", lambda s: RutaRepository(s).get_full_page(RouteStatus.COMPLETADA, None, 1, 10)),
+        Case("RutaRepository.iter_export", lambda s: RutaRepository(s).iter_export().all(), frozenset({"ruta"})),
+        Case("RutaRepository.iter_export (status, unit_id)", lambda s: RutaRepository(s).iter_export(RouteStatus.COMPLETADA, 1).all()),
+        Case("RutaRepository.update", lambda s: RutaRepository(s).update(RutaRepository(s).get_by_id(2), RutaUpdate(origin="Apodaca"))),
+        Case("RutaRepository.update_status", lambda s: RutaRepository(s).update_status(
+            [4], RouteStatus.EN_RUTA, [RouteStatus.ASIGNADA]
+        )),
+        Case("RutaRepository.update_status (bulk)", lambda s: RutaRepository(s).update_status(
+            [2, 4, 6], RouteStatus.CANCELADA, [RouteStatus.ASIGNADA, RouteStatus.EN_RUTA]
+        )),
+        Case("RutaRepository.create_many", lambda s: RutaRepository(s).create_many([RutaCreate(
+            origin="Monterrey", destination="Reynosa", distance_km=220, estimated_time_hours=3, unit_id=1
+        )])),
+
+        # Rendimiento
+        Case("RendimientoRepository.get_by_id", lambda s: RendimientoRepository(s).get_by_id(1)),
+        Case("RendimientoRepository.get_version", lambda s: RendimientoRepository(s).get_version(1)),
+        Case("RendimientoRepository.get_by_route_id", lambda s: RendimientoRepository(s).get_by_route_id(1)),
+        Case("RendimientoRepository.get_existing_route_ids", lambda s: RendimientoRepository(s).get_existing_route_ids([1, 2, 3])),
+        Case("RendimientoRepository.create_many_skip_existing", lambda s: RendimientoRepository(s).create_many_skip_existing([
+            {"route_id": route_id, "distance_traveled_km": 90.0, "fuel_consumed_liters": 30.0, "actual_time_hours": 1.7,
+             "recorded_at": datetime.utcnow(), "created_at": datetime.utcnow()}
+            for route_id in (1, 4)
+        ])),
+        Case("RendimientoRepository.get_all", lambda s: RendimientoRepository(s).get_all(0, 10), bounded_list),
+        Case("RendimientoRepository.get_page", lambda s: RendimientoRepository(s).get_page(1, 10)),
+        Case("RendimientoRepository.get_archived_by_id", lambda s: RendimientoRepository(s).get_archived_by_id(1)),
+        Case("RendimientoRepository.get_archived_by_route_id", lambda s: RendimientoRepository(s).get_archived_by_route_id(1)),
+        Case("RendimientoRepository.get_with_archived", lambda s: RendimientoRepository(s).get_with_archived(1, 0, 10)),
+        Case("RendimientoRepository.count (archivo)", lambda s: RendimientoRepository(s).count(True)),
+        Case("RendimientoRepository.get_stats (fechas, archivo)", lambda s: RendimientoRepository(s).get_stats(
+            StatsGroupBy.MONTH, None, since, until, include_archived=True
+        )),
+        Case("RendimientoRepository.get_stats (fechas)", lambda s: RendimientoRepository(s).get_stats(StatsGroupBy.MONTH, None, since, until)),
+        Case("RendimientoRepository.get_stats (unit_id)", lambda s: RendimientoRepository(s).get_stats(StatsGroupBy.UNIT, 1)),
+        Case("RendimientoRepository.get_stats (global)", lambda s: RendimientoRepository(s).get_stats(StatsGroupBy.STATUS), frozenset({"rendimiento", "ruta"})),
+        Case("RendimientoRepository.iter_export", lambda s: RendimientoRepository(s).iter_export().all(), frozenset({"rendimiento"})),
+        Case("RendimientoRepository.iter_export (unit_id, fechas)", lambda s: RendimientoRepository(s).iter_export(1, since, until).all()),
+        Case("RendimientoRepository.get_metric_inputs", lambda s: RendimientoRepository(s).get_metric_inputs(0, 100)),
+        Case("RendimientoRepository.bulk_update_metrics", lambda s: RendimientoRepository(s).bulk_update_metrics([{
+            "rendimiento_id": 1, "average_speed_kmh": 1.0, "fuel_efficiency_km_per_liter": 1.0,
+            "time_efficiency": 1.0, "efficiency_score": 1.0,
+        }])),
+        Case("RendimientoRepository.update", lambda s: RendimientoRepository(s).update(
+            RendimientoRepository(s).get_by_id(1), RendimientoUpdate(notes="ok")
+        )),
+
+        # Resumen por unidad
+        Case("UnitPerformanceSummaryRepository.get_by_unit_id", lambda s: UnitPerformanceSummaryRepository(s).get_by_unit_id(1)),
+        Case("UnitPerformanceSummaryRepository.apply_delta", lambda s: (
+            UnitPerformanceSummaryRepository(s).apply_delta(1, routes=1, distance_km=10.0), s.commit()
+        )),
+        Case("UnitPerformanceSummaryRepository.apply_deltas", lambda s: UnitPerformanceSummaryRepository(s).apply_deltas([
+            {"unit_id": unit_id, "routes": 1, "distance_km": 10.0, "fuel_liters": 1.0, "time_hours": 1.0, "efficiency_score": 50.0}
+            for unit_id in (1, 2)
+        ])),
+        Case("UnitPerformanceSummaryRepository.rebuild", lambda s: UnitPerformanceSummaryRepository(s).rebuild(), frozenset({"rendimiento", "ruta", "rendimiento_archive", "unit_performance_summary"})),
+
+        # Borrados al final para no afectar los casos anteriores
+        Case("RutaRepository.archive", lambda s: (
+            RendimientoRepository(s).archive_by_route_ids([1]), RutaRepository(s).archive([1])
+        )),
+        Case("RendimientoRepository.delete", lambda s: RendimientoRepository(s).delete(2)),
+        Case("RutaRepository.delete", lambda s: RutaRepository(s).delete(6)),
+        Case("RutaRepository.has_performance", lambda s: RutaRepository(s).has_performance(1)),
+        Case("UnidadRepository.delete", lambda s: UnidadRepository(s).delete(UnidadRepository(s).get_by_id(3))),
+        Case("UserRepository.delete", lambda s: UserRepository(s).delete(UserRepository(s).get_by_id(3))),
+    ]
+
+
+def _explain(engine, statement: str, parameters) -> List[str]:
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else ()
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+    return [row[3] for row in rows]
+
+
+def check_query_plans() -> List[Tuple[str, str, str]]:
+    """Devuelve (caso, sentencia, detalle del plan) por cada recorrido completo no permitido."""
+    failures = []
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(f"sqlite:///{os.path.join(directory, 'plans.db')}", Settings(DB_ECHO=False))
+        migrate(engine)
+        with Session(engine) as session:
+            _seed(session)
+
+        captured: List[Tuple[str, object]] = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "INSERT", "WITH")):
+                captured.append((statement, parameters))
+
+        for case in _cases():
+            captured.clear()
+            event.listen(engine, "before_cursor_execute", capture)
+            try:
+                with Session(engine) as session:
+                    case.run(session)
+            finally:
+                event.remove(engine, "before_cursor_execute", capture)
+
+            for statement, parameters in list(captured):
+                for detail in _explain(engine, statement, parameters):
+                    match = SCAN_PATTERN.match(detail)
+                    # Solo tablas: SCAN de un subquery (p. ej. la unión con las tablas de archivo) recorre
+                    # filas ya filtradas por sus ramas
+                    if (
+                        match
+                        and match.group(1) in SQLModel.metadata.tables
+                        and match.group(1) not in case.allowed_scans
+                        and not CONSTANT_ROWS_PATTERN.match(detail)
+                    ):
+                        failures.append((case.name, " ".join(statement.split()), detail))
+        engine.dispose()
+    return failures
+
+
+def main_check() -> int:
+    failures = check_query_plans()
+    for case, statement, detail in failures:
+        print(f"FULL SCAN  {case}\n    {detail}\n    {statement}\n")
+    if failures:
+        print(f"{len(failures)} consultas con recorrido completo de tabla")
+        return 1
+    print("Todas las consultas de repositorios usan índices")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_check())
@@ -0,0 +1,242 @@
+"""Micro-benchmarks de cada método de repositorio y del cálculo de métricas de rendimiento.
+
+Carga una flota sintética (benchmarks.fleet) en una base SQLite temporal y mide cada operación
+con una sesión nueva por iteración, como en un request.
+
+    python -m benchmarks.repositories --users 200 --routes 20000 --iterations 200 --output repos.json
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Callable, Dict, List, NamedTuple
+import numpy as np
+from sqlmodel import Session, func, select
+
+from app.core.config.settings import Settings
+from app.core.db.engine import build_engine
+from app.core.db.migrations import migrate
+from app.core.db.search_index import build_match_query
+from app.features.rendimiento.repositories.rendimiento_repository import RendimientoRepository
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.schemas.rendimiento_schemas import RendimientoUpdate, StatsGroupBy
+from app.features.rendimiento.services.metrics_recompute_service import MetricsRecomputeService
+from app.features.rendimiento.services.rendimiento_service import RendimientoService
+from app.features.rutas.models.ruta import RouteStatus, Ruta
+from app.features.rutas.repositories.ruta_repository import RutaRepository
+from app.features.rutas.schemas.ruta_schemas import RutaCreate, RutaUpdate
+from app.features.unidades.repositories.unidad_repository import UnidadRepository
+from app.features.unidades.schemas.unidad_schemas import UnidadUpdate
+from app.features.users.repositories.user_repository import UserRepository
+from app.features.users.schemas.user_schemas import UserCreate, UserUpdate
+from benchmarks.fleet import CITIES, generate_fleet
+from benchmarks.results import summarize_latencies, write_results
+
+
+class Benchmark(NamedTuple):
+    name: str
+    # Recibe la sesión de la iteración y un número de iteración único (para generar datos sin colisiones)
+    run: Callable[[Session, int], object]
+
+
+def _repository_benchmarks(users: int, routes: int, rng: random.Random) -> List[Benchmark]:
+    def unit_id(_: int) -> int:
+        return rng.randrange(1, users + 1)
+
+    def route_id(_: int) -> int:
+        return rng.randrange(1, routes + 1)
+
+    created_routes: List[int] = []
+    created_users: List[int] = []
+    ruta_create = RutaCreate(origin="Monterrey", destination="Saltillo", distance_km=85, estimated_time_hours=1.2, unit_id=1)
+
+    def create_ruta(session: Session, iteration: int) -> None:
+        created_routes.append(RutaRepository(session).create(ruta_create).id)
+
+    def delete_ruta(session: Session, iteration: int) -> None:
+        RutaRepository(session).delete(created_routes.pop())
+
+    def create_user(session: Session, iteration: int) -> None:
+        user = UserRepository(session).create(
+            UserCreate(email=f"bench{iteration}@example.com", username=f"bench{iteration}", full_name="Bench", password="x"),
+            "hash"
+        )
+        created_users.append(user.id)
+
+    def delete_user(session: Session, iteration: int) -> None:
+        repository = UserRepository(session)
+        repository.delete(repository.get_by_id(created_users.pop()))
+
+    def metric_updates(session: Session) -> List[Dict[str, float]]:
+        rows = RendimientoRepository(session).get_metric_inputs(0, 1000)
+        return [
+            {
+                "rendimiento_id": row[0], "average_speed_kmh": 1.0, "fuel_efficiency_km_per_liter": 1.0,
+                "time_efficiency": 1.0, "efficiency_score": 1.0,
+            }
+            for row in rows
+        ]
+
+    return [
+        Benchmark("UserRepository.get_by_id", lambda s, i: UserRepository(s).get_by_id(unit_id(i))),
+        Benchmark("UserRepository.get_by_email", lambda s, i: UserRepository(s).get_by_email(f"driver{unit_id(i)}@fleet.example.com")),
+        Benchmark("UserRepository.get_existing_emails", lambda s, i: UserRepository(s).get_existing_emails(
+            [f"driver{unit_id(i)}@fleet.example.com" for _ in range(50)]
+        )),
+        Benchmark("UserRepository.get_all", lambda s, i: UserRepository(s).get_all(0, 100)),
+        Benchmark("UserRepository.get_page", lambda s, i: UserRepository(s).get_page(unit_id(i), 100)),
+        Benchmark("UserRepository.create", create_user),
+        Benchmark("UserRepository.update", lambda s, i: UserRepository(s).update(
+            UserRepository(s).get_by_id(unit_id(i)), UserUpdate(full_name=f"Operador {i}")
+        )),
+        Benchmark("UserRepository.delete", delete_user),
+
+        Benchmark("UnidadRepository.get_by_id", lambda s, i: UnidadRepository(s).get_by_id(unit_id(i))),
+        Benchmark("UnidadRepository.get_cached", lambda s, i: UnidadRepository(s).get_cached(unit_id(i))),
+        Benchmark("UnidadRepository.get_by_ids", lambda s, i: UnidadRepository(s).get_by_ids([unit_id(i) for _ in range(50)])),
+        Benchmark("UnidadRepository.get_by_license_plate", lambda s, i: UnidadRepository(s).get_by_license_plate(f"FLT-{unit_id(i):06d}")),
+        Benchmark("UnidadRepository.get_by_user_id", lambda s, i: UnidadRepository(s).get_by_user_id(unit_id(i))),
+        Benchmark("UnidadRepository.check_license_plate_exists", lambda s, i: UnidadRepository(s).check_license_plate_exists(
+            f"FLT-{unit_id(i):06d}", 1
+        )),
+        Benchmark("UnidadRepository.get_all", lambda s, i: UnidadRepository(s).get_all(0, 100)),
+        Benchmark("UnidadRepository.get_page", lambda s, i: UnidadRepository(s).get_page(unit_id(i), 100)),
+        Benchmark("UnidadRepository.update", lambda s, i: UnidadRepository(s).update(
+            UnidadRepository(s).get_by_id(unit_id(i)), UnidadUpdate(capacity=float(i % 40))
+        )),
+
+        Benchmark("RutaRepository.get_by_id", lambda s, i: RutaRepository(s).get_by_id(route_id(i))),
+        Benchmark("RutaRepository.get_cached", lambda s, i: RutaRepository(s).get_cached(route_id(i))),
+        Benchmark("RutaRepository.get_by_unit_id", lambda s, i: RutaRepository(s).get_by_unit_id(unit_id(i))),
+        Benchmark("RutaRepository.get_by_unit_id (status)", lambda s, i: RutaRepository(s).get_by_unit_id(
+            unit_id(i), RouteStatus.COMPLETADA
+        )),
+        Benchmark("RutaRepository.get_all", lambda s, i: RutaRepository(s).get_all(None, None, 0, 100)),
+        Benchmark("RutaRepository.get_all (status)", lambda s, i: RutaRepository(s).get_all(RouteStatus.EN_RUTA, None, 0, 100)),
+        Benchmark("RutaRepository.get_all (status, unit_id)", lambda s, i: RutaRepository(s).get_all(
+            RouteStatus.COMPLETADA, unit_id(i), 0, 100
+        )),
+        Benchmark("RutaRepository.get_page (status)", lambda s, i: RutaRepository(s).get_page(
+            RouteStatus.ASIGNADA, None, route_id(i), 100
+        )),
+        Benchmark("RutaRepository.get_page (unit_id)", lambda s, i: RutaRepository(s).get_page(None, unit_id(i), 0, 100)),
+        Benchmark("RutaRepository.count (status)", lambda s, i: RutaRepository(s).count(RouteStatus.COMPLETADA)),
+        Benchmark("RutaRepository.count (unit_id)", lambda s, i: RutaRepository(s).count(None, unit_id(i))),
+        # Referencia: lo que costaría X-Total-Count con COUNT(*) en lugar de los contadores
+        Benchmark("COUNT(*) ruta (status)", lambda s, i: s.exec(
+            select(func.count()).select_from(Ruta).where(Ruta.status == RouteStatus.COMPLETADA)
+        ).one()),
+        Benchmark("RutaRepository.create", create_ruta),
+        Benchmark("RutaRepository.get_page (q)", lambda s, i: RutaRepository(s).get_page(
+            None, None, route_id(i), 100, build_match_query(rng.choice(CITIES))
+        )),
+        Benchmark("RutaRepository.count (q)", lambda s, i: RutaRepository(s).count(
+            None, None, False, build_match_query(rng.choice(CITIES))
+        )),
+        Benchmark("RutaRepository.suggest_locations", lambda s, i: RutaRepository(s).suggest_locations(
+            build_match_query(rng.choice(CITIES)[:3])
+        )),
+        Benchmark("RutaRepository.create_many (100)", lambda s, i: RutaRepository(s).create_many([ruta_create] * 100)),
+        Benchmark("RutaRepository.update", lambda s, i: RutaRepository(s).update(
+            RutaRepository(s).get_by_id(route_id(i)), RutaUpdate(origin="Apodaca")
+        )),
+        Benchmark("RutaRepository.update_status", lambda s, i: RutaRepository(s).update_status(
+            [created_routes[-1 - i % len(created_routes)]], RouteStatus.ASIGNADA, [RouteStatus.ASIGNADA]
+        )),
+        Benchmark("RutaRepository.delete", delete_ruta),
+
+        Benchmark("RendimientoRepository.get_by_id", lambda s, i: RendimientoRepository(s).get_by_id(route_id(i) // 2 + 1)),
+        Benchmark("RendimientoRepository.get_by_route_id", lambda s, i: RendimientoRepository(s).get_by_route_id(route_id(i))),
+        Benchmark("RendimientoRepository.get_all", lambda s, i: RendimientoRepository(s).get_all(0, 100)),
+        Benchmark("RendimientoRepository.get_page", lambda s, i: RendimientoRepository(s).get_page(route_id(i) // 2, 100)),
+        Benchmark("RendimientoRepository.get_stats (unit)", lambda s, i: RendimientoRepository(s).get_stats(StatsGroupBy.UNIT)),
+        Benchmark("RendimientoRepository.get_stats (month)", lambda s, i: RendimientoRepository(s).get_stats(StatsGroupBy.MONTH)),
+        Benchmark("RendimientoRepository.get_stats (status, unit_id)", lambda s, i: RendimientoRepository(s).get_stats(
+            StatsGroupBy.STATUS, unit_id(i)
+        )),
+        Benchmark("RendimientoRepository.get_metric_inputs (10000)", lambda s, i: RendimientoRepository(s).get_metric_inputs(0, 10000)),
+        Benchmark("RendimientoRepository.bulk_update_metrics (1000)", lambda s, i: RendimientoRepository(s).bulk_update_metrics(
+            metric_updates(s)
+        )),
+        Benchmark("RendimientoRepository.update", lambda s, i: RendimientoRepository(s).update(
+            RendimientoRepository(s).get_by_id(route_id(i) // 2 + 1), RendimientoUpdate(notes=f"nota {i}")
+        )),
+
+        Benchmark("UnitPerformanceSummaryRepository.get_by_unit_id", lambda s, i: UnitPerformanceSummaryRepository(s).get_by_unit_id(unit_id(i))),
+        Benchmark("UnitPerformanceSummaryRepository.apply_delta", lambda s, i: (
+            UnitPerformanceSummaryRepository(s).apply_delta(unit_id(i), distance_km=0.0), s.commit()
+        )),
+        Benchmark("UnitPerformanceSummaryRepository.rebuild", lambda s, i: UnitPerformanceSummaryRepository(s).rebuild()),
+    ]
+
+
+def _metric_benchmarks(rng: random.Random) -> List[Benchmark]:
+    service = RendimientoService(None, None, None)
+
+    class _Ruta:
+        estimated_time_hours = 10.0
+
+    ruta = _Ruta()
+    size = 10000
+    distance = np.array([rng.uniform(40, 1500) for _ in range(size)])
+    fuel = np.array([rng.uniform(10, 500) for _ in range(size)])
+    actual = np.array([rng.uniform(1, 24) for _ in range(size)])
+    estimated = np.array([rng.uniform(1, 24) for _ in range(size)])
+
+    return [
+        Benchmark("RendimientoService._calculate_metrics", lambda s, i: service._calculate_metrics(
+            distance[i % size], fuel[i % size], actual[i % size], ruta
+        )),
+        Benchmark(f"MetricsRecomputeService.calculate_metrics_batch ({size})", lambda s, i: (
+            MetricsRecomputeService.calculate_metrics_batch(distance, fuel, actual, estimated)
+        )),
+    ]
+
+
+def run_benchmarks(engine, benchmarks: List[Benchmark], iterations: int, warmup: int) -> Dict[str, Dict[str, float]]:
+    results = {}
+    for benchmark in benchmarks:
+        latencies = []
+        for iteration in range(warmup + iterations):
+            with Session(engine) as session:
+                start = time.perf_counter()
+                benchmark.run(session, iteration)
+                elapsed = time.perf_counter() - start
+            if iteration >= warmup:
+                latencies.append(elapsed * 1000)
+        results[benchmark.name] = summarize_latencies(latencies, sum(latencies) / 1000)
+        print(
+            f"{benchmark.name:60s} p50 {results[benchmark.name]['p50_ms']:9.3f} ms  "
+            f"p99 {results[benchmark.name]['p99_ms']:9.3f} ms"
+        )
+    return results
+
+
+def main_benchmark() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--routes", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = build_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", Settings(DB_ECHO=False))
+        fleet = generate_fleet(engine, args.users, args.routes, args.seed)
+        migrate(engine)
+        benchmarks = _repository_benchmarks(args.users, args.routes, rng) + _metric_benchmarks(rng)
+        results = run_benchmarks(engine, benchmarks, args.iterations, args.warmup)
+        engine.dispose()
+
+    parameters = {key: value for key, value in vars(args).items() if key != "output"}
+    parameters["fleet"] = asdict(fleet)
+    write_results(args.output, "repositories", parameters, results)
+
+
+if __name__ == "__main__":
+    main_benchmark()
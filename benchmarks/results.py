@@ -0,0 +1,63 @@
+"""Utilidades comunes de los benchmarks: percentiles y archivos JSON comparables entre commits."""
+import json
+import platform
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Sequence
+
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    # Interpolación lineal entre los dos valores más cercanos (mismo criterio que numpy por defecto)
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def summarize_latencies(latencies_ms: List[float], elapsed_seconds: float) -> Dict[str, float]:
+    ordered = sorted(latencies_ms)
+    return {
+        "requests": len(ordered),
+        "rps": round(len(ordered) / elapsed_seconds, 1) if elapsed_seconds > 0 else 0.0,
+        "mean_ms": round(sum(ordered) / len(ordered), 3) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 3),
+        "p95_ms": round(percentile(ordered, 0.95), 3),
+        "p99_ms": round(percentile(ordered, 0.99), 3),
+        "max_ms": round(ordered[-1], 3) if ordered else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> Dict[str, Any]:
+    return {
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+    }
+
+
+def write_results(path: Optional[str], benchmark: str, parameters: Dict[str, Any], results: Any) -> Dict[str, Any]:
+    document = {
+        "benchmark": benchmark,
+        "environment": environment(),
+        "parameters": parameters,
+        "results": results,
+    }
+    if path:
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(document, output, indent=2, ensure_ascii=False)
+    return document
@@ -0,0 +1,119 @@
+"""Tiempo de arranque en frío: importar la aplicación, ejecutar el lifespan y responder el primer request.
+
+Cada corrida es un intérprete nuevo (como un worker recién creado) sobre una base SQLite temporal, en dos casos:
+base nueva (se aplican todas las migraciones) y base al día (solo se lee schema_version). Para comparar, la base al
+día también arranca con el init_db anterior a las migraciones (create_all + índices con checkfirst + instaladores).
+
+    python -m benchmarks.startup --runs 5 --output startup.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+
+def _previous_init_db() -> None:
+    from sqlmodel import SQLModel
+    from app.core.db.row_counts import install_row_counters
+    from app.core.db.search_index import install_search_index
+    from app.core.db.session import engine
+
+    with engine.begin() as connection:
+        SQLModel.metadata.create_all(connection)
+        for table in SQLModel.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(connection, checkfirst=True)
+        install_row_counters(connection)
+        install_search_index(connection)
+
+
+def _child(previous_init: bool) -> None:
+    start = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    import httpx
+
+    if previous_init:
+        # El lifespan busca init_db en el módulo main al arrancar
+        main.init_db = _previous_init_db
+
+    async def run() -> Dict[str, float]:
+        lifespan_start = time.perf_counter()
+        async with main.app.router.lifespan_context(main.app):
+            started = time.perf_counter()
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                response = await client.get("/routes?limit=1")
+                response.raise_for_status()
+            first_request = time.perf_counter()
+        return {
+            "import_ms": (imported - start) * 1000,
+            "startup_ms": (started - lifespan_start) * 1000,
+            "first_request_ms": (first_request - started) * 1000,
+            "total_ms": (first_request - start) * 1000,
+        }
+
+    print(json.dumps(asyncio.run(run())))
+
+
+def _run_child(database_url: str, previous_init: bool = False) -> Dict[str, float]:
+    env = {**os.environ, "DATABASE_URL": database_url, "DB_ASYNC": "false"}
+    for name in ("ASYNC_DATABASE_URL", "READ_DATABASE_URL", "ASYNC_READ_DATABASE_URL"):
+        env.pop(name, None)
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"] + (["--previous-init"] if previous_init else []),
+        env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _median(samples: List[Dict[str, float]]) -> Dict[str, float]:
+    return {key: round(statistics.median(sample[key] for sample in samples), 2) for key in samples[0]}
+
+
+def main_startup(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Corridas por caso; se reporta la mediana")
+    parser.add_argument("--output", help="Archivo JSON de resultados")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--previous-init", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _child(args.previous_init)
+        return
+
+    from benchmarks.results import write_results
+
+    fresh: List[Dict[str, float]] = []
+    current: List[Dict[str, float]] = []
+    previous: List[Dict[str, float]] = []
+    with tempfile.TemporaryDirectory() as directory:
+        for run in range(args.runs):
+            database_url = f"sqlite:///{os.path.join(directory, f'startup{run}.db')}"
+            fresh.append(_run_child(database_url))
+            current.append(_run_child(database_url))
+            previous.append(_run_child(database_url, previous_init=True))
+
+    results: Dict[str, Any] = {
+        "base nueva": _median(fresh),
+        "base al día": _median(current),
+        "base al día, init_db anterior": _median(previous),
+    }
+    for name, result in results.items():
+        print(
+            f"{name:30s} import {result['import_ms']:8.1f}  lifespan {result['startup_ms']:7.1f}  "
+            f"primer request {result['first_request_ms']:7.1f}  total {result['total_ms']:8.1f} ms"
+        )
+    write_results(args.output, "startup", {"runs": args.runs}, results)
+
+
+if __name__ == "__main__":
+    main_startup()
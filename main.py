@@ -1,12 +1,33 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.db.config import init_db
+from app.core.db.session import engine, read_engine
+from app.core.db.async_session import dispose_async_engine
+from app.core.metrics.middleware import MetricsMiddleware
+from app.core.metrics.registry import registry
+from app.shared.cache import get_cache_stats
+from app.features.users.services.password_hasher import shutdown_hash_executor, start_hash_executor
 from app.features.users.api.routes import router as users_router
 from app.features.unidades.api.routes import router as unidades_router
 from app.features.rutas.api.routes import router as rutas_router
 from app.features.rendimiento.api.routes import router as rendimiento_router
 
-app = FastAPI(title="Backend Control Transportistas", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    init_db()
+    start_hash_executor()
+    yield
+    await dispose_async_engine()
+    engine.dispose()
+    read_engine.dispose()
+    shutdown_hash_executor()
+
+
+app = FastAPI(title="Backend Control Transportistas", version="1.0.0", lifespan=lifespan)
 
 # Configurar CORS
 app.add_middleware(
@@ -15,11 +36,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Total-Count"],
 )
+app.add_middleware(MetricsMiddleware)
 
-@app.on_event("startup")
-def on_startup():
-    init_db()
+@app.get("/cache/stats", tags=["cache"])
+async def cache_stats():
+    return get_cache_stats()
+
+
+@app.get("/metrics", tags=["metrics"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 app.include_router(users_router)
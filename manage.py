@@ -0,0 +1,98 @@
+import argparse
+import sys
+from fastapi import HTTPException
+from sqlmodel import Session
+from app.core.config.settings import settings
+from app.core.db.config import init_db
+from app.core.db.session import engine
+from app.features.rendimiento.repositories.unit_performance_summary_repository import UnitPerformanceSummaryRepository
+from app.features.rendimiento.services.metrics_recompute_service import run_metrics_recompute
+from app.features.rendimiento.services.rendimiento_import_service import run_rendimiento_import
+from app.features.rutas.services.ruta_archive_service import run_ruta_archive
+from app.shared.file_import import IMPORT_CHUNK_SIZE, ImportFormat, detect_import_format
+import main as _main  # noqa: F401  registra todos los modelos en SQLModel.metadata
+
+
+def rebuild_performance_summary(args: argparse.Namespace) -> None:
+    with Session(engine) as session:
+        units = UnitPerformanceSummaryRepository(session).rebuild()
+    print(f"Resumen de rendimiento reconstruido para {units} unidades")
+
+
+def recompute_performance_metrics(args: argparse.Namespace) -> None:
+    processed = run_metrics_recompute(args.chunk_size)
+    print(f"Métricas recalculadas para {processed} registros de rendimiento")
+
+
+def import_performance(args: argparse.Namespace) -> None:
+    import_format = ImportFormat(args.format) if args.format else detect_import_format(args.path)
+    if import_format is None:
+        sys.exit("No se pudo deducir el formato del archivo; use --format csv o --format ndjson")
+
+    with open(args.path, "rb") as raw_lines:
+        try:
+            result = run_rendimiento_import(raw_lines, import_format, args.chunk_size)
+        except HTTPException as exc:
+            sys.exit(exc.detail)
+
+    for error in result.errors:
+        print(f"Línea {error.line}: {error.detail}")
+    print(f"{result.created} de {result.processed} registros de rendimiento importados, {len(result.errors)} con error")
+
+
+def archive_routes(args: argparse.Namespace) -> None:
+    result = run_ruta_archive(args.older_than_days, args.chunk_size)
+    print(f"{result.routes} rutas y {result.performance_records} registros de rendimiento archivados")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comandos de mantenimiento de Backend Control Transportistas")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    rebuild_parser = subparsers.add_parser(
+        "rebuild-performance-summary",
+        help="Recalcula la tabla unit_performance_summary a partir de los registros de rendimiento"
+    )
+    rebuild_parser.set_defaults(func=rebuild_performance_summary)
+
+    recompute_parser = subparsers.add_parser(
+        "recompute-performance-metrics",
+        help="Recalcula las métricas derivadas de todos los registros de rendimiento por lotes"
+    )
+    recompute_parser.add_argument("--chunk-size", type=int, default=10000, help="Registros procesados por lote")
+    recompute_parser.set_defaults(func=recompute_performance_metrics)
+
+    import_parser = subparsers.add_parser(
+        "import-performance",
+        help="Importa registros de rendimiento desde un archivo CSV o NDJSON por lotes"
+    )
+    import_parser.add_argument("path", help="Ruta del archivo a importar")
+    import_parser.add_argument(
+        "--format", choices=[import_format.value for import_format in ImportFormat],
+        help="Formato del archivo; por defecto se deduce de la extensión"
+    )
+    import_parser.add_argument(
+        "--chunk-size", type=int, default=IMPORT_CHUNK_SIZE, help="Registros validados e insertados por commit"
+    )
+    import_parser.set_defaults(func=import_performance)
+
+    archive_parser = subparsers.add_parser(
+        "archive-routes",
+        help="Mueve las rutas COMPLETADA/CANCELADA antiguas y sus rendimientos a las tablas de archivo por lotes"
+    )
+    archive_parser.add_argument(
+        "--older-than-days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+        help="Días desde que terminó la ruta para archivarla"
+    )
+    archive_parser.add_argument(
+        "--chunk-size", type=int, default=settings.ARCHIVE_CHUNK_SIZE, help="Rutas movidas por transacción"
+    )
+    archive_parser.set_defaults(func=archive_routes)
+
+    args = parser.parse_args()
+    init_db()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()